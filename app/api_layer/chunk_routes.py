@@ -1,4 +1,5 @@
-from fastapi import APIRouter, HTTPException, Query, Depends
+from fastapi import APIRouter, HTTPException, Query, Depends, Response
+from app.config import MAX_PAGE_SIZE, PAGE_SIZE
 from app.repository.mongo_repository import MongoRepository
 from uuid import UUID
 
@@ -14,7 +15,7 @@ def get_chunk_service(repo: MongoRepository = Depends()):
 
 
 @chunk_router.post("", response_model=ChunkResponse)
-def create_chunk(
+async def create_chunk(
     document_id: UUID = Query(..., description="Document ID of chunk"),
     text: str = Query(..., description="Text of the chunk"),
     section: str|None = Query(..., description="Section of the document this chunk belongs to"),
@@ -28,27 +29,33 @@ def create_chunk(
             text=text,
             metadata=metadata
         )
-        return service.save_chunk(chunk_data)
+        return await service.create_chunk(chunk_data)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @chunk_router.get("/list", response_model=list[UUID])
-def list_chunks(
+async def list_chunks(
+    response: Response,
+    cursor: UUID | None = Query(None, description="X-Next-Cursor header of the previous page"),
+    limit: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of chunk IDs to return"),
     service: ChunkService = Depends(get_chunk_service)
 ):
-    """List all chunk IDs"""
+    """List chunk IDs, a page at a time; X-Next-Cursor is set while more pages follow"""
     try:
-        return service.list_chunks()
+        chunk_ids, next_cursor = await service.list_chunks(cursor, limit)
+        if next_cursor is not None:
+            response.headers["X-Next-Cursor"] = str(next_cursor)
+        return chunk_ids
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @chunk_router.get("/{chunk_id}", response_model=ChunkResponse)
-def get_chunk(
+async def get_chunk(
     chunk_id: UUID,
     service: ChunkService = Depends(get_chunk_service)
 ):
     try:
-        chunk = service.get_chunk(chunk_id)
+        chunk = await service.get_chunk(chunk_id)
         if not chunk:
             raise HTTPException(status_code=404, detail=str(e))
         return chunk
@@ -56,7 +63,7 @@ def get_chunk(
         raise HTTPException(status_code=500, detail=str(e))
 
 @chunk_router.put("/{chunk_id}", response_model=ChunkResponse)
-def update_chunk(
+async def update_chunk(
     chunk_id: UUID,
     text: str|None = Query(None, description="New text  for the chunk"),
     section: str|None = Query(None, description="New section of the document this chunk belongs to"),
@@ -75,7 +82,7 @@ def update_chunk(
             text=text,
             metadata=metadata
         )
-        updated_chunk = service.update_chunk(chunk_id, update_data)
+        updated_chunk = await service.update_chunk(chunk_id, update_data)
         if not updated_chunk:
             raise HTTPException(status_code=404, detail="Chunk not found")
         return updated_chunk
@@ -83,12 +90,12 @@ def update_chunk(
         raise
 
 @chunk_router.delete("/{chunk_id}")
-def delete_chunk(
+async def delete_chunk(
     chunk_id: UUID,
     service: ChunkService = Depends(get_chunk_service)
 ):
     try:
-        service.delete_chunk(chunk_id)
+        await service.delete_chunk(chunk_id)
         return {"message": "Chunk deleted successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
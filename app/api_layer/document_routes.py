@@ -1,8 +1,18 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
-from typing import List, Optional
+from fastapi import APIRouter, Body, HTTPException, Depends, Query, Response
+from typing import List, Literal, Optional
 from uuid import UUID
-from app.data_models.document import DocumentCreate, DocumentUpdate, DocumentResponse
+from app.config import CHUNK_OVERLAP, CHUNK_SIZE, CHUNK_UNIT, MAX_PAGE_SIZE, PAGE_SIZE
+from app.data_models.document import (
+    ChunkingOptions,
+    DocumentBatchCreate,
+    DocumentCreate,
+    DocumentCreateResponse,
+    DocumentUpdate,
+    DocumentResponse,
+)
+from app.data_models.deletion_job import DeletionJob
 from app.data_models.metadata import DocumentMetadata
+from app.services.deletion_service import DeletionService
 from app.services.document_service import DocumentService
 from app.repository.mongo_repository import MongoRepository
 
@@ -11,20 +21,32 @@ document_router = APIRouter(prefix="/document")
 def get_document_service(repo: MongoRepository = Depends()):
     return DocumentService(repo)
 
-@document_router.post("/", response_model=DocumentResponse)
+def get_deletion_service(repo: MongoRepository = Depends()):
+    return DeletionService(repo)
+
+@document_router.post("/", response_model=DocumentCreateResponse)
 async def create_document(
     library_id: UUID = Query(..., description="ID of the library this document belongs to"),
     title: str = Query(..., description="Title of the document"),
     author: Optional[str] = Query(None, description="Author of the document"),
     status: Optional[str] = Query(None, description="Status of the document (draft, published, archived)"),
+    content: str = Body("", media_type="text/plain", description="Document content, split into chunks by the server"),
+    chunk_size: int = Query(CHUNK_SIZE, ge=1, description="Chunk size, in chunk_unit"),
+    chunk_overlap: int = Query(CHUNK_OVERLAP, ge=0, description="Overlap between consecutive chunks, in chunk_unit"),
+    chunk_unit: Literal["tokens", "sentences"] = Query(CHUNK_UNIT, description="tokens (words) or sentences"),
     service: DocumentService = Depends(get_document_service)
 ):
-    """Create a new document."""
+    """Create a new document, chunking, embedding and indexing its content if given.
+
+    The response's ingest field counts the chunks written and indexed and lists
+    any that failed, e.g. because their embeddings could not be computed.
+    """
     try:
         # Create DocumentCreate object from individual fields
         document_create = DocumentCreate(
             library_id=library_id,
-            title=title
+            title=title,
+            content=content
         )
         
         # Only create metadata if we have values to set
@@ -36,24 +58,60 @@ async def create_document(
                 metadata["status"] = status
             document_create.metadata = DocumentMetadata(**metadata)
 
-        return await service.create_document(document_create)
+        chunking = ChunkingOptions(chunk_size=chunk_size, chunk_overlap=chunk_overlap, chunk_unit=chunk_unit)
+        document, ingest = await service.create_document(document_create, chunking)
+        return DocumentCreateResponse(**document.model_dump(), ingest=ingest)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to create document: {str(e)}")
 
+@document_router.post("/batch", response_model=List[DocumentResponse])
+async def create_documents(
+    batch: DocumentBatchCreate,
+    service: DocumentService = Depends(get_document_service)
+):
+    """Create many documents, splitting their content into chunks concurrently."""
+    try:
+        return await service.create_documents(batch)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to create documents: {str(e)}")
+
 @document_router.get("/", response_model=List[DocumentResponse])
 async def list_documents(
+    response: Response,
+    library_id: Optional[UUID] = Query(None, description="Only list documents of this library"),
+    cursor: Optional[UUID] = Query(None, description="X-Next-Cursor header of the previous page"),
+    limit: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of documents to return"),
     service: DocumentService = Depends(get_document_service)
 ):
-    """List all documents."""
+    """List documents, a page at a time; X-Next-Cursor is set while more pages follow."""
     try:
-        return await service.list_documents()
+        documents, next_cursor = await service.list_documents(library_id, cursor, limit)
+        if next_cursor is not None:
+            response.headers["X-Next-Cursor"] = str(next_cursor)
+        return documents
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to list documents: {str(e)}")
 
+@document_router.get("/deletions/{job_id}", response_model=DeletionJob)
+async def get_document_deletion_job(
+    job_id: UUID,
+    service: DeletionService = Depends(get_deletion_service)
+):
+    """Get the status of a background document deletion."""
+    try:
+        job = service.get_job(job_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    if job.resource_type != "document":
+        raise HTTPException(status_code=404, detail=f"Deletion job with ID {job_id} not found")
+    return job
+
 @document_router.get("/{document_id}", response_model=DocumentResponse)
 async def get_document(
     document_id: UUID,
@@ -102,13 +160,16 @@ async def update_document(
 @document_router.delete("/{document_id}")
 async def delete_document(
     document_id: UUID,
+    response: Response,
+    background: bool = Query(False, description="Delete in the background and return the deletion job"),
     service: DocumentService = Depends(get_document_service)
 ):
-    """Delete a document."""
+    """Delete a document with its chunks and their index entries."""
     try:
-        success = await service.delete_document(document_id)
-        if not success:
-            raise HTTPException(status_code=404, detail=f"Document with ID {document_id} not found")
+        job = await service.delete_document(document_id, background)
+        if background:
+            response.status_code = 202
+            return job
         return {"message": "Document deleted successfully"}
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
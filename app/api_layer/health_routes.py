@@ -0,0 +1,18 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from app.monitoring.startup import startup_tracker
+
+health_router = APIRouter(prefix="/health")
+
+
+@health_router.get("/live")
+def live():
+    """Liveness probe: the process is up and serving requests."""
+    return {"status": "ok"}
+
+
+@health_router.get("/ready")
+def ready():
+    """Readiness probe: 503 until startup, including index warmup, has finished."""
+    status = startup_tracker.status()
+    return JSONResponse(content=status, status_code=200 if status["ready"] else 503)
@@ -1,8 +1,23 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, Body, HTTPException, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
 from uuid import UUID
+from app.config import MAX_PAGE_SIZE, PAGE_SIZE
+from app.data_models.deletion_job import DeletionJob
+from app.data_models.ingest import IngestResult
 from app.data_models.library import LibraryCreate, LibraryUpdate, LibraryResponse
+from app.data_models.tuning import AutotuneRequest
+from app.data_models.rebuild_job import RebuildJob
+from app.services.deletion_service import DeletionService
 from app.services.library_service import LibraryService
+from app.services.index_service import IndexService
+from app.services.ingest_service import (
+    ARROW_CONTENT_TYPES,
+    IngestService,
+    iter_arrow_records,
+    iter_ndjson_records,
+)
+from app.services.rebuild_service import RebuildService
 from app.repository.mongo_repository import MongoRepository
 
 library_router = APIRouter(prefix="/library")
@@ -10,18 +25,40 @@ library_router = APIRouter(prefix="/library")
 def get_library_service(repo: MongoRepository = Depends()):
     return LibraryService(repo)
 
+def get_index_service(repo: MongoRepository = Depends()):
+    return IndexService(repo)
+
+def get_rebuild_service(repo: MongoRepository = Depends()):
+    return RebuildService(repo)
+
+def get_ingest_service(repo: MongoRepository = Depends()):
+    return IngestService(repo)
+
+def get_deletion_service(repo: MongoRepository = Depends()):
+    return DeletionService(repo)
+
+def shard_params(n_shards: Optional[int], shard_type: Optional[str]) -> dict:
+    """Index parameters from the shard query options that were given."""
+    params = {"n_shards": n_shards, "shard_type": shard_type}
+    return {name: value for name, value in params.items() if value is not None}
+
 @library_router.post("/", response_model=LibraryResponse)
 async def create_library(
     title: str = Query(..., description="Title of the library"),
     description: Optional[str] = Query(None, description="Description of the library"),
-    index_type: Optional[str] = Query(None, description="Type of index to use (flat, ivf or hnsw)"),
+    index_type: Optional[str] = Query(None, description="Type of index to use (flat, ivf, hnsw, sharded or auto)"),
+    metric: str = Query("cosine", description="Similarity metric (cosine, inner_product or l2)"),
+    n_shards: Optional[int] = Query(None, description="Number of shards (sharded indexes only)"),
+    shard_type: Optional[str] = Query(None, description="Index type of each shard: flat, ivf or hnsw (sharded indexes only)"),
     service: LibraryService = Depends(get_library_service)
 ):
     try:
         library_create = LibraryCreate(
             title=title,
             description=description,
-            index_type=index_type
+            index_type=index_type,
+            metric=metric,
+            index_params=shard_params(n_shards, shard_type)
         )
         return await service.create_library(library_create)
     except ValueError as e:
@@ -31,13 +68,29 @@ async def create_library(
 
 @library_router.get("/list", response_model=List[LibraryResponse])
 async def list_libraries(
+    response: Response,
+    cursor: Optional[UUID] = Query(None, description="X-Next-Cursor header of the previous page"),
+    limit: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of libraries to return"),
     service: LibraryService = Depends(get_library_service)
 ):
     try:
-        return await service.list_libraries()
+        libraries, next_cursor = await service.list_libraries(cursor, limit)
+        if next_cursor is not None:
+            response.headers["X-Next-Cursor"] = str(next_cursor)
+        return libraries
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to list libraries: {str(e)}")
 
+@library_router.get("/deletions/{job_id}", response_model=DeletionJob)
+async def get_library_deletion_job(job_id: UUID, service: DeletionService = Depends(get_deletion_service)):
+    try:
+        job = service.get_job(job_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    if job.resource_type != "library":
+        raise HTTPException(status_code=404, detail=f"Deletion job with ID {job_id} not found")
+    return job
+
 @library_router.get("/{library_id}", response_model=LibraryResponse)
 async def get_library(library_id: UUID, service: LibraryService = Depends(get_library_service)):
     try:
@@ -50,19 +103,130 @@ async def get_library(library_id: UUID, service: LibraryService = Depends(get_li
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get library: {str(e)}")
 
+@library_router.get("/{library_id}/stats")
+async def get_library_index_stats(library_id: UUID, service: IndexService = Depends(get_index_service)):
+    try:
+        return await service.get_index_stats(library_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get index stats: {str(e)}")
+
+@library_router.post("/{library_id}/autotune")
+async def autotune_library_index(
+    library_id: UUID,
+    request: AutotuneRequest = Body(default_factory=AutotuneRequest),
+    service: IndexService = Depends(get_index_service)
+):
+    try:
+        return await service.autotune(
+            library_id,
+            queries=request.queries,
+            k=request.k,
+            target_recall=request.target_recall,
+            tune_build=request.tune_build,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to tune index: {str(e)}")
+
+@library_router.post("/{library_id}/rebuild", response_model=RebuildJob, status_code=202)
+async def rebuild_library_index(
+    library_id: UUID,
+    index_type: Optional[str] = Query(None, description="Index type to build; defaults to the current type"),
+    metric: Optional[str] = Query(None, description="Similarity metric to build with; defaults to the current metric"),
+    n_shards: Optional[int] = Query(None, description="Number of shards (sharded indexes only); changing only this rebalances"),
+    shard_type: Optional[str] = Query(None, description="Index type of each shard (sharded indexes only)"),
+    service: RebuildService = Depends(get_rebuild_service)
+):
+    try:
+        return await service.start_rebuild(library_id, index_type, metric, shard_params(n_shards, shard_type))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to start index rebuild: {str(e)}")
+
+@library_router.get("/{library_id}/rebuild", response_model=RebuildJob)
+async def get_latest_rebuild_job(library_id: UUID, service: RebuildService = Depends(get_rebuild_service)):
+    try:
+        return service.get_latest_job(library_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@library_router.get("/{library_id}/rebuild/{job_id}", response_model=RebuildJob)
+async def get_rebuild_job(library_id: UUID, job_id: UUID, service: RebuildService = Depends(get_rebuild_service)):
+    try:
+        job = service.get_job(job_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    if job.library_id != library_id:
+        raise HTTPException(status_code=404, detail=f"Rebuild job with ID {job_id} not found")
+    return job
+
+@library_router.post("/{library_id}/ingest", response_model=IngestResult)
+async def ingest_library(
+    library_id: UUID,
+    request: Request,
+    service: IngestService = Depends(get_ingest_service)
+):
+    """Bulk-load documents and chunks from a streamed NDJSON or Arrow body."""
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith(ARROW_CONTENT_TYPES):
+        records = iter_arrow_records(request.stream())
+    else:
+        records = iter_ndjson_records(request.stream())
+    try:
+        return await service.ingest(library_id, records)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to ingest into library: {str(e)}")
+
+@library_router.get("/{library_id}/export")
+async def export_library(
+    library_id: UUID,
+    include_embedding: bool = Query(False, description="Include each chunk's embedding"),
+    service: LibraryService = Depends(get_library_service)
+):
+    """Stream every document and chunk of a library as NDJSON, in the format /ingest accepts."""
+    try:
+        lines = await service.export_library(library_id, include_embedding)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to export library: {str(e)}")
+    return StreamingResponse(lines, media_type="application/x-ndjson")
+
 @library_router.put("/{library_id}", response_model=LibraryResponse)
 async def update_library(
     library_id: UUID,
+    response: Response,
     title: Optional[str] = Query(None, description="New title for the library"),
     description: Optional[str] = Query(None, description="New description for the library"),
-    index_type: Optional[str] = Query(None, description="New index type (flat, ivf or hnsw)"),
-    service: LibraryService = Depends(get_library_service)
+    index_type: Optional[str] = Query(None, description="New index type (flat, ivf, hnsw, sharded or auto)"),
+    metric: Optional[str] = Query(None, description="New similarity metric (cosine, inner_product or l2)"),
+    n_shards: Optional[int] = Query(None, description="New number of shards (sharded indexes only)"),
+    shard_type: Optional[str] = Query(None, description="New index type of each shard (sharded indexes only)"),
+    service: LibraryService = Depends(get_library_service),
+    rebuild_service: RebuildService = Depends(get_rebuild_service)
 ):
     try:
+        # A new index type, metric or shard layout is built in the background and swapped
+        # in when ready, so the library keeps serving searches from its current index meanwhile
+        index_params = shard_params(n_shards, shard_type)
+        if index_type is not None or metric is not None or index_params:
+            current = await service.get_library(library_id)
+            if current and (
+                (index_type is not None and index_type != current.index_type)
+                or (metric is not None and metric != current.metric)
+                or any(current.index_params.get(name) != value for name, value in index_params.items())
+            ):
+                job = await rebuild_service.start_rebuild(library_id, index_type, metric, index_params)
+                response.headers["X-Rebuild-Job"] = str(job.id)
         library_update = LibraryUpdate(
             title=title,
-            description=description,
-            index_type=index_type
+            description=description
         )
         library = await service.update_library(library_id, library_update)
         if not library:
@@ -76,12 +240,15 @@ async def update_library(
 @library_router.delete("/{library_id}")
 async def delete_library(
     library_id: UUID,
+    response: Response,
+    background: bool = Query(False, description="Delete in the background and return the deletion job"),
     service: LibraryService = Depends(get_library_service)
 ):
     try:
-        success = await service.delete_library(library_id)
-        if not success:
-            raise HTTPException(status_code=404, detail="Library not found")
+        job = await service.delete_library(library_id, background)
+        if background:
+            response.status_code = 202
+            return job
         return {"message": "Library deleted successfully"}
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -0,0 +1,11 @@
+from fastapi import APIRouter, Response
+from app.monitoring.metrics import render_metrics
+
+metrics_router = APIRouter()
+
+
+@metrics_router.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus metrics in text exposition format."""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
@@ -1,8 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException
-from app.data_models.search import SearchQuery
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import ORJSONResponse
+from pydantic import ValidationError
+from uuid import UUID
+import numpy as np
+from app.data_models.search import (
+    RangeSearchOptions,
+    SearchQuery,
+    VectorSearchQuery,
+    SimilarSearchQuery,
+    FederatedSearchQuery,
+    SearchResult,
+    SimilarSearchResult,
+    FederatedSearchResponse,
+    SearchField,
+    DEFAULT_SEARCH_FIELDS,
+)
 from app.data_models.chunk import Chunk
+from app.indexing.search_budget import SearchBudget
 from app.services.index_service import IndexService
 from app.repository.mongo_repository import MongoRepository
+from app.monitoring.tracing import span
 import logging
 
 logger = logging.getLogger(__name__)
@@ -14,14 +31,186 @@ def get_index_service(repo: MongoRepository = Depends()):
     return IndexService(repo)
 
 
-@search_router.post("/", response_model=list[Chunk])
-def search(
+def shape_results(
+    hits: list[tuple[Chunk, float]], fields: list[SearchField], include_score: bool
+) -> list[dict]:
+    """Build plain result dicts so responses skip pydantic serialization."""
+    results = []
+    with span("shape_results"):
+        for chunk, score in hits:
+            result = {}
+            for field in fields:
+                if field == "metadata":
+                    result["metadata"] = chunk.metadata.model_dump()
+                else:
+                    result[field] = getattr(chunk, field)
+            if include_score:
+                result["score"] = float(score)
+            results.append(result)
+    return results
+
+
+@search_router.post("/", response_model=list[SearchResult], response_class=ORJSONResponse)
+async def search(
     query: SearchQuery,
     index_service: IndexService = Depends(get_index_service),
 ):
     try:
-        chunks = index_service.search(query.library_id, query.query, k=query.k)
-        return chunks
+        include_embedding = "embedding" in query.fields
+        # The budget starts now, so it also covers embedding the query and reading the library
+        budget = SearchBudget(query.timeout_ms) if query.timeout_ms else None
+        if query.mode == "lexical":
+            hits = await index_service.search_lexical(
+                query.library_id, query.query, k=query.k, include_embedding=include_embedding, budget=budget
+            )
+        elif query.mode == "hybrid":
+            hits = await index_service.search_hybrid(
+                query.library_id,
+                query.query,
+                k=query.k,
+                fusion=query.fusion,
+                alpha=query.alpha,
+                include_embedding=include_embedding,
+                budget=budget,
+            )
+        elif query.min_score is not None:
+            hits = await index_service.search_range(
+                query.library_id,
+                query.query,
+                query.min_score,
+                max_results=query.max_results,
+                include_embedding=include_embedding,
+                budget=budget,
+            )
+        else:
+            hits = await index_service.search(
+                query.library_id, query.query, k=query.k, include_embedding=include_embedding, budget=budget
+            )
+        # The response body stays a plain list, so partial results are flagged in a header
+        headers = {"X-Search-Partial": "true"} if budget is not None and budget.exhausted else None
+        return ORJSONResponse(shape_results(hits, query.fields, query.include_score), headers=headers)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error during search: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+
+
+async def parse_vector_query(request: Request, params: dict) -> VectorSearchQuery:
+    """Read a vector query from a JSON body or a raw little-endian float32 body."""
+    body = await request.body()
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("application/octet-stream"):
+        if not body or len(body) % 4 != 0:
+            raise ValueError("Binary query body must be a non-empty sequence of float32 values")
+        options = RangeSearchOptions.model_validate(params)
+        # Only the options are validated; the float32 buffer is used as-is
+        return VectorSearchQuery.model_construct(
+            vector=np.frombuffer(body, dtype="<f4"), **dict(options)
+        )
+    return VectorSearchQuery.model_validate_json(body)
+
+
+@search_router.post("/vector", response_model=list[SearchResult], response_class=ORJSONResponse)
+async def search_vector(
+    request: Request,
+    library_id: UUID | None = Query(None, description="Search library ID (binary bodies only)"),
+    k: int = Query(10, ge=1, description="Number of results to return (binary bodies only)"),
+    fields: list[SearchField] = Query(
+        list(DEFAULT_SEARCH_FIELDS), description="Chunk fields to return (binary bodies only)"
+    ),
+    include_score: bool = Query(True, description="Include similarity scores (binary bodies only)"),
+    min_score: float | None = Query(None, description="Range search threshold (binary bodies only)"),
+    max_results: int | None = Query(None, ge=1, description="Most results a range search returns (binary bodies only)"),
+    timeout_ms: float | None = Query(None, description="Time budget for the search (binary bodies only)"),
+    index_service: IndexService = Depends(get_index_service),
+):
+    """Search with a precomputed query embedding, sent as JSON or as raw float32 bytes."""
+    try:
+        query = await parse_vector_query(
+            request,
+            {
+                "library_id": library_id,
+                "k": k,
+                "fields": fields,
+                "include_score": include_score,
+                "min_score": min_score,
+                "max_results": max_results,
+                "timeout_ms": timeout_ms,
+            },
+        )
+    except (ValueError, ValidationError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        include_embedding = "embedding" in query.fields
+        budget = SearchBudget(query.timeout_ms) if query.timeout_ms else None
+        if query.min_score is not None:
+            hits = await index_service.search_range_by_vector(
+                query.library_id,
+                query.vector,
+                query.min_score,
+                max_results=query.max_results,
+                include_embedding=include_embedding,
+                budget=budget,
+            )
+        else:
+            hits = await index_service.search_by_vector(
+                query.library_id, query.vector, k=query.k, include_embedding=include_embedding, budget=budget
+            )
+        headers = {"X-Search-Partial": "true"} if budget is not None and budget.exhausted else None
+        return ORJSONResponse(shape_results(hits, query.fields, query.include_score), headers=headers)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error during vector search: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@search_router.post("/similar", response_model=list[SimilarSearchResult], response_class=ORJSONResponse)
+async def search_similar(
+    query: SimilarSearchQuery,
+    index_service: IndexService = Depends(get_index_service),
+):
+    """Find chunks similar to existing chunks without re-embedding their text."""
+    try:
+        batches = await index_service.search_similar(
+            query.library_id,
+            query.chunk_ids,
+            k=query.k,
+            include_embedding="embedding" in query.fields,
+        )
+        return ORJSONResponse([
+            {"chunk_id": chunk_id, "results": shape_results(hits, query.fields, query.include_score)}
+            for chunk_id, hits in zip(query.chunk_ids, batches)
+        ])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error during similar search: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@search_router.post("/federated", response_model=FederatedSearchResponse, response_class=ORJSONResponse)
+async def search_federated(
+    query: FederatedSearchQuery,
+    index_service: IndexService = Depends(get_index_service),
+):
+    """Search several libraries (all of them by default) and merge the top-k."""
+    try:
+        hits, timings = await index_service.search_federated(
+            query.library_ids,
+            query.query,
+            k=query.k,
+            include_embedding="embedding" in query.fields,
+        )
+        results = shape_results(
+            [(chunk, score) for chunk, score, _ in hits], query.fields, query.include_score
+        )
+        for result, (_, _, library_id) in zip(results, hits):
+            result["library_id"] = library_id
+        return ORJSONResponse({"results": results, "libraries": timings})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error during federated search: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
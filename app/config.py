@@ -1,6 +1,5 @@
 import os
 from dotenv import load_dotenv
-import cohere
 
 # Load environment variables from .env file
 load_dotenv()
@@ -13,5 +12,70 @@ if not COHERE_API_KEY:
 # MongoDB configuration
 MONGODB_URL: str = os.getenv("MONGODB_URL", "mongodb://mongodb:27017")
 MONGODB_DB_NAME: str = os.getenv("MONGODB_DB_NAME", "vector_db")
-    
-co = cohere.Client(COHERE_API_KEY) 
\ No newline at end of file
+
+# Index search configuration
+INDEX_SEARCH_WORKERS: int = int(os.getenv("INDEX_SEARCH_WORKERS", os.cpu_count() or 4))
+
+# Profiling configuration: sampled requests slower than the threshold are written to PROFILE_DIR
+PROFILE_THRESHOLD_MS: float | None = (
+    float(os.getenv("PROFILE_THRESHOLD_MS")) if os.getenv("PROFILE_THRESHOLD_MS") else None
+)
+PROFILE_SAMPLE_RATE: float = float(os.getenv("PROFILE_SAMPLE_RATE", "0.01"))
+PROFILE_DIR: str = os.getenv("PROFILE_DIR", "profiles")
+
+# Recall monitoring: a sample of approximate searches is re-run exactly in the background
+RECALL_SAMPLE_RATE: float = float(os.getenv("RECALL_SAMPLE_RATE", "0.01"))
+RECALL_TARGET: float = float(os.getenv("RECALL_TARGET", "0.9"))
+RECALL_WINDOW: int = int(os.getenv("RECALL_WINDOW", "500"))
+
+# Index autotuning: libraries are re-tuned once they reach AUTOTUNE_MIN_VECTORS
+# and again each time they grow by AUTOTUNE_GROWTH_FACTOR since the last tuning
+AUTOTUNE_TARGET_RECALL: float = float(os.getenv("AUTOTUNE_TARGET_RECALL", "0.95"))
+AUTOTUNE_SAMPLE_QUERIES: int = int(os.getenv("AUTOTUNE_SAMPLE_QUERIES", "100"))
+AUTOTUNE_MIN_VECTORS: int = int(os.getenv("AUTOTUNE_MIN_VECTORS", "1000"))
+AUTOTUNE_GROWTH_FACTOR: float = float(os.getenv("AUTOTUNE_GROWTH_FACTOR", "2.0"))
+
+# "auto" index type: flat up to AUTO_FLAT_MAX_VECTORS, then HNSW while its graph
+# fits in AUTO_MEMORY_BUDGET_MB and IVF beyond that
+AUTO_FLAT_MAX_VECTORS: int = int(os.getenv("AUTO_FLAT_MAX_VECTORS", "10000"))
+AUTO_MEMORY_BUDGET_MB: int = int(os.getenv("AUTO_MEMORY_BUDGET_MB", "1024"))
+AUTO_HNSW_M: int = int(os.getenv("AUTO_HNSW_M", "16"))
+
+# Background index rebuilds stream chunk embeddings from MongoDB in batches of this size
+REBUILD_BATCH_SIZE: int = int(os.getenv("REBUILD_BATCH_SIZE", "1000"))
+
+# Hybrid search fetches k * HYBRID_CANDIDATE_FACTOR candidates from each retriever before fusing
+HYBRID_CANDIDATE_FACTOR: int = int(os.getenv("HYBRID_CANDIDATE_FACTOR", "4"))
+
+# Cap on range (min_score) search results when the request sets no max_results
+RANGE_MAX_RESULTS: int = int(os.getenv("RANGE_MAX_RESULTS", "1000"))
+
+# List endpoints return PAGE_SIZE records per page unless asked for more, up to MAX_PAGE_SIZE
+PAGE_SIZE: int = int(os.getenv("PAGE_SIZE", "100"))
+MAX_PAGE_SIZE: int = int(os.getenv("MAX_PAGE_SIZE", "1000"))
+
+# Bulk ingestion: records are written to MongoDB INGEST_BATCH_SIZE chunks at a time, missing
+# embeddings are requested INGEST_EMBED_BATCH_SIZE texts per call, and new vectors are added to
+# the index every INGEST_INDEX_BATCH_SIZE chunks. Arrow bodies spill to disk past INGEST_SPOOL_MB
+INGEST_BATCH_SIZE: int = int(os.getenv("INGEST_BATCH_SIZE", "500"))
+INGEST_EMBED_BATCH_SIZE: int = int(os.getenv("INGEST_EMBED_BATCH_SIZE", "96"))
+INGEST_INDEX_BATCH_SIZE: int = int(os.getenv("INGEST_INDEX_BATCH_SIZE", "10000"))
+INGEST_MAX_ERRORS: int = int(os.getenv("INGEST_MAX_ERRORS", "100"))
+INGEST_SPOOL_MB: int = int(os.getenv("INGEST_SPOOL_MB", "64"))
+
+# Server-side chunking of document content: default chunk size and overlap in CHUNK_UNIT
+# ("tokens" or "sentences"), and the worker processes that split documents in parallel
+CHUNK_SIZE: int = int(os.getenv("CHUNK_SIZE", "200"))
+CHUNK_OVERLAP: int = int(os.getenv("CHUNK_OVERLAP", "20"))
+CHUNK_UNIT: str = os.getenv("CHUNK_UNIT", "tokens")
+CHUNKING_WORKERS: int = int(os.getenv("CHUNKING_WORKERS", os.cpu_count() or 4))
+
+# Deserialized indexes are snapshotted to this local directory for fast warm restarts ("" disables)
+INDEX_SNAPSHOT_DIR: str = os.getenv("INDEX_SNAPSHOT_DIR", "index_snapshots")
+
+# Startup warmup: indexes of these libraries (comma-separated IDs, or "all") are loaded,
+# WARMUP_CONCURRENCY at a time, before the readiness probe reports ready
+WARMUP_LIBRARIES: list[str] = [
+    library_id.strip() for library_id in os.getenv("WARMUP_LIBRARIES", "").split(",") if library_id.strip()
+]
+WARMUP_CONCURRENCY: int = int(os.getenv("WARMUP_CONCURRENCY", "4"))
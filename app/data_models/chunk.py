@@ -2,8 +2,7 @@ from uuid import UUID, uuid4
 from pydantic import BaseModel, Field
 from app.data_models.metadata import ChunkMetadata
 from datetime import datetime, timezone
-import cohere
-from app.config import COHERE_API_KEY
+from app.services.embedding_service import embed_texts
 import logging
 
 logger = logging.getLogger(__name__)
@@ -31,6 +30,7 @@ class ChunkUpdate(BaseModel):
 
 class ChunkResponse(ChunkBase):
     id: UUID = Field(..., description="Unique identifier for the chunk")
+    library_id: UUID | None = Field(default=None, description="ID of the library the chunk's document belongs to")
     embedding: list[float] | None = Field(
         default=None, description="Vector embedding of the chunk text"
     )
@@ -49,6 +49,8 @@ class Chunk(BaseModel):
         default_factory=uuid4, description="Unique identifier for the chunk"
     )
     document_id: UUID = Field(..., description="ID of the document this chunk belongs to")
+    # Denormalized from the document so library-scoped chunk queries can use an index
+    library_id: UUID | None = Field(default=None, description="ID of the library the chunk's document belongs to")
     text: str = Field(..., description="Text content of the chunk")
     embedding: list[float] | None = Field(
         default=None, description="Vector embedding of the chunk text"
@@ -64,6 +66,23 @@ class Chunk(BaseModel):
         if not self.embedding:
             self.generate_embedding()
 
+    @classmethod
+    def from_record(cls, data: dict) -> "Chunk":
+        """Build a chunk from a trusted Mongo record without validation or re-embedding."""
+        metadata = data.get("metadata")
+        return cls.model_construct(
+            id=data.get("id", data.get("_id")),
+            document_id=data["document_id"],
+            library_id=data.get("library_id"),
+            text=data["text"],
+            embedding=data.get("embedding"),
+            metadata=(
+                ChunkMetadata.model_construct(**metadata)
+                if metadata
+                else ChunkMetadata()
+            ),
+        )
+
     def _update_timestamp(self) -> None:
         self.metadata.updated_at = datetime.now(timezone.utc)
 
@@ -88,18 +107,9 @@ class Chunk(BaseModel):
 
     def generate_embedding(self) -> list[float] | None:
         try:
-            co = cohere.Client(COHERE_API_KEY)
-            response = co.embed(
-                texts=[self.text],
-                model="embed-english-v3.0",
-                input_type="search_document",
-            )
-
-            if response and response.embeddings:
-                embedding = response.embeddings[0]
-                self.update_embedding(embedding)
-                return embedding
-            return None
+            embedding = embed_texts([self.text], input_type="search_document")[0]
+            self.update_embedding(embedding)
+            return embedding
 
         except Exception as e:
             logger.error(f"Error generating embedding: {str(e)}")
@@ -0,0 +1,33 @@
+from datetime import datetime, timezone
+from typing import Literal
+from uuid import UUID, uuid4
+
+from pydantic import BaseModel, Field, computed_field
+
+
+class DeletionJob(BaseModel):
+    """Progress of a cascade delete of a library or document."""
+
+    id: UUID = Field(default_factory=uuid4, description="Unique identifier for the job")
+    resource_type: Literal["library", "document"] = Field(..., description="Kind of resource being deleted")
+    resource_id: UUID = Field(..., description="ID of the library or document being deleted")
+    status: str = Field(default="pending", description="pending, running, completed or failed")
+    phase: str = Field(default="queued", description="queued, listing, index, chunks, documents, library or done")
+    total_documents: int = Field(default=0, description="Documents to delete")
+    deleted_documents: int = Field(default=0, description="Documents deleted so far")
+    deleted_chunks: int = Field(default=0, description="Chunks deleted so far")
+    started_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    finished_at: datetime | None = Field(default=None)
+    error: str | None = Field(default=None)
+
+    @computed_field
+    @property
+    def progress(self) -> float:
+        if self.status == "completed":
+            return 1.0
+        if not self.total_documents:
+            return 0.0
+        return min(1.0, self.deleted_documents / self.total_documents)
+
+    def is_active(self) -> bool:
+        return self.status in ("pending", "running")
@@ -1,8 +1,10 @@
 from uuid import UUID, uuid4
 from pydantic import BaseModel, Field
+from app.config import CHUNK_OVERLAP, CHUNK_SIZE, CHUNK_UNIT
+from app.data_models.ingest import IngestResult
 from app.data_models.metadata import DocumentMetadata
 
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Literal
 from datetime import datetime
 
 
@@ -16,6 +18,24 @@ class DocumentCreate(DocumentBase):
     metadata: DocumentMetadata|None = Field(default=None, description="Document metadata")
 
 
+class ChunkingOptions(BaseModel):
+    chunk_size: int = Field(default=CHUNK_SIZE, ge=1, description="Chunk size, in chunk_unit")
+    chunk_overlap: int = Field(default=CHUNK_OVERLAP, ge=0, description="Overlap between consecutive chunks, in chunk_unit")
+    chunk_unit: Literal["tokens", "sentences"] = Field(default=CHUNK_UNIT, description="tokens (words) or sentences")
+
+
+class DocumentContent(BaseModel):
+    title: str = Field(..., description="Title of the document")
+    content: str = Field(default="", description="Content of the document, split into chunks by the server")
+    metadata: DocumentMetadata|None = Field(default=None, description="Document metadata")
+
+
+class DocumentBatchCreate(BaseModel):
+    library_id: UUID = Field(..., description="ID of the library the documents belong to")
+    documents: list[DocumentContent] = Field(..., min_length=1, description="Documents to create")
+    chunking: ChunkingOptions = Field(default_factory=ChunkingOptions, description="How content is split into chunks")
+
+
 class DocumentUpdate(BaseModel):
     title: str|None = Field(default=None, description="New title for the document")
     metadata: DocumentMetadata|None = Field(default=None, description="Updated document metadata")
@@ -36,6 +56,12 @@ class DocumentResponse(DocumentBase):
         from_attributes = True
 
 
+class DocumentCreateResponse(DocumentResponse):
+    ingest: IngestResult | None = Field(
+        default=None, description="How the content's chunks were embedded and indexed; null without content"
+    )
+
+
 class Document(BaseModel):
     """A document containing multiple chunks of text."""
 
@@ -0,0 +1,48 @@
+from typing import Literal
+from uuid import UUID, uuid4
+
+from pydantic import BaseModel, Field
+
+from app.data_models.metadata import ChunkMetadata, DocumentMetadata
+
+
+class IngestDocument(BaseModel):
+    """A document record in an ingestion stream."""
+
+    type: Literal["document"] = Field(..., description="Record type")
+    id: UUID = Field(default_factory=uuid4, description="Document ID; generated when omitted")
+    title: str = Field(..., description="Title of the document")
+    metadata: DocumentMetadata | None = Field(default=None, description="Document metadata")
+
+
+class IngestChunk(BaseModel):
+    """A chunk record in an ingestion stream."""
+
+    type: Literal["chunk"] = Field(default="chunk", description="Record type")
+    id: UUID = Field(default_factory=uuid4, description="Chunk ID; generated when omitted")
+    document_id: UUID | None = Field(
+        default=None, description="Document the chunk belongs to; defaults to the last document record"
+    )
+    text: str = Field(..., min_length=1, description="Text content of the chunk")
+    embedding: list[float] | None = Field(
+        default=None, description="Precomputed embedding; the text is embedded when omitted"
+    )
+    metadata: ChunkMetadata | None = Field(default=None, description="Chunk metadata")
+
+
+class IngestError(BaseModel):
+    record: int = Field(..., description="Line (NDJSON) or row (Arrow) number of the rejected record, from 1")
+    error: str = Field(..., description="Why the record was rejected")
+
+
+class IngestResult(BaseModel):
+    """Summary of a bulk ingestion request."""
+
+    documents: int = Field(default=0, description="Documents created or updated")
+    chunks: int = Field(default=0, description="Chunks written")
+    embedded: int = Field(default=0, description="Chunks whose embeddings were computed by the server")
+    indexed: int = Field(default=0, description="Vectors added to the library's index")
+    error_count: int = Field(default=0, description="Records rejected")
+    errors: list[IngestError] = Field(
+        default_factory=list, description="The first INGEST_MAX_ERRORS rejected records"
+    )
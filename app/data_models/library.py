@@ -5,7 +5,11 @@ from app.data_models.metadata import LibraryMetadata
 class LibraryBase(BaseModel):
     title: str = Field(..., description="Title of the library")
     description: str|None = Field(default=None, description="Description of the library")
-    index_type: str|None = Field(default=None, description="Type of index to use (flat, ivf or hnsw)")
+    index_type: str|None = Field(default=None, description="Type of index to use (flat, ivf, hnsw, sharded or auto)")
+    metric: str = Field(default="cosine", description="Similarity metric (cosine, inner_product or l2)")
+    index_params: dict = Field(
+        default_factory=dict, description="Build parameters of the index type, e.g. n_shards and shard_type for sharded"
+    )
 
 class LibraryCreate(LibraryBase):
     metadata: LibraryMetadata|None = Field(default=None, description="Library metadata")
@@ -13,7 +17,7 @@ class LibraryCreate(LibraryBase):
 class LibraryUpdate(BaseModel):
     title: str|None = Field(default=None, description="New title for the library")
     description: str|None = Field(default=None, description="New description for the library")
-    index_type: str|None = Field(default=None, description="New index type (flat, ivf or hnsw)")
+    index_type: str|None = Field(default=None, description="New index type (flat, ivf, hnsw, sharded or auto)")
     metadata: LibraryMetadata|None = Field(default=None, description="Updated library metadata")
 
     def get_title(self) -> str|None:
@@ -43,8 +47,14 @@ class Library(BaseModel):
     id: UUID = Field(default_factory=uuid4, description="Unique identifier for the library")
     title: str = Field(..., description="Title of the library")
     description: str|None = Field(default=None, description="Description of the library")
-    index_type: str|None = Field(default=None, description="Type of index to use (flat, ivf or hnsw)")
+    index_type: str|None = Field(default=None, description="Type of index to use (flat, ivf, hnsw, sharded or auto)")
+    metric: str = Field(default="cosine", description="Similarity metric (cosine, inner_product or l2)")
+    index_params: dict = Field(
+        default_factory=dict, description="Build parameters of the index type, e.g. n_shards and shard_type for sharded"
+    )
     index_data: dict = Field(default_factory=dict, description="Index-specific data")
+    index_tuning: dict = Field(default_factory=dict, description="Result of the last index autotuning run")
+    index_version: int = Field(default=0, description="Incremented on every write of the index data")
     documents: list[UUID] = Field(default_factory=list, description="List of document IDs in the library")
     metadata: LibraryMetadata = Field(default_factory=LibraryMetadata, description="Library metadata")
 
@@ -66,6 +76,7 @@ class Library(BaseModel):
         self.index_type = new_index_type
         self.metadata.update_timestamp()
         self.index_data = {}
+        self.index_tuning = {}
 
     def update_index_data(self, new_index_data: dict) -> None:
         self.index_data = new_index_data
@@ -0,0 +1,43 @@
+from datetime import datetime, timezone
+from uuid import UUID, uuid4
+
+from pydantic import BaseModel, Field, computed_field
+
+
+class RebuildJob(BaseModel):
+    """Progress of a background index rebuild."""
+
+    id: UUID = Field(default_factory=uuid4, description="Unique identifier for the job")
+    library_id: UUID = Field(..., description="Library whose index is being rebuilt")
+    index_type: str = Field(..., description="Index type being built")
+    metric: str = Field(default="cosine", description="Similarity metric of the index being built")
+    index_params: dict = Field(default_factory=dict, description="Build parameters of the index being built")
+    status: str = Field(default="pending", description="pending, running, completed or failed")
+    phase: str = Field(default="queued", description="queued, streaming, building, swapping or done")
+    total_vectors: int = Field(default=0, description="Chunk embeddings to index")
+    processed_vectors: int = Field(default=0, description="Chunk embeddings indexed so far")
+    started_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    finished_at: datetime | None = Field(default=None)
+    error: str | None = Field(default=None)
+
+    @computed_field
+    @property
+    def progress(self) -> float:
+        if self.status == "completed":
+            return 1.0
+        if not self.total_vectors:
+            return 0.0
+        return min(1.0, self.processed_vectors / self.total_vectors)
+
+    @computed_field
+    @property
+    def eta_seconds(self) -> float | None:
+        """Remaining time at the rate seen so far, or None when it cannot be estimated."""
+        if self.status != "running" or not self.processed_vectors:
+            return None
+        elapsed = (datetime.now(timezone.utc) - self.started_at).total_seconds()
+        remaining = max(0, self.total_vectors - self.processed_vectors)
+        return elapsed / self.processed_vectors * remaining
+
+    def is_active(self) -> bool:
+        return self.status in ("pending", "running")
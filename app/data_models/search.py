@@ -1,8 +1,114 @@
-from pydantic import BaseModel, Field
+from typing import Any, Literal
+from pydantic import BaseModel, Field, model_validator
 from uuid import UUID
 
-class SearchQuery(BaseModel):
-    """Model for search query."""
+SearchField = Literal["id", "document_id", "text", "metadata", "embedding"]
+SearchMode = Literal["vector", "lexical", "hybrid"]
+FusionMethod = Literal["rrf", "weighted"]
+
+DEFAULT_SEARCH_FIELDS: list[SearchField] = ["id", "document_id", "text", "metadata"]
+
+
+class SearchOptions(BaseModel):
+    """Options shared by every search mode."""
+    k: int = Field(default=10, ge=1, description="Number of results to return")
+    fields: list[SearchField] = Field(
+        default_factory=lambda: list(DEFAULT_SEARCH_FIELDS),
+        description="Chunk fields to return; embeddings are only returned when listed",
+    )
+    include_score: bool = Field(default=True, description="Include the similarity score of each result")
+
+
+class LibrarySearchOptions(SearchOptions):
+    """Options for searching a single library."""
     library_id: UUID = Field(..., description="Search library ID")
+
+
+class RangeSearchOptions(LibrarySearchOptions):
+    """Range and time budget options for searching a single library."""
+    min_score: float | None = Field(
+        default=None,
+        description="Range search: return every chunk scoring at least this much instead of the top k",
+    )
+    max_results: int | None = Field(
+        default=None, ge=1, description="Most results a range search returns; defaults to RANGE_MAX_RESULTS"
+    )
+    timeout_ms: float | None = Field(
+        default=None,
+        gt=0,
+        description="Time budget for the search; when it runs out the best results found so far are returned",
+    )
+
+
+class SearchQuery(RangeSearchOptions):
+    """Model for search query."""
     query: str = Field(..., description="Search query text")
-    k: int = Field(default=10, description="Number of results to return")
\ No newline at end of file
+    mode: SearchMode = Field(
+        default="vector", description="vector (embeddings), lexical (BM25 over chunk text) or hybrid (both, fused)"
+    )
+    fusion: FusionMethod = Field(
+        default="rrf", description="How hybrid mode combines rankings: reciprocal rank fusion or weighted scores"
+    )
+    alpha: float = Field(
+        default=0.5, ge=0, le=1, description="Weight of the vector score in weighted fusion"
+    )
+
+    @model_validator(mode="after")
+    def check_range_mode(self) -> "SearchQuery":
+        if self.min_score is not None and self.mode != "vector":
+            raise ValueError("min_score is only supported in vector mode")
+        return self
+
+
+class VectorSearchQuery(RangeSearchOptions):
+    """Model for search query with a precomputed query embedding."""
+    vector: list[float] = Field(..., description="Query embedding")
+
+
+class SimilarSearchQuery(LibrarySearchOptions):
+    """Model for "more like this" search seeded by existing chunks."""
+    chunk_ids: list[UUID] = Field(..., min_length=1, description="Chunks to find neighbors of")
+
+
+class FederatedSearchQuery(SearchOptions):
+    """Model for a text query searched across several libraries at once."""
+    query: str = Field(..., description="Search query text")
+    library_ids: list[UUID] | None = Field(
+        default=None, description="Libraries to search; all libraries when omitted"
+    )
+
+
+class SearchResult(BaseModel):
+    """A single search hit, shaped by SearchQuery.fields."""
+    id: UUID | None = Field(default=None, description="Chunk ID")
+    document_id: UUID | None = Field(default=None, description="ID of the document the chunk belongs to")
+    text: str | None = Field(default=None, description="Text content of the chunk")
+    metadata: dict[str, Any] | None = Field(default=None, description="Chunk metadata")
+    embedding: list[float] | None = Field(default=None, description="Vector embedding of the chunk text")
+    score: float | None = Field(
+        default=None, description="Similarity, BM25 or fused score between the query and the chunk, depending on mode"
+    )
+    library_id: UUID | None = Field(default=None, description="Library the chunk was found in (federated search)")
+
+
+class SimilarSearchResult(BaseModel):
+    """Neighbors of one seed chunk, excluding the seed itself."""
+    chunk_id: UUID = Field(..., description="Seed chunk ID")
+    results: list[SearchResult] = Field(default_factory=list, description="Nearest neighbors of the seed chunk")
+
+
+class LibrarySearchTiming(BaseModel):
+    """How one library contributed to a federated search."""
+    library_id: UUID = Field(..., description="Library ID")
+    search_ms: float = Field(..., description="Time spent searching the library index, after it was loaded")
+    num_results: int = Field(default=0, description="Hits the library contributed to the merged top-k")
+    min_score: float | None = Field(
+        default=None, description="k-th best score of the libraries searched before it, if any; only hits above it were looked for"
+    )
+    error: str | None = Field(default=None, description="Why the library could not be searched")
+
+
+class FederatedSearchResponse(BaseModel):
+    """Merged top-k across libraries with per-library timings."""
+    results: list[SearchResult] = Field(default_factory=list, description="Global top-k hits")
+    libraries: list[LibrarySearchTiming] = Field(default_factory=list, description="Per-library timings")
@@ -0,0 +1,16 @@
+from pydantic import BaseModel, Field
+
+from app.config import AUTOTUNE_TARGET_RECALL
+
+
+class AutotuneRequest(BaseModel):
+    queries: list[str] | None = Field(
+        default=None, description="Sample query texts; defaults to vectors sampled from the library"
+    )
+    k: int = Field(default=10, ge=1, description="Number of neighbors recall is measured at")
+    target_recall: float = Field(
+        default=AUTOTUNE_TARGET_RECALL, gt=0, le=1, description="Recall@k the chosen parameters must reach"
+    )
+    tune_build: bool = Field(
+        default=True, description="Also sweep build parameters, rebuilding the index if they change"
+    )
@@ -0,0 +1,189 @@
+import logging
+from datetime import datetime, timezone
+from typing import Any
+from uuid import UUID
+
+import numpy as np
+
+from .base_index import BaseIndex
+from .search_budget import SearchBudget
+from .flat_index import FlatIndex
+from .hnsw_index import HNSWIndex
+from .ivf_index import IVFIndex
+from app.config import AUTO_FLAT_MAX_VECTORS, AUTO_HNSW_M, AUTO_MEMORY_BUDGET_MB
+
+logger = logging.getLogger(__name__)
+
+INNER_TYPES: dict[str, type[BaseIndex]] = {"flat": FlatIndex, "ivf": IVFIndex, "hnsw": HNSWIndex}
+
+# Rough per-value costs used to compare index footprints
+BYTES_PER_COMPONENT = 8
+BYTES_PER_EDGE = 16
+
+
+def estimate_memory(index_type: str, n_vectors: int, dimension: int) -> int:
+    """Approximate memory an index of this type needs, in bytes."""
+    vector_bytes = n_vectors * dimension * BYTES_PER_COMPONENT
+    if index_type == "hnsw":
+        # Bottom-layer edges dominate; each link is stored on both ends
+        return vector_bytes + n_vectors * AUTO_HNSW_M * 2 * BYTES_PER_EDGE
+    if index_type == "ivf":
+        # Cluster centers plus one assignment entry per vector
+        n_clusters = max(1, round(n_vectors ** 0.5))
+        return vector_bytes + n_clusters * dimension * BYTES_PER_COMPONENT + n_vectors * BYTES_PER_EDGE
+    return vector_bytes
+
+
+def choose_index_type(current_type: str, n_vectors: int, dimension: int) -> tuple[str, str]:
+    """Pick the index type for a library of this size, with the reason for the choice.
+
+    Small libraries stay flat, since exact search is cheap there. Larger ones use
+    HNSW when its graph fits in the memory budget and IVF otherwise. A library
+    only drops back to flat once it shrinks to half the threshold, so it does not
+    flip between types around the boundary.
+    """
+    flat_limit = AUTO_FLAT_MAX_VECTORS // 2 if current_type != "flat" else AUTO_FLAT_MAX_VECTORS
+    if n_vectors <= flat_limit:
+        return "flat", f"{n_vectors} vectors is within the flat limit of {flat_limit}"
+    budget = AUTO_MEMORY_BUDGET_MB * 1024 * 1024
+    hnsw_bytes = estimate_memory("hnsw", n_vectors, dimension)
+    if hnsw_bytes <= budget:
+        return "hnsw", f"HNSW needs ~{hnsw_bytes // 2**20} MB, within the {AUTO_MEMORY_BUDGET_MB} MB budget"
+    return "ivf", f"HNSW would need ~{hnsw_bytes // 2**20} MB, over the {AUTO_MEMORY_BUDGET_MB} MB budget"
+
+
+def build_inner_index(index_type: str, vectors: dict[UUID, list[float]], metric: str = "cosine") -> BaseIndex:
+    if index_type == "hnsw":
+        index = HNSWIndex(M=AUTO_HNSW_M, metric=metric)
+    elif index_type == "ivf":
+        index = IVFIndex(n_clusters=max(1, round(len(vectors) ** 0.5)), metric=metric)
+    else:
+        index = FlatIndex(metric=metric)
+    index.add_vectors(vectors)
+    return index
+
+
+class AutoIndex(BaseIndex):
+    """Wraps a flat, IVF or HNSW index chosen from the library's size and memory footprint.
+
+    The wrapped index is replaced by IndexService in the background when the
+    library outgrows it; see migration_target.
+    """
+
+    INDEX_TYPE = "auto"
+
+    def __init__(
+        self,
+        index: BaseIndex | None = None,
+        decision: dict[str, Any] | None = None,
+        metric: str = "cosine",
+    ):
+        self.index: BaseIndex = index or FlatIndex(metric=metric)
+        self.metric = self.index.metric
+        self.decision: dict[str, Any] = decision or {}
+
+    @property
+    def current_type(self) -> str:
+        return self.index.INDEX_TYPE
+
+    @property
+    def vectors(self) -> dict[UUID, np.ndarray]:
+        return self.index.vectors
+
+    def num_vectors(self) -> int:
+        return self.index.num_vectors()
+
+    def dimension(self) -> int:
+        return self.index.dimension()
+
+    def migration_target(self) -> tuple[str, str] | None:
+        """The index type the library should move to, with the reason, or None."""
+        target, reason = choose_index_type(self.current_type, self.num_vectors(), self.dimension())
+        return (target, reason) if target != self.current_type else None
+
+    def swap(self, index: BaseIndex, reason: str) -> None:
+        """Replace the wrapped index and record why."""
+        n_vectors = index.num_vectors()
+        dimension = index.dimension()
+        self.decision = {
+            "from_type": self.current_type,
+            "to_type": index.INDEX_TYPE,
+            "reason": reason,
+            "num_vectors": n_vectors,
+            "dimension": dimension,
+            "estimated_memory_bytes": estimate_memory(index.INDEX_TYPE, n_vectors, dimension),
+            "flat_max_vectors": AUTO_FLAT_MAX_VECTORS,
+            "memory_budget_mb": AUTO_MEMORY_BUDGET_MB,
+            "decided_at": datetime.now(timezone.utc).isoformat(),
+        }
+        self.index = index
+        logger.info(f"Auto index switched from {self.decision['from_type']} to {index.INDEX_TYPE}: {reason}")
+
+    def is_exact(self) -> bool:
+        return self.index.is_exact()
+
+    def get_vector(self, vector_id: UUID) -> np.ndarray | None:
+        return self.index.get_vector(vector_id)
+
+    def add_vector(self, chunk_id: UUID, vector: list[float]) -> None:
+        self.index.add_vector(chunk_id, vector)
+
+    def add_vectors(self, vectors: dict[UUID, list[float]]) -> None:
+        self.index.add_vectors(vectors)
+
+    def search_with_scores(
+        self, query_vector: list[float], k: int = 5, budget: SearchBudget | None = None
+    ) -> list[tuple[UUID, float]]:
+        return self.index.search_with_scores(query_vector, k, budget)
+
+    def search_many_with_scores(
+        self, query_vectors: list[list[float]], k: int = 5
+    ) -> list[list[tuple[UUID, float]]]:
+        return self.index.search_many_with_scores(query_vectors, k)
+
+    def range_search(
+        self,
+        query_vector: list[float],
+        min_score: float,
+        max_results: int | None = None,
+        budget: SearchBudget | None = None,
+    ) -> list[tuple[UUID, float]]:
+        return self.index.range_search(query_vector, min_score, max_results, budget)
+
+    def delete_vector(self, chunk_id: UUID) -> None:
+        self.index.delete_vector(chunk_id)
+
+    def delete_vectors(self, chunk_ids: list[UUID]) -> None:
+        self.index.delete_vectors(chunk_ids)
+
+    def get_stats(self) -> dict[str, Any]:
+        pending = self.migration_target()
+        return {
+            "type": "auto",
+            "metric": self.metric,
+            "current_type": self.current_type,
+            "num_vectors": len(self.vectors),
+            "dimension": self.dimension(),
+            "decision": self.decision,
+            "pending_migration": pending[0] if pending else None,
+            "index": self.index.get_stats(),
+        }
+
+    def serialize(self) -> dict[str, Any]:
+        try:
+            return {
+                "type": "auto",
+                "current_type": self.current_type,
+                "decision": self.decision,
+                "index": self.index.serialize(),
+            }
+        except Exception as e:
+            raise ValueError(f"Error serializing auto index: {str(e)}")
+
+    @classmethod
+    def deserialize(cls, data: dict[str, Any]) -> "AutoIndex":
+        try:
+            inner = INNER_TYPES[data["current_type"]].deserialize(data["index"])
+            return cls(index=inner, decision=data.get("decision"))
+        except Exception as e:
+            raise ValueError(f"Error deserializing auto index: {str(e)}")
@@ -0,0 +1,129 @@
+import logging
+import math
+import time
+from typing import Any
+from uuid import UUID
+
+from .base_index import BaseIndex
+from .hnsw_index import HNSWIndex
+from .ivf_index import IVFIndex
+from app.monitoring.recall_monitor import exact_search_many
+
+logger = logging.getLogger(__name__)
+
+TUNABLE_INDEXES: dict[str, type[BaseIndex]] = {"ivf": IVFIndex, "hnsw": HNSWIndex}
+
+# Search-time parameter and the values swept for it, cheapest first
+SEARCH_SWEEPS: dict[str, tuple[str, tuple[int, ...]]] = {
+    "ivf": ("n_probe", (1, 2, 4, 8, 16, 32, 64, 128, 256)),
+}
+
+# Build parameters stored with each index type
+BUILD_PARAMS: dict[str, tuple[str, ...]] = {
+    "ivf": ("n_clusters",),
+    "hnsw": ("M", "ef_construction"),
+}
+
+
+def build_params_of(index: BaseIndex) -> dict[str, Any]:
+    return {name: getattr(index, name) for name in BUILD_PARAMS[index.INDEX_TYPE]}
+
+
+def search_params_of(index: BaseIndex) -> dict[str, Any]:
+    if index.INDEX_TYPE not in SEARCH_SWEEPS:
+        return {}
+    name, _ = SEARCH_SWEEPS[index.INDEX_TYPE]
+    return {name: getattr(index, name)}
+
+
+def build_grid(index_type: str, n_vectors: int) -> list[dict[str, Any]]:
+    """Candidate build parameters for a library of n_vectors, cheapest first."""
+    if index_type == "ivf":
+        root = max(1, round(math.sqrt(n_vectors)))
+        sizes = sorted({max(1, min(n_vectors, size)) for size in (root // 2, root, root * 2)})
+        return [{"n_clusters": size} for size in sizes]
+    if index_type == "hnsw":
+        return [{"M": M, "ef_construction": 5} for M in (8, 16, 32)]
+    raise ValueError(f"Index type {index_type} has no tunable parameters")
+
+
+def build_index(
+    index_type: str, build_params: dict[str, Any], vectors: dict[UUID, list[float]], metric: str = "cosine"
+) -> BaseIndex:
+    index = TUNABLE_INDEXES[index_type](metric=metric, **build_params)
+    index.add_vectors(vectors)
+    return index
+
+
+def _evaluate(
+    index: BaseIndex, queries: list[list[float]], truth: list[list[UUID]], k: int
+) -> tuple[float, float]:
+    """Mean recall@k and mean search latency in milliseconds over the queries."""
+    hits = 0
+    expected = 0
+    start = time.perf_counter()
+    results = index.search_many_with_scores(queries, k)
+    latency_ms = (time.perf_counter() - start) * 1000 / len(queries)
+    for result, exact in zip(results, truth):
+        hits += len({hit_id for hit_id, _ in result} & set(exact))
+        expected += len(exact)
+    return (hits / expected if expected else 1.0), latency_ms
+
+
+def tune_index(
+    candidates: list[BaseIndex],
+    vectors: dict[UUID, list[float]],
+    queries: list[list[float]],
+    k: int,
+    target_recall: float,
+) -> dict[str, Any]:
+    """Find the lowest-latency parameters that reach target_recall on the sample queries.
+
+    Each candidate is an index already built with one set of build parameters. Its
+    search-time parameter, if it has one, is swept from cheapest upwards until the
+    target is met. If no setting meets the target, the one with the best recall wins.
+    """
+    if not queries:
+        raise ValueError("At least one sample query is needed to tune an index")
+    truth = exact_search_many(vectors, queries, k, candidates[0].metric)
+    trials = []
+    best: dict[str, Any] | None = None
+    for index in candidates:
+        if index.INDEX_TYPE in SEARCH_SWEEPS:
+            name, values = SEARCH_SWEEPS[index.INDEX_TYPE]
+            # Probing more clusters than exist is the same as probing all of them
+            limit = getattr(index, "n_clusters", None)
+            if limit is not None:
+                values = [value for value in values if value < limit] + [limit]
+            settings = [{name: value} for value in values]
+        else:
+            settings = [{}]
+        for search_params in settings:
+            for param, value in search_params.items():
+                setattr(index, param, value)
+            recall, latency_ms = _evaluate(index, queries, truth, k)
+            trial = {
+                "build_params": build_params_of(index),
+                "search_params": search_params,
+                "recall": recall,
+                "latency_ms": latency_ms,
+            }
+            trials.append(trial)
+            logger.debug(f"Tuning trial {trial}")
+            if best is None or _better(trial, best, target_recall):
+                best = trial
+            # Larger values of the search parameter only cost more once the target is met
+            if recall >= target_recall:
+                break
+
+    return {**best, "met_target": best["recall"] >= target_recall, "trials": trials}
+
+
+def _better(trial: dict[str, Any], best: dict[str, Any], target_recall: float) -> bool:
+    trial_met = trial["recall"] >= target_recall
+    best_met = best["recall"] >= target_recall
+    if trial_met != best_met:
+        return trial_met
+    if trial_met:
+        return trial["latency_ms"] < best["latency_ms"]
+    return trial["recall"] > best["recall"]
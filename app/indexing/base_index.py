@@ -3,35 +3,95 @@ from typing import Optional, Any
 from uuid import UUID
 import numpy as np
 
+from . import distance
+from .search_budget import SearchBudget
+
 
 class BaseIndex(ABC):
     """Base class for all vector indexing algorithms."""
 
-    def _normalize_vector(self, vector: list[float]) -> list[float]:
-        """Normalize a vector to unit length."""
-        vector = np.array(vector, dtype=np.float32)
-        if np.linalg.norm(vector) == 0:
-            raise ValueError("Vector is zero")
-        normalized_vector = vector / np.linalg.norm(vector)
-        return normalized_vector.tolist()
-
-    def _cosine_similarity(self, a: list[float], b: list[float]) -> float:
-        """Calculate cosine similarity between two vectors."""
-        a_norm = np.linalg.norm(a)
-        b_norm = np.linalg.norm(b)
-        if a_norm == 0 or b_norm == 0:
-            return 0.0
-        return np.dot(a, b) / (a_norm * b_norm)
+    # Name used for the index in metrics and stats
+    INDEX_TYPE: str = ""
+
+    # Similarity metric (see distance.METRICS); set per instance by each index's constructor
+    metric: str = "cosine"
+
+    def _prepare(self, vector: list[float]) -> np.ndarray:
+        """Prepare a vector or query for this index's metric (unit length for cosine)."""
+        return distance.prepare(vector, self.metric)
+
+    def _serialize_vectors(self) -> dict[str, list[float]]:
+        return {str(vector_id): vector.tolist() for vector_id, vector in self.vectors.items()}
+
+    def _deserialize_vectors(self, data: dict[str, Any]) -> dict[UUID, np.ndarray]:
+        # Indexes saved before metrics were stored hold raw cosine vectors, so prepare those
+        prepared = "metric" in data
+        return {
+            UUID(vector_id): np.asarray(vector, dtype=distance.DTYPE) if prepared else self._prepare(vector)
+            for vector_id, vector in data["vectors"].items()
+        }
+
+    def is_exact(self) -> bool:
+        """Whether searches always return the true nearest neighbors."""
+        return False
+
+    def get_vector(self, vector_id: UUID) -> np.ndarray | None:
+        """Return the stored (prepared) vector for an id, or None if the index does not hold it."""
+        return self.vectors.get(vector_id)
+
+    def num_vectors(self) -> int:
+        """Number of vectors the index holds."""
+        return len(self.vectors)
+
+    def dimension(self) -> int:
+        """Dimension of the stored vectors, or 0 while the index is empty."""
+        return len(next(iter(self.vectors.values()))) if self.vectors else 0
 
     @abstractmethod
     def add_vector(self, vector_id: UUID, vector: list[float]) -> None:
         """Add a vector to the index."""
         pass
 
+    def add_vectors(self, vectors: dict[UUID, list[float]]) -> None:
+        """Add many vectors to the index."""
+        for vector_id, vector in vectors.items():
+            self.add_vector(vector_id, vector)
+
+    def delete_vectors(self, vector_ids: list[UUID]) -> None:
+        """Remove many vectors from the index; ids it does not hold are ignored."""
+        for vector_id in vector_ids:
+            self.delete_vector(vector_id)
+
     @abstractmethod
+    def search_with_scores(
+        self, query_vector: list[float], k: int = 5, budget: SearchBudget | None = None
+    ) -> list[tuple[UUID, float]]:
+        """Search for k nearest neighbors, returning (id, similarity) pairs best first.
+
+        With a budget, the best neighbors found before it runs out are returned.
+        """
+        pass
+
+    def search_many_with_scores(
+        self, query_vectors: list[list[float]], k: int = 5
+    ) -> list[list[tuple[UUID, float]]]:
+        """Search for the k nearest neighbors of each query, in query order."""
+        return [self.search_with_scores(query_vector, k) for query_vector in query_vectors]
+
+    def range_search(
+        self,
+        query_vector: list[float],
+        min_score: float,
+        max_results: int | None = None,
+        budget: SearchBudget | None = None,
+    ) -> list[tuple[UUID, float]]:
+        """All vectors scoring at least min_score, best first, at most max_results of them."""
+        limit = max_results or len(self.vectors)
+        return [hit for hit in self.search_with_scores(query_vector, limit, budget) if hit[1] >= min_score]
+
     def search(self, query_vector: list[float], k: int = 5) -> list[UUID]:
         """Search for k nearest neighbors."""
-        pass
+        return [vector_id for vector_id, _ in self.search_with_scores(query_vector, k)]
 
     @abstractmethod
     def delete_vector(self, vector_id: UUID) -> None:
@@ -0,0 +1,210 @@
+import heapq
+import math
+import re
+import threading
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from typing import Any
+from uuid import UUID
+
+from .search_budget import SearchBudget, expired
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# Tombstoned documents are purged from the postings once they make up this share of the index
+COMPACT_RATIO = 0.25
+# Candidates scored between checks of a search's time budget
+BUDGET_CHECK_INTERVAL = 256
+
+
+class BM25Index:
+    """In-memory BM25 inverted index over chunk text.
+
+    Postings are stored as parallel unsigned-int arrays of internal document
+    numbers and term frequencies, in increasing document order, so new documents
+    are appended. Deleted documents are tombstoned and purged by compaction.
+    Top-k search uses MaxScore pruning: lists whose combined score bound cannot
+    lift a document into the current top-k are only probed for documents found
+    through the other lists.
+
+    Writers only ever append to the arrays or tombstone documents in place, and
+    compaction builds new arrays instead of rewriting the old ones. A search
+    therefore holds the lock just long enough to take the query's postings and
+    their current lengths, and scores that snapshot without blocking writers.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.doc_ids: list[UUID | None] = []
+        self.doc_numbers: dict[UUID, int] = {}
+        self.doc_lengths = array("I")
+        self.postings: dict[str, tuple[array, array]] = {}
+        # Highest term frequency seen per term; never lowered, so bounds stay safe after deletes
+        self.max_tf: dict[str, int] = {}
+        self.total_length = 0
+        self.num_deleted = 0
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def tokenize(text: str) -> list[str]:
+        return TOKEN_PATTERN.findall(text.lower())
+
+    def __len__(self) -> int:
+        return len(self.doc_numbers)
+
+    def add_document(self, doc_id: UUID, text: str) -> None:
+        """Index a document, replacing any earlier version of it."""
+        terms = Counter(self.tokenize(text))
+        with self._lock:
+            if doc_id in self.doc_numbers:
+                self._remove(doc_id)
+            number = len(self.doc_ids)
+            self.doc_ids.append(doc_id)
+            self.doc_numbers[doc_id] = number
+            length = sum(terms.values())
+            self.doc_lengths.append(length)
+            self.total_length += length
+            for term, tf in terms.items():
+                if term not in self.postings:
+                    self.postings[term] = (array("I"), array("I"))
+                numbers, tfs = self.postings[term]
+                numbers.append(number)
+                tfs.append(tf)
+                if tf > self.max_tf.get(term, 0):
+                    self.max_tf[term] = tf
+
+    def remove_document(self, doc_id: UUID) -> None:
+        with self._lock:
+            self._remove(doc_id)
+            if self.num_deleted > COMPACT_RATIO * len(self.doc_ids):
+                self._compact()
+
+    def _remove(self, doc_id: UUID) -> None:
+        number = self.doc_numbers.pop(doc_id, None)
+        if number is None:
+            return
+        self.doc_ids[number] = None
+        self.total_length -= self.doc_lengths[number]
+        self.num_deleted += 1
+
+    def _compact(self) -> None:
+        """Renumber live documents and drop tombstones from every postings list."""
+        renumbered = {}
+        doc_ids = []
+        doc_lengths = array("I")
+        for number, doc_id in enumerate(self.doc_ids):
+            if doc_id is not None:
+                renumbered[number] = len(doc_ids)
+                doc_ids.append(doc_id)
+                doc_lengths.append(self.doc_lengths[number])
+        postings = {}
+        for term, (numbers, tfs) in self.postings.items():
+            new_numbers, new_tfs = array("I"), array("I")
+            for number, tf in zip(numbers, tfs):
+                if number in renumbered:
+                    new_numbers.append(renumbered[number])
+                    new_tfs.append(tf)
+            if new_numbers:
+                postings[term] = (new_numbers, new_tfs)
+        self.doc_ids = doc_ids
+        self.doc_numbers = {doc_id: number for number, doc_id in enumerate(doc_ids)}
+        self.doc_lengths = doc_lengths
+        self.postings = postings
+        self.max_tf = {term: self.max_tf[term] for term in postings}
+        self.num_deleted = 0
+
+    def _idf(self, document_frequency: int) -> float:
+        # Postings still hold tombstoned documents until compaction, so df can overshoot slightly
+        n = len(self.doc_numbers)
+        document_frequency = min(document_frequency, n)
+        return math.log(1 + (n - document_frequency + 0.5) / (document_frequency + 0.5))
+
+    def search(self, query: str, k: int = 10, budget: SearchBudget | None = None) -> list[tuple[UUID, float]]:
+        """Top-k documents by BM25 score, best first; the best found so far if the budget runs out."""
+        with self._lock:
+            if k <= 0 or not self.doc_numbers:
+                return []
+            k1, b = self.k1, self.b
+            avgdl = self.total_length / len(self.doc_numbers) or 1.0
+            doc_ids, doc_lengths = self.doc_ids, self.doc_lengths
+            lists = []
+            for term in set(self.tokenize(query)):
+                if term not in self.postings:
+                    continue
+                numbers, tfs = self.postings[term]
+                idf = self._idf(len(numbers))
+                max_tf = self.max_tf[term]
+                # Score bound: highest tf at the shortest possible document length
+                bound = idf * max_tf * (k1 + 1) / (max_tf + k1 * (1 - b))
+                # Entries past the current length are appended later and are not read
+                lists.append([bound, idf, numbers, tfs, 0, len(numbers)])
+        if not lists:
+            return []
+        lists.sort(key=lambda entry: entry[0])
+        # cumulative[i] bounds the score a document can get from lists[0..i]
+        cumulative = []
+        total = 0.0
+        for entry in lists:
+            total += entry[0]
+            cumulative.append(total)
+
+        top: list[tuple[float, int]] = []
+        threshold = 0.0
+        # lists[first_essential:] drive candidate selection; the rest are only probed
+        first_essential = 0
+        scored = 0
+        while first_essential < len(lists):
+            scored += 1
+            if scored % BUDGET_CHECK_INTERVAL == 0 and expired(budget):
+                break
+            candidate = min(
+                (entry[2][entry[4]] for entry in lists[first_essential:] if entry[4] < entry[5]),
+                default=None,
+            )
+            if candidate is None:
+                break
+            length_norm = k1 * (1 - b + b * doc_lengths[candidate] / avgdl)
+            score = 0.0
+            for entry in lists[first_essential:]:
+                numbers, position = entry[2], entry[4]
+                if position < entry[5] and numbers[position] == candidate:
+                    tf = entry[3][position]
+                    score += entry[1] * tf * (k1 + 1) / (tf + length_norm)
+                    entry[4] = position + 1
+            for i in range(first_essential - 1, -1, -1):
+                if score + cumulative[i] <= threshold:
+                    break
+                entry = lists[i]
+                position = bisect_left(entry[2], candidate, entry[4], entry[5])
+                entry[4] = position
+                if position < entry[5] and entry[2][position] == candidate:
+                    tf = entry[3][position]
+                    score += entry[1] * tf * (k1 + 1) / (tf + length_norm)
+            if doc_ids[candidate] is None:
+                continue
+            if len(top) < k:
+                heapq.heappush(top, (score, candidate))
+            elif score > top[0][0]:
+                heapq.heapreplace(top, (score, candidate))
+            else:
+                continue
+            if len(top) == k:
+                threshold = top[0][0]
+                while first_essential < len(lists) and cumulative[first_essential] <= threshold:
+                    first_essential += 1
+        # A document deleted while the search ran is dropped rather than returned
+        hits = [(doc_ids[number], score) for score, number in sorted(top, reverse=True)]
+        return [(doc_id, score) for doc_id, score in hits if doc_id is not None]
+
+    def get_stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "type": "bm25",
+                "num_documents": len(self.doc_numbers),
+                "num_terms": len(self.postings),
+                "num_postings": sum(len(numbers) for numbers, _ in self.postings.values()),
+                "tombstones": self.num_deleted,
+                "avg_document_length": self.total_length / len(self.doc_numbers) if self.doc_numbers else 0.0,
+            }
@@ -0,0 +1,99 @@
+from typing import Iterable, Sequence
+
+import numpy as np
+
+# Vectors are prepared once when they enter an index and queries once per search,
+# so the kernels below never recompute norms: for cosine, preparing normalizes to
+# unit length and the comparison becomes a plain dot product. Scores are always
+# higher-is-better; L2 returns the negated Euclidean distance.
+METRICS = ("cosine", "inner_product", "l2")
+
+DTYPE = np.float32
+
+# Added to score bounds so float32 rounding never prunes a qualifying vector
+BOUND_SLACK = 1e-5
+
+
+def validate_metric(metric: str) -> str:
+    if metric not in METRICS:
+        raise ValueError(f"Unsupported metric: {metric} (expected one of {', '.join(METRICS)})")
+    return metric
+
+
+def prepare(vector: Sequence[float], metric: str) -> np.ndarray:
+    """Convert a vector to the form the metric compares; zero vectors are left as is."""
+    vector = np.asarray(vector, dtype=DTYPE)
+    if metric == "cosine":
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector = vector / norm
+    return vector
+
+
+def prepare_many(vectors: Iterable[Sequence[float]], metric: str) -> np.ndarray:
+    """Stack vectors into an (n, d) matrix prepared for the metric."""
+    matrix = stack(vectors)
+    if metric == "cosine" and len(matrix):
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        matrix = matrix / norms
+    return matrix
+
+
+def stack(vectors: Iterable[Sequence[float]]) -> np.ndarray:
+    matrix = np.asarray(list(vectors), dtype=DTYPE)
+    return matrix.reshape(len(matrix), -1) if matrix.ndim != 2 else matrix
+
+
+def similarity(a: np.ndarray, b: np.ndarray, metric: str) -> float:
+    """Score one pair of prepared vectors."""
+    if metric == "l2":
+        diff = a - b
+        return -float(np.sqrt(diff @ diff))
+    return float(a @ b)
+
+
+def one_to_many(query: np.ndarray, matrix: np.ndarray, metric: str) -> np.ndarray:
+    """Score a prepared query against every row of a prepared (n, d) matrix."""
+    if metric == "l2":
+        diff = matrix - query
+        return -np.sqrt(np.einsum("ij,ij->i", diff, diff))
+    return matrix @ query
+
+
+def many_to_many(queries: np.ndarray, matrix: np.ndarray, metric: str) -> np.ndarray:
+    """Score every prepared query (m, d) against every row of a prepared (n, d) matrix, as (m, n)."""
+    scores = queries @ matrix.T
+    if metric == "l2":
+        # ||q - x||^2 = ||q||^2 + ||x||^2 - 2 q.x, clipped at zero against rounding
+        squared = (
+            np.einsum("ij,ij->i", queries, queries)[:, None]
+            + np.einsum("ij,ij->i", matrix, matrix)[None, :]
+            - 2 * scores
+        )
+        return -np.sqrt(np.maximum(squared, 0))
+    return scores
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Positions of the k highest scores, best first."""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if k < len(scores):
+        top = np.argpartition(-scores, k - 1)[:k]
+    else:
+        top = np.arange(len(scores))
+    return top[np.argsort(-scores[top], kind="stable")]
+
+
+def score_bounds(query: np.ndarray, centers: np.ndarray, radii: np.ndarray, metric: str) -> np.ndarray:
+    """Highest score any vector within radii[i] (Euclidean) of centers[i] can reach against the query."""
+    if metric == "inner_product":
+        # q.x = q.c + q.(x - c) <= q.c + |q| r
+        bounds = centers @ query + np.linalg.norm(query) * radii
+    else:
+        gap = np.maximum(0, np.sqrt(np.einsum("ij,ij->i", centers - query, centers - query)) - radii)
+        # Unit vectors at distance d have cosine 1 - d^2 / 2
+        bounds = 1 - gap ** 2 / 2 if metric == "cosine" else -gap
+    return bounds + BOUND_SLACK
@@ -1,46 +1,111 @@
 from uuid import UUID
+from . import distance
 from .base_index import BaseIndex
+from .search_budget import SearchBudget, expired
+from app.monitoring.metrics import record_index_work
 from typing import Any
 import logging
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
 
 class FlatIndex(BaseIndex):
-    def __init__(self):
-        self.vectors: dict[UUID, list[float]] = {}
+    INDEX_TYPE = "flat"
+
+    # Vectors scored between checks of a search's time budget
+    BLOCK_SIZE = 16384
+
+    def __init__(self, metric: str = "cosine"):
+        self.metric = distance.validate_metric(metric)
+        self.vectors: dict[UUID, np.ndarray] = {}
+        # Ids and stacked vectors, rebuilt on the first search after a change
+        self._matrix: tuple[list[UUID], np.ndarray] | None = None
+
+    def is_exact(self) -> bool:
+        return True
 
     def add_vector(self, chunk_id: UUID, vector: list[float]) -> None:
-        self.vectors[chunk_id] = vector
+        self.vectors[chunk_id] = self._prepare(vector)
+        self._matrix = None
 
     def delete_vector(self, chunk_id: UUID) -> None:
         if chunk_id in self.vectors:
             del self.vectors[chunk_id]
+            self._matrix = None
+
+    def matrix(self) -> tuple[list[UUID], np.ndarray]:
+        if self._matrix is None:
+            ids = list(self.vectors)
+            self._matrix = (ids, distance.stack(self.vectors[vector_id] for vector_id in ids))
+        return self._matrix
+
+    def _score(self, query_vector: list[float], budget: SearchBudget | None) -> tuple[list[UUID], np.ndarray]:
+        """Score the query against the stored vectors in blocks, stopping early if the budget runs out.
+
+        The scores cover a prefix of the returned ids when the scan stopped early.
+        """
+        ids, matrix = self.matrix()
+        query = self._prepare(query_vector)
+        blocks = []
+        for offset in range(0, len(ids), self.BLOCK_SIZE):
+            if blocks and expired(budget):
+                break
+            blocks.append(distance.one_to_many(query, matrix[offset:offset + self.BLOCK_SIZE], self.metric))
+        scores = np.concatenate(blocks)
+        record_index_work(self.INDEX_TYPE, len(scores), len(scores))
+        return ids, scores
 
-    def search(self, query_vector: list[float], k: int = 5) -> list[UUID]:
+    def search_with_scores(
+        self, query_vector: list[float], k: int = 5, budget: SearchBudget | None = None
+    ) -> list[tuple[UUID, float]]:
         if not self.vectors:
             return []
-        similarities = []
-        for chunk_id, vector in self.vectors.items():
-            similarity = self._cosine_similarity(query_vector, vector)
-            similarities.append((chunk_id, similarity))
-        similarities.sort(key=lambda x: x[1], reverse=True)
-        return [vec_id for vec_id, _ in similarities[:k]]
+        ids, scores = self._score(query_vector, budget)
+        return [(ids[i], float(scores[i])) for i in distance.top_k(scores, k)]
+
+    def search_many_with_scores(
+        self, query_vectors: list[list[float]], k: int = 5
+    ) -> list[list[tuple[UUID, float]]]:
+        if not self.vectors:
+            return [[] for _ in query_vectors]
+        ids, matrix = self.matrix()
+        queries = distance.prepare_many(query_vectors, self.metric)
+        scores = distance.many_to_many(queries, matrix, self.metric)
+        for _ in range(len(queries)):
+            record_index_work(self.INDEX_TYPE, len(ids), len(ids))
+        return [
+            [(ids[i], float(row[i])) for i in distance.top_k(row, k)]
+            for row in scores
+        ]
+
+    def range_search(
+        self,
+        query_vector: list[float],
+        min_score: float,
+        max_results: int | None = None,
+        budget: SearchBudget | None = None,
+    ) -> list[tuple[UUID, float]]:
+        if not self.vectors:
+            return []
+        ids, scores = self._score(query_vector, budget)
+        matches = np.flatnonzero(scores >= min_score)
+        order = distance.top_k(scores[matches], max_results or len(matches))
+        return [(ids[matches[i]], float(scores[matches[i]])) for i in order]
 
     def get_stats(self) -> dict[str, any]:
         return {
             "type": "flat",
+            "metric": self.metric,
             "num_vectors": len(self.vectors),
         }
 
     def serialize(self) -> dict[str, any]:
         try:
-            vectors_dict = {
-                str(vector_id): vector for vector_id, vector in self.vectors.items()
-            }
             return {
                 "type": "flat",
-                "vectors": vectors_dict,
+                "metric": self.metric,
+                "vectors": self._serialize_vectors(),
             }
         except Exception as e:
             logger.error(f"Error serializing Flat index: {str(e)}")
@@ -49,8 +114,8 @@ class FlatIndex(BaseIndex):
     @classmethod
     def deserialize(cls, data: dict[str, any]) -> "FlatIndex":
         try:
-            index = cls()
-            index.vectors = {UUID(k): v for k, v in data["vectors"].items()}
+            index = cls(metric=data.get("metric", "cosine"))
+            index.vectors = index._deserialize_vectors(data)
             return index
         except Exception as e:
             logger.error(f"Error deserializing Flat index: {str(e)}")
@@ -4,7 +4,11 @@ import logging
 from uuid import UUID
 import random
 import math
+import heapq
+from . import distance
 from .base_index import BaseIndex
+from .search_budget import SearchBudget, expired
+from app.monitoring.metrics import record_index_work
 
 logger = logging.getLogger(__name__)
 
@@ -13,11 +17,13 @@ class HNSWIndex(BaseIndex):
     """Hierarchical Navigable Small World (HNSW) index for vector similarity search."""
 
     NUM_LAYERS = 10
+    INDEX_TYPE = "hnsw"
 
-    def __init__(self, M: int = 16, ef_construction: int = 5):
+    def __init__(self, M: int = 16, ef_construction: int = 5, metric: str = "cosine"):
         self.M: int = M
         self.ef_construction: int = ef_construction
-        self.vectors: Dict[UUID, list[float]] = {}
+        self.metric = distance.validate_metric(metric)
+        self.vectors: Dict[UUID, np.ndarray] = {}
         self.layers = [{} for _ in range(self.NUM_LAYERS)]
         self.entry_points = [None] * self.NUM_LAYERS
 
@@ -28,36 +34,50 @@ class HNSWIndex(BaseIndex):
 
     def _search_layer(
         self,
-        query_vector: list[float],
+        query_vector: np.ndarray,
         layer: int,
         k: int,
         start_id: Optional[UUID] = None,
+        work: Optional[Dict[str, int]] = None,
+        budget: Optional[SearchBudget] = None,
     ) -> List[Tuple[UUID, float]]:
         if not self.entry_points[layer]:
             return []
         # Start from provided start_id or layer's entry point
         start_id = start_id or self.entry_points[layer]
-        start_similarity = self._cosine_similarity(query_vector, self.vectors[start_id])
+        start_similarity = distance.similarity(query_vector, self.vectors[start_id], self.metric)
         candidates = [(start_id, start_similarity)]
         visited = {start_id}
         result = []
         # Search for k neighbors in the layer
         while candidates:
+            # Always collect k results, so an expired budget still yields a full (if rougher) answer
+            if len(result) >= k and expired(budget):
+                break
             current_id, current_similarity = candidates.pop(0)
             result.append((current_id, current_similarity))
-            # Check all neighbors of current vector
-            for neighbor in self.layers[layer].get(current_id, set()):
-                if neighbor not in visited:
-                    visited.add(neighbor)
-                    similarity = self._cosine_similarity(
-                        query_vector, self.vectors[neighbor]
-                    )
-                    candidates.append((neighbor, similarity))
+            # Score all unvisited neighbors of the current vector in one pass
+            neighbors = [
+                neighbor for neighbor in self.layers[layer].get(current_id, set())
+                if neighbor not in visited
+            ]
+            if not neighbors:
+                continue
+            visited.update(neighbors)
+            similarities = distance.one_to_many(
+                query_vector,
+                distance.stack(self.vectors[neighbor] for neighbor in neighbors),
+                self.metric,
+            )
+            candidates.extend(zip(neighbors, similarities.tolist()))
+        if work is not None:
+            work["visited"] += len(visited)
         # sort candidates by similarity and return top ef
         return sorted(result, key=lambda x: x[1], reverse=True)[:k]
 
     def add_vector(self, chunk_id: UUID, vector: List[float]) -> None:
         try:
+            vector = self._prepare(vector)
             self.vectors[chunk_id] = vector
             layer = self._get_random_layer()
             # Process all layers from bottom to top
@@ -76,35 +96,100 @@ class HNSWIndex(BaseIndex):
         except Exception as e:
             raise ValueError(f"Failed to add HNSW index")
 
-    def search(self, query_vector: List[float], k: int = 3) -> List[UUID]:
+    def search_with_scores(
+        self, query_vector: List[float], k: int = 3, budget: Optional[SearchBudget] = None
+    ) -> List[Tuple[UUID, float]]:
         if not self.vectors:
             return []
+        query_vector = self._prepare(query_vector)
         current_layer = self.NUM_LAYERS - 1
         all_candidates = []
+        work = {"visited": 0}
         try:
             # Start from highest layer's entry point
             current_id = self.entry_points[current_layer]
             # Search through layers with best candidate as entry point
             while current_layer > 0:
                 candidates = self._search_layer(
-                    query_vector, current_layer, self.ef_construction, current_id
+                    query_vector, current_layer, self.ef_construction, current_id, work, budget
                 )
                 if candidates:
                     current_id = candidates[0][0]
                 current_layer -= 1
             # Final search in bottom layer
             bottom_layer_candidates = self._search_layer(
-                query_vector, 0, max(k * 2, 10), current_id
+                query_vector, 0, max(k * 2, 10), current_id, work, budget
             )
             all_candidates.extend(bottom_layer_candidates)
             # Return top k results
             sorted_candidates = sorted(
                 all_candidates, key=lambda x: x[1], reverse=True
             )[:k]
-            return [c[0] for c in sorted_candidates]
+            # Every visited node costs one similarity computation
+            record_index_work(self.INDEX_TYPE, work["visited"], work["visited"])
+            return sorted_candidates
         except Exception as e:
             raise ValueError(f"Failed to search HNSW index")
 
+    def range_search(
+        self,
+        query_vector: List[float],
+        min_score: float,
+        max_results: Optional[int] = None,
+        budget: Optional[SearchBudget] = None,
+    ) -> List[Tuple[UUID, float]]:
+        """Best-first walk of the bottom layer that stops once no frontier node can qualify.
+
+        The walk may pass through up to max(M, ef_construction) nodes below min_score
+        while it is still looking for the first qualifying one.
+        """
+        if not self.vectors:
+            return []
+        query_vector = self._prepare(query_vector)
+        work = {"visited": 0}
+        # Descend the upper layers to an entry point near the query, as top-k search does
+        current_id = self.entry_points[self.NUM_LAYERS - 1]
+        for layer in range(self.NUM_LAYERS - 1, 0, -1):
+            candidates = self._search_layer(query_vector, layer, self.ef_construction, current_id, work, budget)
+            if candidates:
+                current_id = candidates[0][0]
+        start_id = current_id or self.entry_points[0]
+
+        frontier = [(-distance.similarity(query_vector, self.vectors[start_id], self.metric), start_id)]
+        visited = {start_id}
+        # Min-heap of qualifying hits
+        hits: List[Tuple[float, UUID]] = []
+        misses = 0
+        patience = max(self.M, self.ef_construction)
+        while frontier:
+            if len(visited) > 1 and expired(budget):
+                break
+            negated, node = heapq.heappop(frontier)
+            score = -negated
+            if score < min_score:
+                # Frontier is best first, so nothing left can qualify once hits were found
+                if hits or misses >= patience:
+                    break
+                misses += 1
+            elif max_results and len(hits) >= max_results:
+                if score <= hits[0][0]:
+                    break
+                heapq.heapreplace(hits, (score, node))
+            else:
+                heapq.heappush(hits, (score, node))
+            neighbors = [n for n in self.layers[0].get(node, set()) if n not in visited]
+            if not neighbors:
+                continue
+            visited.update(neighbors)
+            scores = distance.one_to_many(
+                query_vector, distance.stack(self.vectors[n] for n in neighbors), self.metric
+            )
+            for neighbor, neighbor_score in zip(neighbors, scores.tolist()):
+                heapq.heappush(frontier, (-neighbor_score, neighbor))
+        work["visited"] += len(visited)
+        record_index_work(self.INDEX_TYPE, work["visited"], work["visited"])
+        return [(node, score) for score, node in sorted(hits, reverse=True)]
+
     def delete_vector(self, chunk_id: UUID) -> None:
         # Remove vector from all layers
         for layer in self.layers:
@@ -126,6 +211,7 @@ class HNSWIndex(BaseIndex):
 
     def get_stats(self) -> Dict[str, Any]:
         return {
+            "metric": self.metric,
             "current_elements": len(self.vectors),
             "M": self.M,
             "ef_construction": self.ef_construction,
@@ -138,9 +224,8 @@ class HNSWIndex(BaseIndex):
     def serialize(self) -> Dict[str, Any]:
         try:
             return {
-                "vectors": {
-                    str(chunk_id): vector for chunk_id, vector in self.vectors.items()
-                },
+                "metric": self.metric,
+                "vectors": self._serialize_vectors(),
                 "layers": [
                     {
                         str(chunk_id): [str(n) for n in neighbors]
@@ -158,10 +243,12 @@ class HNSWIndex(BaseIndex):
     @classmethod
     def deserialize(cls, data: Dict[str, Any]) -> "HNSWIndex":
         try:
-            index = cls(M=data["M"], ef_construction=data["ef_construction"])
-            index.vectors = {
-                UUID(chunk_id): vector for chunk_id, vector in data["vectors"].items()
-            }
+            index = cls(
+                M=data["M"],
+                ef_construction=data["ef_construction"],
+                metric=data.get("metric", "cosine"),
+            )
+            index.vectors = index._deserialize_vectors(data)
             index.layers = [
                 {
                     UUID(chunk_id): {UUID(n) for n in neighbors}
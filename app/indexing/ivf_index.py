@@ -1,8 +1,13 @@
+import heapq
 import logging
 from uuid import UUID
 from collections import defaultdict
 from typing import Any
+import numpy as np
+from . import distance
 from .base_index import BaseIndex
+from .search_budget import SearchBudget, expired
+from app.monitoring.metrics import record_index_work
 
 logger = logging.getLogger(__name__)
 
@@ -10,82 +15,158 @@ logger = logging.getLogger(__name__)
 class IVFIndex(BaseIndex):
     """Inverted File (IVF) index for vector similarity search."""
 
-    def __init__(self, n_clusters: int = 100, n_probe: int = 10):
+    INDEX_TYPE = "ivf"
+
+    # Vectors scored against the cluster centers per batch when assigning clusters
+    ASSIGN_BATCH_SIZE = 4096
+
+    def __init__(self, n_clusters: int = 100, n_probe: int = 10, metric: str = "cosine"):
         self.n_clusters = n_clusters
         self.n_probe = n_probe
-        self.vectors: dict[UUID, list[float]] = {}
-        self.cluster_centers: list[list[float]] = []
+        self.metric = distance.validate_metric(metric)
+        self.vectors: dict[UUID, np.ndarray] = {}
+        self.cluster_centers: np.ndarray = np.empty((0, 0), dtype=distance.DTYPE)
         self.cluster_assignments: dict[int, set[UUID]] = defaultdict(set)
+        # Distance from each center to its farthest member, used to prune clusters in range search
+        self.cluster_radii: np.ndarray = np.empty(0, dtype=distance.DTYPE)
 
     def clear_clusters(self) -> None:
         """Clear and initialize cluster assignments for all clusters."""
         self.cluster_assignments = {i: set() for i in range(self.n_clusters)}
-        self.cluster_centers = []
+        self.cluster_centers = np.empty((0, 0), dtype=distance.DTYPE)
+        self.cluster_radii = np.empty(0, dtype=distance.DTYPE)
 
     def create_clusters(self) -> None:
         self.clear_clusters()
         if not self.vectors:
             return
-        center_ids = list(self.vectors.keys())[
-            : min(len(self.vectors), self.n_clusters)
-        ]
-        self.cluster_centers = [self.vectors[id] for id in center_ids]
-        # Assign vectors to nearest clusters
-        for vid, vector in self.vectors.items():
-            cluster_id = self.get_closest_clusters(vector, n_clusters=1)[0]
-            print(f"Vector {vid} assigned to cluster {cluster_id}")
-            self.cluster_assignments[cluster_id].add(vid)
+        ids = list(self.vectors.keys())
+        self.cluster_centers = distance.stack(
+            self.vectors[id] for id in ids[: min(len(ids), self.n_clusters)]
+        )
+        # Assign vectors to nearest clusters, scoring a batch against all centers at once
+        for offset in range(0, len(ids), self.ASSIGN_BATCH_SIZE):
+            batch = ids[offset:offset + self.ASSIGN_BATCH_SIZE]
+            scores = distance.many_to_many(
+                distance.stack(self.vectors[vid] for vid in batch), self.cluster_centers, self.metric
+            )
+            for vid, cluster_id in zip(batch, scores.argmax(axis=1)):
+                self.cluster_assignments[int(cluster_id)].add(vid)
+        self.cluster_radii = self.compute_radii()
+
+    def compute_radii(self) -> np.ndarray:
+        radii = np.zeros(len(self.cluster_centers), dtype=distance.DTYPE)
+        for cluster_id in range(len(self.cluster_centers)):
+            members = self.cluster_assignments.get(cluster_id)
+            if members:
+                offsets = distance.stack(self.vectors[vid] for vid in members) - self.cluster_centers[cluster_id]
+                radii[cluster_id] = np.sqrt(np.einsum("ij,ij->i", offsets, offsets).max())
+        return radii
 
     def get_closest_clusters(
-        self, vector: list[float], n_clusters: int = 1
+        self, vector: np.ndarray, n_clusters: int = 1
     ) -> list[int]:
-        if not self.cluster_centers:
+        """Closest clusters to an already prepared vector, nearest first."""
+        if not len(self.cluster_centers):
             return [0] if n_clusters == 1 else []
-        similarities = [
-            self._cosine_similarity(vector, center) for center in self.cluster_centers
-        ]
-        sorted_indices = sorted(
-            range(len(similarities)), key=lambda i: similarities[i], reverse=True
-        )
-        return sorted_indices[:n_clusters]
+        scores = distance.one_to_many(vector, self.cluster_centers, self.metric)
+        return distance.top_k(scores, n_clusters).tolist()
 
     def add_vector(self, chunk_id: UUID, vector: list[float]) -> None:
-        vector = self._normalize_vector(vector)
-        self.vectors[chunk_id] = vector
+        self.vectors[chunk_id] = self._prepare(vector)
         # Re-create clusters
         self.create_clusters()
 
-    def binary_insert(self, candidates: list, new_candidate: tuple, k: int) -> list:
-        # Find insertion point using binary search
-        left, right = 0, len(candidates)
-        while left < right:
-            mid = (left + right) // 2
-            if candidates[mid][1] < new_candidate[1]:
-                right = mid
-            else:
-                left = mid + 1
-        candidates.insert(left, new_candidate)
-        # Keep only top k candidates
-        if len(candidates) > k:
-            candidates.pop()
-        return candidates
-
-    def search(self, query_vector: list[float], k: int = 3) -> list[UUID]:
+    def add_vectors(self, vectors: dict[UUID, list[float]]) -> None:
+        for chunk_id, vector in vectors.items():
+            self.vectors[chunk_id] = self._prepare(vector)
+        # Re-create clusters once for the whole batch
+        self.create_clusters()
+
+    def _scan_clusters(
+        self, query: np.ndarray, cluster_ids: list[int], k: int, budget: SearchBudget | None = None
+    ) -> list[tuple[UUID, float]]:
+        """Top k over the given clusters, nearest cluster first; stops early if the budget runs out."""
+        ids = []
+        blocks = []
+        for position, cluster_id in enumerate(cluster_ids):
+            if position and expired(budget):
+                break
+            members = list(self.cluster_assignments[cluster_id])
+            if members:
+                ids.extend(members)
+                blocks.append(distance.one_to_many(
+                    query, distance.stack(self.vectors[vid] for vid in members), self.metric
+                ))
+        record_index_work(self.INDEX_TYPE, len(self.cluster_centers) + len(ids), len(ids))
+        if not ids:
+            return []
+        scores = np.concatenate(blocks)
+        return [(ids[i], float(scores[i])) for i in distance.top_k(scores, k)]
+
+    def search_with_scores(
+        self, query_vector: list[float], k: int = 3, budget: SearchBudget | None = None
+    ) -> list[tuple[UUID, float]]:
         if not self.vectors:
             return []
-        query_vector = self._normalize_vector(query_vector)
-        closest_clusters = self.get_closest_clusters(query_vector, self.n_probe)
-        # Initialize with empty list
-        top_k_candidates = []
-        # Search through vectors in closest clusters
-        for cluster_id in closest_clusters:
-            for vector_id in self.cluster_assignments[cluster_id]:
-                sim = self._cosine_similarity(query_vector, self.vectors[vector_id])
-                top_k_candidates = self.binary_insert(
-                    top_k_candidates, (vector_id, sim), k
-                )
-        # Return just the vector IDs
-        return [c[0] for c in top_k_candidates]
+        query_vector = self._prepare(query_vector)
+        return self._scan_clusters(
+            query_vector, self.get_closest_clusters(query_vector, self.n_probe), k, budget
+        )
+
+    def search_many_with_scores(
+        self, query_vectors: list[list[float]], k: int = 3
+    ) -> list[list[tuple[UUID, float]]]:
+        if not self.vectors or not len(self.cluster_centers):
+            return [[] for _ in query_vectors]
+        queries = distance.prepare_many(query_vectors, self.metric)
+        # Route every query to its clusters with one many-to-many pass over the centers
+        center_scores = distance.many_to_many(queries, self.cluster_centers, self.metric)
+        return [
+            self._scan_clusters(query, distance.top_k(scores, self.n_probe).tolist(), k)
+            for query, scores in zip(queries, center_scores)
+        ]
+
+    def range_search(
+        self,
+        query_vector: list[float],
+        min_score: float,
+        max_results: int | None = None,
+        budget: SearchBudget | None = None,
+    ) -> list[tuple[UUID, float]]:
+        """Scan clusters best bound first, skipping those whose bound falls below min_score.
+
+        Unlike top-k search this ignores n_probe: every cluster that could hold a
+        qualifying vector is scanned, so results are exact.
+        """
+        if not self.vectors or not len(self.cluster_centers):
+            return []
+        query = self._prepare(query_vector)
+        bounds = distance.score_bounds(query, self.cluster_centers, self.cluster_radii, self.metric)
+        # Min-heap of the best hits so far
+        hits: list[tuple[float, UUID]] = []
+        scanned = 0
+        for cluster_id in np.argsort(-bounds):
+            bound = bounds[cluster_id]
+            if bound < min_score:
+                break
+            if max_results and len(hits) >= max_results and bound <= hits[0][0]:
+                break
+            if scanned and expired(budget):
+                break
+            ids = list(self.cluster_assignments[int(cluster_id)])
+            if not ids:
+                continue
+            scanned += len(ids)
+            scores = distance.one_to_many(query, distance.stack(self.vectors[vid] for vid in ids), self.metric)
+            for i in np.flatnonzero(scores >= min_score):
+                hit = (float(scores[i]), ids[i])
+                if not max_results or len(hits) < max_results:
+                    heapq.heappush(hits, hit)
+                elif hit > hits[0]:
+                    heapq.heapreplace(hits, hit)
+        record_index_work(self.INDEX_TYPE, len(self.cluster_centers) + scanned, scanned)
+        return [(vid, score) for score, vid in sorted(hits, reverse=True)]
 
     def delete_vector(self, delete_chunk_id: UUID) -> None:
         if delete_chunk_id not in self.vectors:
@@ -99,8 +180,18 @@ class IVFIndex(BaseIndex):
         # Re-create clusters
         self.create_clusters()
 
+    def delete_vectors(self, chunk_ids: list[UUID]) -> None:
+        removed = [chunk_id for chunk_id in chunk_ids if chunk_id in self.vectors]
+        if not removed:
+            return
+        for chunk_id in removed:
+            del self.vectors[chunk_id]
+        # Re-create clusters once for the whole batch
+        self.create_clusters()
+
     def get_stats(self) -> dict[str, Any]:
         return {
+            "metric": self.metric,
             "current_elements": len(self.vectors),
             "n_clusters": self.n_clusters,
             "n_probe": self.n_probe,
@@ -112,8 +203,10 @@ class IVFIndex(BaseIndex):
     def serialize(self) -> dict[str, Any]:
         try:
             return {
-                "vectors": {str(vid): vec for vid, vec in self.vectors.items()},
-                "cluster_centers": self.cluster_centers,
+                "metric": self.metric,
+                "vectors": self._serialize_vectors(),
+                "cluster_centers": self.cluster_centers.tolist(),
+                "cluster_radii": self.cluster_radii.tolist(),
                 "cluster_assignments": {
                     str(cid): [str(v) for v in vecs]
                     for cid, vecs in self.cluster_assignments.items()
@@ -130,13 +223,18 @@ class IVFIndex(BaseIndex):
             index = cls(
                 n_clusters=data["n_clusters"],
                 n_probe=data["n_probe"],
+                metric=data.get("metric", "cosine"),
             )
-            index.vectors = {UUID(vid): vec for vid, vec in data["vectors"].items()}
-            index.cluster_centers = data["cluster_centers"]
+            index.vectors = index._deserialize_vectors(data)
+            index.cluster_centers = distance.stack(data["cluster_centers"])
             index.cluster_assignments = {
                 int(cid): {UUID(v) for v in vecs}
                 for cid, vecs in data["cluster_assignments"].items()
             }
+            if "cluster_radii" in data:
+                index.cluster_radii = np.asarray(data["cluster_radii"], dtype=distance.DTYPE)
+            else:
+                index.cluster_radii = index.compute_radii()
             return index
         except Exception as e:
             raise ValueError(f"Error deserializing IVF index: {str(e)}")
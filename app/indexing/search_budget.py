@@ -0,0 +1,25 @@
+import time
+
+
+class SearchBudget:
+    """Time budget for one search.
+
+    Indexes check it between units of work (a block of vectors, a cluster, a graph
+    node) and return the best results found so far once it has run out, so a
+    search always does at least one unit of work. Once expired it stays expired,
+    and `exhausted` tells the caller the results are partial.
+    """
+
+    def __init__(self, timeout_ms: float | None = None):
+        self.timeout_ms = timeout_ms
+        self.deadline = time.perf_counter() + timeout_ms / 1000 if timeout_ms else None
+        self.exhausted = False
+
+    def expired(self) -> bool:
+        if not self.exhausted and self.deadline is not None and time.perf_counter() >= self.deadline:
+            self.exhausted = True
+        return self.exhausted
+
+
+def expired(budget: SearchBudget | None) -> bool:
+    return budget is not None and budget.expired()
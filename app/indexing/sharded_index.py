@@ -0,0 +1,229 @@
+import heapq
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import islice
+from typing import Any
+from uuid import UUID
+
+import numpy as np
+
+from . import distance
+from .base_index import BaseIndex
+from .search_budget import SearchBudget
+from .flat_index import FlatIndex
+from .hnsw_index import HNSWIndex
+from .ivf_index import IVFIndex
+
+logger = logging.getLogger(__name__)
+
+SHARD_TYPES: dict[str, type[BaseIndex]] = {"flat": FlatIndex, "ivf": IVFIndex, "hnsw": HNSWIndex}
+
+
+def jump_hash(key: int, n_buckets: int) -> int:
+    """Jump consistent hash: only ~1/n keys move when a bucket is added."""
+    key &= 0xFFFFFFFFFFFFFFFF
+    bucket, candidate = -1, 0
+    while candidate < n_buckets:
+        bucket = candidate
+        key = (key * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+        candidate = int((bucket + 1) * ((1 << 31) / ((key >> 33) + 1)))
+    return bucket
+
+
+def _build_shard(
+    shard_type: str, shard_params: dict[str, Any], metric: str, vectors: dict[UUID, list[float]]
+) -> BaseIndex:
+    """Build one shard in a worker process."""
+    shard = SHARD_TYPES[shard_type](metric=metric, **shard_params)
+    shard.add_vectors(vectors)
+    return shard
+
+
+class ShardedIndex(BaseIndex):
+    """Hash-partitions vectors across N sub-indexes that are built and searched in parallel."""
+
+    INDEX_TYPE = "sharded"
+
+    _executor: ThreadPoolExecutor | None = None
+
+    def __init__(
+        self,
+        shard_type: str = "hnsw",
+        n_shards: int = 4,
+        shard_params: dict[str, Any] | None = None,
+        metric: str = "cosine",
+    ):
+        if shard_type not in SHARD_TYPES:
+            raise ValueError(f"Unsupported shard type: {shard_type}")
+        if n_shards < 1:
+            raise ValueError("n_shards must be at least 1")
+        self.shard_type = shard_type
+        self.n_shards = n_shards
+        self.shard_params = shard_params or {}
+        self.metric = distance.validate_metric(metric)
+        self.shards: list[BaseIndex] = [self._new_shard() for _ in range(n_shards)]
+
+    @classmethod
+    def executor(cls) -> ThreadPoolExecutor:
+        if cls._executor is None:
+            cls._executor = ThreadPoolExecutor(
+                max_workers=os.cpu_count() or 4, thread_name_prefix="index-shard"
+            )
+        return cls._executor
+
+    def _new_shard(self) -> BaseIndex:
+        return SHARD_TYPES[self.shard_type](metric=self.metric, **self.shard_params)
+
+    def shard_of(self, vector_id: UUID) -> int:
+        return jump_hash(vector_id.int, self.n_shards)
+
+    def _partition(self, vectors: dict[UUID, list[float]]) -> list[dict[UUID, list[float]]]:
+        parts = [{} for _ in range(self.n_shards)]
+        for vector_id, vector in vectors.items():
+            parts[self.shard_of(vector_id)][vector_id] = vector
+        return parts
+
+    @property
+    def vectors(self) -> dict[UUID, np.ndarray]:
+        """Every vector, merged from the shards; use num_vectors() when only the count is needed."""
+        vectors = {}
+        for shard in self.shards:
+            vectors.update(shard.vectors)
+        return vectors
+
+    def num_vectors(self) -> int:
+        return sum(shard.num_vectors() for shard in self.shards)
+
+    def dimension(self) -> int:
+        return next((shard.dimension() for shard in self.shards if shard.num_vectors()), 0)
+
+    def is_exact(self) -> bool:
+        return all(shard.is_exact() for shard in self.shards)
+
+    def get_vector(self, vector_id: UUID) -> np.ndarray | None:
+        return self.shards[self.shard_of(vector_id)].get_vector(vector_id)
+
+    def add_vector(self, chunk_id: UUID, vector: list[float]) -> None:
+        self.shards[self.shard_of(chunk_id)].add_vector(chunk_id, vector)
+
+    def add_vectors(self, vectors: dict[UUID, list[float]]) -> None:
+        parts = self._partition(vectors)
+        list(self.executor().map(
+            lambda shard, part: shard.add_vectors(part) if part else None,
+            self.shards,
+            parts,
+        ))
+
+    def build(self, vectors: dict[UUID, list[float]], processes: int | None = None) -> None:
+        """Rebuild every shard from scratch, one worker process per shard."""
+        parts = self._partition(vectors)
+        with ProcessPoolExecutor(max_workers=processes or min(self.n_shards, os.cpu_count() or 1)) as pool:
+            futures = [
+                pool.submit(_build_shard, self.shard_type, self.shard_params, self.metric, part)
+                for part in parts
+            ]
+            self.shards = [future.result() for future in futures]
+
+    def search_with_scores(
+        self, query_vector: list[float], k: int = 5, budget: SearchBudget | None = None
+    ) -> list[tuple[UUID, float]]:
+        shard_hits = list(self.executor().map(
+            lambda shard: shard.search_with_scores(query_vector, k, budget), self.shards
+        ))
+        # Shard results are sorted best first; merge them lazily and keep the top k
+        return list(islice(heapq.merge(*shard_hits, key=lambda hit: -hit[1]), k))
+
+    def search_many_with_scores(
+        self, query_vectors: list[list[float]], k: int = 5
+    ) -> list[list[tuple[UUID, float]]]:
+        shard_hits = list(self.executor().map(
+            lambda shard: shard.search_many_with_scores(query_vectors, k), self.shards
+        ))
+        return [
+            list(islice(heapq.merge(*per_query, key=lambda hit: -hit[1]), k))
+            for per_query in zip(*shard_hits)
+        ]
+
+    def range_search(
+        self,
+        query_vector: list[float],
+        min_score: float,
+        max_results: int | None = None,
+        budget: SearchBudget | None = None,
+    ) -> list[tuple[UUID, float]]:
+        shard_hits = list(self.executor().map(
+            lambda shard: shard.range_search(query_vector, min_score, max_results, budget), self.shards
+        ))
+        merged = heapq.merge(*shard_hits, key=lambda hit: -hit[1])
+        return list(islice(merged, max_results)) if max_results else list(merged)
+
+    def delete_vector(self, chunk_id: UUID) -> None:
+        self.shards[self.shard_of(chunk_id)].delete_vector(chunk_id)
+
+    def delete_vectors(self, chunk_ids: list[UUID]) -> None:
+        parts = [[] for _ in range(self.n_shards)]
+        for chunk_id in chunk_ids:
+            parts[self.shard_of(chunk_id)].append(chunk_id)
+        for shard, part in zip(self.shards, parts):
+            if part:
+                shard.delete_vectors(part)
+
+    def rebalance(self, n_shards: int) -> None:
+        """Change the shard count, moving only the vectors whose shard changes."""
+        if n_shards < 1:
+            raise ValueError("n_shards must be at least 1")
+        if n_shards == self.n_shards:
+            return
+        old_shards = self.shards
+        self.n_shards = n_shards
+        self.shards = old_shards[:n_shards] + [
+            self._new_shard() for _ in range(n_shards - len(old_shards))
+        ]
+        moved = {}
+        for shard_id, shard in enumerate(old_shards):
+            leaving = [vector_id for vector_id in shard.vectors if self.shard_of(vector_id) != shard_id]
+            moved.update((vector_id, shard.vectors[vector_id]) for vector_id in leaving)
+            # One bulk delete per kept shard, since IVF re-clusters on every delete call
+            if shard_id < n_shards and leaving:
+                shard.delete_vectors(leaving)
+        logger.info(f"Rebalancing to {n_shards} shards moves {len(moved)} vectors")
+        self.add_vectors(moved)
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            "type": "sharded",
+            "metric": self.metric,
+            "shard_type": self.shard_type,
+            "n_shards": self.n_shards,
+            "current_elements": self.num_vectors(),
+            "shards": [shard.get_stats() for shard in self.shards],
+        }
+
+    def serialize(self) -> dict[str, Any]:
+        try:
+            return {
+                "type": "sharded",
+                "metric": self.metric,
+                "shard_type": self.shard_type,
+                "n_shards": self.n_shards,
+                "shard_params": self.shard_params,
+                "shards": [shard.serialize() for shard in self.shards],
+            }
+        except Exception as e:
+            raise ValueError(f"Error serializing sharded index: {str(e)}")
+
+    @classmethod
+    def deserialize(cls, data: dict[str, Any]) -> "ShardedIndex":
+        try:
+            index = cls(
+                shard_type=data["shard_type"],
+                n_shards=data["n_shards"],
+                shard_params=data.get("shard_params"),
+                metric=data.get("metric", "cosine"),
+            )
+            shard_class = SHARD_TYPES[index.shard_type]
+            index.shards = [shard_class.deserialize(shard) for shard in data["shards"]]
+            return index
+        except Exception as e:
+            raise ValueError(f"Error deserializing sharded index: {str(e)}")
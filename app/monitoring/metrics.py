@@ -0,0 +1,102 @@
+from contextvars import ContextVar
+import time
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+from pymongo import monitoring
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+WORK_BUCKETS = (1, 10, 50, 100, 500, 1_000, 5_000, 10_000, 50_000, 100_000, 500_000, 1_000_000)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+HTTP_REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ["method", "route"], buckets=LATENCY_BUCKETS
+)
+SEARCH_LATENCY = Histogram(
+    "vector_search_duration_seconds", "Index search latency", ["library_id", "index_type"], buckets=LATENCY_BUCKETS
+)
+INSERT_LATENCY = Histogram(
+    "vector_insert_duration_seconds", "Index insert latency", ["library_id", "index_type"], buckets=LATENCY_BUCKETS
+)
+DISTANCE_COMPUTATIONS = Histogram(
+    "index_distance_computations", "Distance computations per query", ["index_type"], buckets=WORK_BUCKETS
+)
+NODES_VISITED = Histogram(
+    "index_nodes_visited", "Candidate vectors visited per query", ["index_type"], buckets=WORK_BUCKETS
+)
+PARTIAL_SEARCHES = Counter(
+    "index_partial_searches_total", "Searches that returned partial results when their time budget ran out",
+    ["index_type"],
+)
+EMBEDDING_LATENCY = Histogram(
+    "embedding_request_duration_seconds", "Embedding provider call latency", ["provider"], buckets=LATENCY_BUCKETS
+)
+EMBEDDING_BATCH_SIZE = Histogram(
+    "embedding_batch_size", "Texts per embedding call", ["provider"], buckets=COUNT_BUCKETS
+)
+MONGO_OPERATIONS = Counter(
+    "mongo_operations_total", "MongoDB commands sent", ["command", "status"]
+)
+MONGO_ROUND_TRIPS = Histogram(
+    "mongo_round_trips_per_request", "MongoDB commands per HTTP request", ["route"], buckets=COUNT_BUCKETS
+)
+QUEUE_DEPTH = Gauge(
+    "operation_queue_depth", "Operations waiting or running in the operation queue", ["resource_type"]
+)
+QUEUE_WAIT = Histogram(
+    "operation_queue_wait_seconds", "Time from enqueue to start of execution", ["resource_type"],
+    buckets=LATENCY_BUCKETS,
+)
+RECALL_AT_K = Gauge(
+    "index_recall_at_k", "Rolling recall@k of sampled searches against exact search", ["library_id", "index_type"]
+)
+RECALL_BELOW_TARGET = Gauge(
+    "index_recall_below_target", "1 when a library's rolling recall@k is below the target", ["library_id"]
+)
+RECALL_SAMPLES = Counter(
+    "index_recall_samples_total", "Searches re-run exactly by the recall monitor", ["library_id"]
+)
+STARTUP_PHASE_SECONDS = Gauge(
+    "startup_phase_seconds", "Time spent in each startup phase of this process", ["phase"]
+)
+
+# Mongo commands issued while serving the current request
+_request_round_trips: ContextVar[list[int] | None] = ContextVar("request_round_trips", default=None)
+
+
+def record_index_work(index_type: str, distance_computations: int, nodes_visited: int) -> None:
+    DISTANCE_COMPUTATIONS.labels(index_type).observe(distance_computations)
+    NODES_VISITED.labels(index_type).observe(nodes_visited)
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    """Counts MongoDB round trips, globally and for the request being served."""
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        round_trips = _request_round_trips.get()
+        if round_trips is not None:
+            round_trips[0] += 1
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        MONGO_OPERATIONS.labels(event.command_name, "succeeded").inc()
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        MONGO_OPERATIONS.labels(event.command_name, "failed").inc()
+
+
+async def metrics_middleware(request, call_next):
+    """Record request latency and Mongo round trips per route."""
+    round_trips = [0]
+    token = _request_round_trips.set(round_trips)
+    start = time.perf_counter()
+    try:
+        return await call_next(request)
+    finally:
+        _request_round_trips.reset(token)
+        route = request.scope.get("route")
+        route_path = route.path if route is not None else "unmatched"
+        HTTP_REQUEST_LATENCY.labels(request.method, route_path).observe(time.perf_counter() - start)
+        MONGO_ROUND_TRIPS.labels(route_path).observe(round_trips[0])
+
+
+def render_metrics() -> tuple[bytes, str]:
+    return generate_latest(), CONTENT_TYPE_LATEST
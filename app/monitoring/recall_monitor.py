@@ -0,0 +1,143 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from uuid import UUID
+import logging
+import random
+import threading
+
+from app.config import RECALL_SAMPLE_RATE, RECALL_TARGET, RECALL_WINDOW
+from app.indexing import distance
+from app.indexing.base_index import BaseIndex
+from app.monitoring.metrics import RECALL_AT_K, RECALL_BELOW_TARGET, RECALL_SAMPLES
+
+logger = logging.getLogger(__name__)
+
+# Samples needed before a library can be flagged, so one bad query does not raise it
+MIN_SAMPLES = 20
+# Samples waiting for the background worker; further samples are dropped
+MAX_PENDING = 64
+# Queries scored together by exact_search_many
+EXACT_QUERY_BATCH = 32
+
+
+def exact_search_many(
+    vectors: dict[UUID, list[float]], query_vectors: list[list[float]], k: int, metric: str = "cosine"
+) -> list[list[UUID]]:
+    """Brute-force top-k over every vector for each query, in query order."""
+    if not vectors or k <= 0:
+        return [[] for _ in query_vectors]
+    ids = list(vectors)
+    matrix = distance.prepare_many((vectors[vector_id] for vector_id in ids), metric)
+    results = []
+    # Bound the (queries x vectors) score matrix by scoring queries a batch at a time
+    for offset in range(0, len(query_vectors), EXACT_QUERY_BATCH):
+        queries = distance.prepare_many(query_vectors[offset:offset + EXACT_QUERY_BATCH], metric)
+        for scores in distance.many_to_many(queries, matrix, metric):
+            results.append([ids[i] for i in distance.top_k(scores, k)])
+    return results
+
+
+def exact_search(
+    vectors: dict[UUID, list[float]], query_vector: list[float], k: int, metric: str = "cosine"
+) -> list[UUID]:
+    """Brute-force top-k over every vector."""
+    return exact_search_many(vectors, [query_vector], k, metric)[0]
+
+
+class RecallMonitor:
+    """Measures the recall of approximate indexes by re-running sampled live searches exactly.
+
+    Sampled searches are re-run by a single background thread so the request that
+    was sampled does not wait for the exact search.
+    """
+
+    def __init__(
+        self,
+        sample_rate: float = RECALL_SAMPLE_RATE,
+        target: float = RECALL_TARGET,
+        window: int = RECALL_WINDOW,
+    ):
+        self.sample_rate = sample_rate
+        self.target = target
+        self.window = window
+        self._recalls: dict[UUID, deque[float]] = {}
+        self._index_types: dict[UUID, str] = {}
+        self._below_target: set[UUID] = set()
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="recall-monitor")
+
+    def observe(
+        self,
+        library_id: UUID,
+        index: BaseIndex,
+        query_vector: list[float],
+        k: int,
+        hits: list[tuple[UUID, float]],
+    ) -> None:
+        """Maybe queue a search for exact re-evaluation; never blocks the caller."""
+        if index.is_exact() or random.random() >= self.sample_rate:
+            return
+        with self._lock:
+            if self._pending >= MAX_PENDING:
+                return
+            self._pending += 1
+        self._executor.submit(self._measure, library_id, index, query_vector, k, [hit_id for hit_id, _ in hits])
+
+    def _measure(
+        self, library_id: UUID, index: BaseIndex, query_vector: list[float], k: int, hit_ids: list[UUID]
+    ) -> None:
+        try:
+            exact = exact_search(index.vectors, query_vector, k, index.metric)
+            if exact:
+                self.record(library_id, index.INDEX_TYPE, len(set(exact) & set(hit_ids)) / len(exact))
+        except Exception as e:
+            logger.error(f"Error measuring recall for library {library_id}: {str(e)}")
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def record(self, library_id: UUID, index_type: str, recall: float) -> None:
+        with self._lock:
+            recalls = self._recalls.setdefault(library_id, deque(maxlen=self.window))
+            recalls.append(recall)
+            self._index_types[library_id] = index_type
+            rolling = sum(recalls) / len(recalls)
+            below = len(recalls) >= MIN_SAMPLES and rolling < self.target
+            newly_below = below and library_id not in self._below_target
+            if below:
+                self._below_target.add(library_id)
+            else:
+                self._below_target.discard(library_id)
+
+        RECALL_SAMPLES.labels(str(library_id)).inc()
+        RECALL_AT_K.labels(str(library_id), index_type).set(rolling)
+        RECALL_BELOW_TARGET.labels(str(library_id)).set(int(below))
+        if newly_below:
+            logger.warning(
+                f"Recall@k for library {library_id} ({index_type}) fell to {rolling:.3f}, "
+                f"below the target of {self.target}"
+            )
+
+    def stats(self, library_id: UUID) -> dict[str, Any]:
+        with self._lock:
+            recalls = list(self._recalls.get(library_id, ()))
+            return {
+                "recall_at_k": sum(recalls) / len(recalls) if recalls else None,
+                "samples": len(recalls),
+                "target": self.target,
+                "below_target": library_id in self._below_target,
+                "index_type": self._index_types.get(library_id),
+            }
+
+    def reset(self, library_id: UUID) -> None:
+        """Forget a library's samples, e.g. after its index is rebuilt."""
+        with self._lock:
+            self._recalls.pop(library_id, None)
+            self._index_types.pop(library_id, None)
+            self._below_target.discard(library_id)
+        RECALL_BELOW_TARGET.labels(str(library_id)).set(0)
+
+
+recall_monitor = RecallMonitor()
@@ -0,0 +1,43 @@
+from contextlib import contextmanager
+from typing import Iterator
+import logging
+import time
+
+from app.monitoring.metrics import STARTUP_PHASE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+class StartupTracker:
+    """Times the phases of application startup and records when the app is ready to serve."""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.phases: dict[str, float] = {}
+        self.ready = False
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.phases[name] = elapsed
+            STARTUP_PHASE_SECONDS.labels(name).set(elapsed)
+            logger.info(f"Startup phase {name} took {elapsed * 1000:.1f} ms")
+
+    def mark_ready(self) -> None:
+        self.ready = True
+        total = time.perf_counter() - self.started_at
+        STARTUP_PHASE_SECONDS.labels("total").set(total)
+        logger.info(f"Ready to serve after {total * 1000:.1f} ms")
+
+    def status(self) -> dict:
+        return {
+            "ready": self.ready,
+            "phases_ms": {name: round(elapsed * 1000, 1) for name, elapsed in self.phases.items()},
+        }
+
+
+startup_tracker = StartupTracker()
@@ -0,0 +1,144 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from pathlib import Path
+import cProfile
+import logging
+import pstats
+import random
+import re
+import threading
+import time
+
+from app.config import PROFILE_DIR, PROFILE_SAMPLE_RATE, PROFILE_THRESHOLD_MS
+
+logger = logging.getLogger(__name__)
+
+# Requests send this header to get their stage timings back in Server-Timing
+TRACE_REQUEST_HEADER = "x-debug-timing"
+
+
+class Trace:
+    """Stage durations collected while serving one request."""
+
+    def __init__(self):
+        self.stages: dict[str, float] = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def server_timing(self, total_seconds: float) -> str:
+        entries = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in self.stages.items()]
+        entries.append(f"total;dur={total_seconds * 1000:.2f}")
+        return ", ".join(entries)
+
+
+class RequestProfile:
+    """The cProfile profilers of one profiled request.
+
+    A profiler only sees the thread that enabled it, so the request's event loop
+    work and each piece of its thread pool work get their own, merged when written.
+    """
+
+    def __init__(self):
+        self.main = cProfile.Profile()
+        self.workers: list[cProfile.Profile] = []
+        self.lock = threading.Lock()
+
+    def stats(self) -> pstats.Stats:
+        stats = pstats.Stats(self.main)
+        with self.lock:
+            for profiler in self.workers:
+                stats.add(profiler)
+        return stats
+
+
+_current_trace: ContextVar[Trace | None] = ContextVar("current_trace", default=None)
+_current_profile: ContextVar[RequestProfile | None] = ContextVar("current_profile", default=None)
+# cProfile can only profile one request at a time per process
+_profiler_lock = threading.Lock()
+
+
+@contextmanager
+def span(name: str):
+    """Time a stage of the current request; a no-op when the request is not traced."""
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(name, time.perf_counter() - start)
+
+
+def profiled(function, *args):
+    """Call function, profiling it into the current request's profile if there is one.
+
+    For work a request hands to a thread pool; run it in a copy of the request's context.
+    """
+    profile = _current_profile.get()
+    if profile is None:
+        return function(*args)
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Python 3.12+ allows one active cProfile profiler per process
+        return function(*args)
+    try:
+        return function(*args)
+    finally:
+        profiler.disable()
+        with profile.lock:
+            profile.workers.append(profiler)
+
+
+def _write_profile(profile: RequestProfile, request, elapsed_ms: float) -> None:
+    route = request.scope.get("route")
+    route_name = re.sub(r"[^A-Za-z0-9]+", "_", route.path if route is not None else request.url.path).strip("_")
+    timestamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+    path = Path(PROFILE_DIR) / f"{timestamp}-{request.method}-{route_name or 'root'}-{elapsed_ms:.0f}ms.prof"
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        profile.stats().dump_stats(str(path))
+        logger.info(f"Wrote profile of slow request to {path}")
+    except OSError as e:
+        logger.error(f"Error writing profile: {str(e)}")
+
+
+async def tracing_middleware(request, call_next):
+    """Trace requests that ask for it and profile a sample of requests.
+
+    Sampled requests are profiled with cProfile, and the profile is kept only when
+    the request took longer than PROFILE_THRESHOLD_MS. Work the request runs through
+    profiled() on a thread pool is included. Profiling is off unless
+    PROFILE_THRESHOLD_MS is set.
+    """
+    trace = Trace() if request.headers.get(TRACE_REQUEST_HEADER) else None
+    token = _current_trace.set(trace)
+    profile = None
+    if (
+        PROFILE_THRESHOLD_MS is not None
+        and random.random() < PROFILE_SAMPLE_RATE
+        and _profiler_lock.acquire(blocking=False)
+    ):
+        profile = RequestProfile()
+        profile.main.enable()
+    profile_token = _current_profile.set(profile)
+    start = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        elapsed = time.perf_counter() - start
+        _current_trace.reset(token)
+        _current_profile.reset(profile_token)
+        if profile is not None:
+            profile.main.disable()
+            _profiler_lock.release()
+            if elapsed * 1000 >= PROFILE_THRESHOLD_MS:
+                _write_profile(profile, request, elapsed * 1000)
+    if trace is not None:
+        response.headers["Server-Timing"] = trace.server_timing(elapsed)
+    return response
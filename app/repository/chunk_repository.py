@@ -1,6 +1,9 @@
+from typing import Any, Iterator
 from uuid import UUID
+from pymongo import ASCENDING, ReplaceOne
 from pymongo.collection import Collection
 from app.data_models.chunk import Chunk, ChunkUpdate
+from app.repository.pagination import fetch_page
 from pymongo.database import Database
 
 class ChunkRepository:
@@ -10,7 +13,7 @@ class ChunkRepository:
         self.db = db
         self.chunks: Collection = self.db.chunks
 
-    def get_chunk(self, chunk_id: UUID) -> Chunk:
+    async def get_chunk(self, chunk_id: UUID) -> Chunk:
         try:
             data = self.chunks.find_one({"_id": chunk_id})
             if not data:
@@ -19,13 +22,115 @@ class ChunkRepository:
         except Exception:
             raise ValueError("Database error: Failed to retrieve chunk")
 
-    def list_chunks(self) -> list[UUID]:
+    async def get_chunks(
+        self, chunk_ids: list[UUID], include_embedding: bool = False
+    ) -> list[Chunk]:
+        """Fetch many chunks in one round trip, preserving the order of chunk_ids."""
+        return self.read_chunks(chunk_ids, include_embedding)
+
+    def read_chunks(self, chunk_ids: list[UUID], include_embedding: bool = False) -> list[Chunk]:
+        """Blocking form of get_chunks, for callers that run it on a worker thread."""
+        if not chunk_ids:
+            return []
+        try:
+            projection = None if include_embedding else {"embedding": 0}
+            records = {
+                record["_id"]: record
+                for record in self.chunks.find({"_id": {"$in": list(chunk_ids)}}, projection)
+            }
+            return [
+                Chunk.from_record(records[chunk_id])
+                for chunk_id in chunk_ids
+                if chunk_id in records
+            ]
+        except Exception:
+            raise ValueError("Database error: Failed to retrieve chunks")
+
+    async def ensure_indexes(self) -> None:
+        """Create the secondary indexes library- and document-scoped chunk queries rely on."""
+        self.chunks.create_index(
+            [("library_id", ASCENDING), ("document_id", ASCENDING), ("metadata.order", ASCENDING)],
+            name="library_document_order",
+        )
+        self.chunks.create_index(
+            [("document_id", ASCENDING), ("metadata.order", ASCENDING)], name="document_order"
+        )
+
+    async def backfill_library_ids(self, document_libraries: dict[UUID, UUID], batch_size: int = 1000) -> int:
+        """Set library_id on chunks saved before chunks carried it; returns how many were updated."""
+        try:
+            by_library: dict[UUID, list[UUID]] = {}
+            for document_id, library_id in document_libraries.items():
+                by_library.setdefault(library_id, []).append(document_id)
+            updated = 0
+            for library_id, document_ids in by_library.items():
+                for start in range(0, len(document_ids), batch_size):
+                    result = self.chunks.update_many(
+                        {"document_id": {"$in": document_ids[start:start + batch_size]}, "library_id": None},
+                        {"$set": {"library_id": library_id}},
+                    )
+                    updated += result.modified_count
+            return updated
+        except Exception as e:
+            raise ValueError(f"Database error: Failed to backfill chunk library IDs: {str(e)}")
+
+    async def has_chunks_without_library(self) -> bool:
+        try:
+            return self.chunks.find_one({"library_id": None}, {"_id": 1}) is not None
+        except Exception as e:
+            raise ValueError(f"Database error: Failed to check chunk library IDs: {str(e)}")
+
+    async def count_chunks(self, library_id: UUID) -> int:
+        try:
+            return self.chunks.count_documents({"library_id": library_id})
+        except Exception:
+            raise ValueError("Database error: Failed to count chunks")
+
+    def iter_embeddings(self, library_id: UUID, batch_size: int = 1000) -> Iterator[dict[UUID, list[float]]]:
+        """Stream the embeddings of the library's chunks, batch_size at a time.
+
+        Synchronous so a worker thread can consume it without holding the event loop.
+        """
+        return self._iter_field(library_id, "embedding", batch_size)
+
+    def iter_texts(self, library_id: UUID, batch_size: int = 1000) -> Iterator[dict[UUID, str]]:
+        """Stream the texts of the library's chunks, batch_size at a time."""
+        return self._iter_field(library_id, "text", batch_size)
+
+    def _iter_field(self, library_id: UUID, field: str, batch_size: int) -> Iterator[dict[UUID, Any]]:
+        try:
+            cursor = self.chunks.find({"library_id": library_id}, {field: 1}).batch_size(batch_size)
+            batch = {}
+            for record in cursor:
+                if record.get(field):
+                    batch[record["_id"]] = record[field]
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = {}
+            if batch:
+                yield batch
+        except Exception as e:
+            raise ValueError(f"Database error: Failed to stream chunk {field}s: {str(e)}")
+
+    async def list_chunks(self, cursor: UUID | None = None, limit: int = 100) -> tuple[list[UUID], UUID | None]:
+        """A page of chunk IDs, read from the _id index alone, and the cursor of the next page."""
         try:
-            return [Chunk(**chunk).get_chunk_id() for chunk in self.chunks.find()]
+            records, next_cursor = fetch_page(self.chunks, {}, cursor, limit, {"_id": 1})
+            return [record["_id"] for record in records], next_cursor
         except Exception:
             raise ValueError("Database error: Failed to list chunks")
 
-    def save_chunk(self, chunk: Chunk) -> Chunk:
+    def iter_chunks(
+        self, library_id: UUID, include_embedding: bool = False, batch_size: int = 1000
+    ) -> Iterator[dict[str, Any]]:
+        """Stream a library's chunk records, without embeddings unless asked."""
+        try:
+            projection = None if include_embedding else {"embedding": 0}
+            yield from self.chunks.find({"library_id": library_id}, projection).batch_size(batch_size)
+        except Exception as e:
+            raise ValueError(f"Database error: Failed to stream chunks: {str(e)}")
+
+    async def save_chunk(self, chunk: Chunk) -> Chunk:
         try:
             chunk_dict = chunk.model_dump()
             result = self.chunks.update_one(
@@ -37,18 +142,50 @@ class ChunkRepository:
         except Exception:
             raise ValueError("Database error: Failed to save chunk")
 
-    def update_chunk(self, chunk_id: UUID, chunk_update: ChunkUpdate) -> Chunk:
+    async def save_chunks(self, chunks: list[Chunk]) -> int:
+        """Upsert many chunks in one bulk write; returns how many were written."""
+        if not chunks:
+            return 0
+        try:
+            result = self.chunks.bulk_write(
+                [ReplaceOne({"_id": chunk.get_chunk_id()}, chunk.model_dump(), upsert=True) for chunk in chunks],
+                ordered=False,
+            )
+            return result.matched_count + result.upserted_count
+        except Exception as e:
+            raise ValueError(f"Database error: Failed to save chunks: {str(e)}")
+
+    async def update_chunk(self, chunk_id: UUID, chunk_update: ChunkUpdate) -> Chunk:
         try:
-            update_chunk = self.get_chunk(chunk_id)
+            update_chunk = await self.get_chunk(chunk_id)
             if chunk_update.get_text() is not None:
                 update_chunk.update_chunk_text(chunk_update.get_text())
             if chunk_update.get_metadata() is not None:
                 update_chunk.update_metadata(chunk_update.get_metadata())
-            return self.save_chunk(update_chunk)
+            return await self.save_chunk(update_chunk)
         except Exception:
             raise ValueError("Database error: Failed to update chunk")
 
-    def delete_chunk(self, chunk_id: UUID) -> bool:
+    async def list_chunk_ids(self, document_ids: list[UUID]) -> list[UUID]:
+        try:
+            return [record["_id"] for record in self.chunks.find({"document_id": {"$in": list(document_ids)}}, {"_id": 1})]
+        except Exception as e:
+            raise ValueError(f"Database error: Failed to list chunk IDs: {str(e)}")
+
+    async def delete_chunks_by_documents(self, document_ids: list[UUID]) -> int:
+        """Delete every chunk of the documents in one round trip; returns how many were deleted."""
+        try:
+            return self.chunks.delete_many({"document_id": {"$in": list(document_ids)}}).deleted_count
+        except Exception as e:
+            raise ValueError(f"Database error: Failed to delete chunks: {str(e)}")
+
+    async def delete_chunks_by_library(self, library_id: UUID) -> int:
+        try:
+            return self.chunks.delete_many({"library_id": library_id}).deleted_count
+        except Exception as e:
+            raise ValueError(f"Database error: Failed to delete chunks: {str(e)}")
+
+    async def delete_chunk(self, chunk_id: UUID) -> bool:
         try:
             result = self.chunks.delete_one({"_id": chunk_id})
             if result.deleted_count == 0:
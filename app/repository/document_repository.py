@@ -1,10 +1,12 @@
 from uuid import UUID
+from pymongo import ASCENDING, UpdateOne
 from pymongo.collection import Collection
 from pymongo.database import Database
-from typing import List, Optional
+from typing import Any, Iterator, List, Optional
 
 from app.data_models.document import Document
 from app.data_models.metadata import DocumentMetadata
+from app.repository.pagination import fetch_page
 
 
 class DocumentRepository:
@@ -14,6 +16,24 @@ class DocumentRepository:
         self.db = db
         self.documents: Collection = self.db.documents
 
+    async def ensure_indexes(self) -> None:
+        # Also serves keyset pagination of a library's documents, which is ordered by _id
+        self.documents.create_index([("library_id", ASCENDING), ("_id", ASCENDING)], name="library_keyset")
+
+    async def get_document_libraries(self, document_ids: list[UUID] | None = None) -> dict[UUID, UUID]:
+        """Map every document ID, or just the given ones that exist, to its library ID."""
+        try:
+            query = {"_id": {"$in": list(document_ids)}} if document_ids is not None else {}
+            return {record["_id"]: record["library_id"] for record in self.documents.find(query, {"library_id": 1})}
+        except Exception as e:
+            raise ValueError(f"Database error: Failed to list document libraries: {str(e)}")
+
+    async def delete_documents_by_library(self, library_id: UUID) -> int:
+        try:
+            return self.documents.delete_many({"library_id": library_id}).deleted_count
+        except Exception as e:
+            raise ValueError(f"Database error: Failed to delete documents: {str(e)}")
+
     async def get_document(self, document_id: UUID) -> Document | None:
         try:
             data = self.documents.find_one({"_id": document_id})
@@ -23,15 +43,32 @@ class DocumentRepository:
         except Exception as e:
             raise ValueError(f"Database error: Failed to retrieve document: {str(e)}")
 
-    async def list_documents(self, library_id: UUID | None = None) -> List[Document]:
+    async def get_documents(self, document_ids: list[UUID]) -> List[Document]:
+        """Fetch many documents in one round trip, preserving the order of document_ids."""
         try:
-            if library_id is not None:
-                return [Document(**doc) for doc in self.documents.find({"library_id": library_id})]
-            else:
-                return [Document(**doc) for doc in self.documents.find()]
+            records = {record["_id"]: record for record in self.documents.find({"_id": {"$in": list(document_ids)}})}
+            return [Document(**records[document_id]) for document_id in document_ids if document_id in records]
+        except Exception as e:
+            raise ValueError(f"Database error: Failed to retrieve documents: {str(e)}")
+
+    async def list_documents(
+        self, library_id: UUID | None = None, cursor: UUID | None = None, limit: int = 100
+    ) -> tuple[List[Document], UUID | None]:
+        """A page of documents, optionally of one library, and the cursor of the next page."""
+        try:
+            query = {"library_id": library_id} if library_id is not None else {}
+            records, next_cursor = fetch_page(self.documents, query, cursor, limit)
+            return [Document(**record) for record in records], next_cursor
         except Exception as e:
             raise ValueError(f"Database error: Failed to list documents: {str(e)}")
 
+    def iter_documents(self, library_id: UUID, batch_size: int = 1000) -> Iterator[dict[str, Any]]:
+        """Stream a library's document records without their chunk lists."""
+        try:
+            yield from self.documents.find({"library_id": library_id}, {"chunks": 0}).batch_size(batch_size)
+        except Exception as e:
+            raise ValueError(f"Database error: Failed to stream documents: {str(e)}")
+
     async def save_document(self, document: Document) -> Document:
         try:
             document_dict = document.model_dump()
@@ -47,6 +84,28 @@ class DocumentRepository:
         except Exception as e:
             raise ValueError(f"Database error: Failed to save document: {str(e)}")
 
+    async def save_documents(
+        self, documents: list[Document], chunk_ids: dict[UUID, list[UUID]] | None = None
+    ) -> None:
+        """Upsert many documents and append chunk IDs to documents in one bulk write.
+
+        Upserting a document that already exists keeps its chunk list.
+        """
+        operations = []
+        for document in documents:
+            fields = document.model_dump(exclude={"chunks"})
+            operations.append(UpdateOne(
+                {"_id": document.id}, {"$set": fields, "$setOnInsert": {"chunks": []}}, upsert=True
+            ))
+        for document_id, ids in (chunk_ids or {}).items():
+            operations.append(UpdateOne({"_id": document_id}, {"$addToSet": {"chunks": {"$each": ids}}}))
+        if not operations:
+            return
+        try:
+            self.documents.bulk_write(operations)
+        except Exception as e:
+            raise ValueError(f"Database error: Failed to save documents: {str(e)}")
+
     async def update_document(self, document_id: UUID, document_update: dict) -> Document:
         try:
             update_document = await self.get_document(document_id)
@@ -68,6 +127,26 @@ class DocumentRepository:
         except Exception as e:
             raise ValueError(f"Database error: Failed to update document: {str(e)}")
 
+    async def remove_chunk(self, document_id: UUID, chunk_id: UUID) -> None:
+        """Drop a chunk ID from a document's chunk list without rewriting the document."""
+        try:
+            self.documents.update_one({"_id": document_id}, {"$pull": {"chunks": chunk_id}})
+        except Exception as e:
+            raise ValueError(f"Database error: Failed to remove chunk from document: {str(e)}")
+
+    async def list_document_ids(self, library_id: UUID) -> List[UUID]:
+        try:
+            return [record["_id"] for record in self.documents.find({"library_id": library_id}, {"_id": 1})]
+        except Exception as e:
+            raise ValueError(f"Database error: Failed to list document IDs: {str(e)}")
+
+    async def delete_documents(self, document_ids: list[UUID]) -> int:
+        """Delete many documents in one round trip; returns how many were deleted."""
+        try:
+            return self.documents.delete_many({"_id": {"$in": list(document_ids)}}).deleted_count
+        except Exception as e:
+            raise ValueError(f"Database error: Failed to delete documents: {str(e)}")
+
     async def delete_document(self, document_id: UUID) -> bool:
         try:
             result = self.documents.delete_one({"_id": document_id})
@@ -3,9 +3,14 @@ from pymongo.collection import Collection
 from pymongo.database import Database
 import logging
 from app.data_models.library import Library, LibraryUpdate
+from app.repository.pagination import fetch_page
 
 logger = logging.getLogger(__name__)
 
+# Written only by the index methods below, which bump index_version with $inc; save_library
+# sets them on insert alone, so a save from a stale read can never roll the index back
+INDEX_FIELDS = {"index_type", "metric", "index_params", "index_data", "index_tuning", "index_version"}
+
 
 class LibraryRepository:
     """Collection for libraries."""
@@ -14,27 +19,59 @@ class LibraryRepository:
         self.db = db
         self.libraries: Collection = self.db.libraries
 
-    async def get_library(self, library_id: UUID) -> Library | None:
+    async def get_library(self, library_id: UUID, include_index: bool = True) -> Library | None:
+        """The library; with include_index=False its index_data is left unread and empty."""
+        return self.read_library(library_id, include_index)
+
+    def read_library(self, library_id: UUID, include_index: bool = True) -> Library:
+        """Blocking form of get_library, for callers that run it on a worker thread."""
         try:
-            data = self.libraries.find_one({"_id": library_id})
+            projection = None if include_index else {"index_data": 0}
+            data = self.libraries.find_one({"_id": library_id}, projection)
             if not data:
                 raise ValueError(f"Library with ID {library_id} not found")
             return Library(**data)
         except Exception as e:
             raise ValueError(f"Database error: Failed to retrieve library: {str(e)}")
 
+    async def library_exists(self, library_id: UUID) -> bool:
+        try:
+            return self.libraries.find_one({"_id": library_id}, {"_id": 1}) is not None
+        except Exception as e:
+            raise ValueError(f"Database error: Failed to get library: {str(e)}")
+
     async def list_libraries(self) -> list[Library]:
         try:
             return [Library(**library) for library in self.libraries.find()]
         except Exception as e:
             raise ValueError(f"Database error: Failed to list libraries: {str(e)}")
 
+    async def list_library_ids(self) -> list[UUID]:
+        try:
+            return [record["_id"] for record in self.libraries.find({}, {"_id": 1})]
+        except Exception as e:
+            raise ValueError(f"Database error: Failed to list libraries: {str(e)}")
+
+    async def list_library_page(self, cursor: UUID | None, limit: int) -> tuple[list[Library], UUID | None]:
+        """A page of libraries without their index data, and the cursor of the next page."""
+        try:
+            records, next_cursor = fetch_page(
+                self.libraries, {}, cursor, limit, {"index_data": 0, "index_tuning": 0}
+            )
+            return [Library(**record) for record in records], next_cursor
+        except Exception as e:
+            raise ValueError(f"Database error: Failed to list libraries: {str(e)}")
+
     async def save_library(self, library: Library) -> Library:
+        """Create the library, or update its fields other than the index ones."""
         try:
-            library_dict = library.model_dump()
             result = self.libraries.find_one_and_update(
                 {"_id": library.id},
-                {"$set": library_dict},
+                {
+                    "$set": library.model_dump(exclude=INDEX_FIELDS),
+                    "$setOnInsert": library.model_dump(include=INDEX_FIELDS),
+                },
+                projection={"index_data": 0},
                 upsert=True,
                 return_document=True
             )
@@ -46,13 +83,13 @@ class LibraryRepository:
 
     async def update_library(self, library_id: UUID, library_update: LibraryUpdate) -> Library:
         try:
-            update_library = await self.get_library(library_id)
+            update_library = await self.get_library(library_id, include_index=False)
             if library_update.get_title() is not None:
                 update_library.update_library_title(library_update.get_title())
             if library_update.get_description() is not None:
                 update_library.update_library_description(library_update.get_description())
             if library_update.get_index_type() is not None:
-                update_library.update_index_type(library_update.get_index_type())
+                await self.update_index_type(library_id, library_update.get_index_type())
             if library_update.get_metadata() is not None:
                 update_library.update_metadata(library_update.get_metadata())
             return await self.save_library(update_library)
@@ -77,26 +114,66 @@ class LibraryRepository:
         library = await self.get_library(library_id)
         return library.index_data if library else None
 
-    async def update_index_data(self, library_id: UUID, index_data: dict) -> None:
+    async def update_index_data(self, library_id: UUID, index_data: dict) -> int:
+        """Write the index data and return its new index version."""
         try:
             result = self.libraries.find_one_and_update(
                 {"_id": library_id},
-                {"$set": {"index_data": index_data}},
+                {"$set": {"index_data": index_data}, "$inc": {"index_version": 1}},
+                projection={"index_version": 1},
                 return_document=True
             )
             if not result:
                 raise ValueError(f"Library with ID {library_id} not found")
+            return result["index_version"]
         except Exception as e:
             raise ValueError(f"Database error: Failed to update index data: {str(e)}")
 
-    async def update_index_type(self, library_id: UUID, index_type: str) -> None:
+    async def update_index_type(self, library_id: UUID, index_type: str) -> int:
+        """Switch to an empty index of index_type; returns the new index version."""
+        return await self.replace_index(library_id, index_type, {})
+
+    async def update_index_tuning(self, library_id: UUID, index_tuning: dict) -> None:
+        try:
+            result = self.libraries.find_one_and_update(
+                {"_id": library_id},
+                {"$set": {"index_tuning": index_tuning}},
+                return_document=True
+            )
+            if not result:
+                raise ValueError(f"Library with ID {library_id} not found")
+        except Exception as e:
+            raise ValueError(f"Database error: Failed to update index tuning: {str(e)}")
+
+    async def replace_index(
+        self,
+        library_id: UUID,
+        index_type: str,
+        index_data: dict,
+        metric: str | None = None,
+        index_params: dict | None = None,
+    ) -> int:
+        """Swap in a new index type, metric and index data in a single update; returns the new index version.
+
+        The metric is left unchanged when not given; the index parameters are replaced.
+        """
         try:
+            fields = {
+                "index_type": index_type,
+                "index_params": index_params or {},
+                "index_data": index_data,
+                "index_tuning": {},
+            }
+            if metric is not None:
+                fields["metric"] = metric
             result = self.libraries.find_one_and_update(
                 {"_id": library_id},
-                {"$set": {"index_type": index_type}},
+                {"$set": fields, "$inc": {"index_version": 1}},
+                projection={"index_version": 1},
                 return_document=True
             )
             if not result:
                 raise ValueError(f"Library with ID {library_id} not found")
+            return result["index_version"]
         except Exception as e:
-            raise ValueError(f"Database error: Failed to update index type: {str(e)}")
+            raise ValueError(f"Database error: Failed to replace index: {str(e)}")
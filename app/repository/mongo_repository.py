@@ -1,13 +1,42 @@
 from pymongo import MongoClient
 from pymongo.database import Database
 import logging
+import threading
 from app.config import MONGODB_URL, MONGODB_DB_NAME
+from app.monitoring.metrics import MongoCommandListener
 from app.repository.library_repository import LibraryRepository
 from app.repository.document_repository import DocumentRepository
 from app.repository.chunk_repository import ChunkRepository
 
 logger = logging.getLogger(__name__)
 
+# One client (and connection pool) per process, shared by every request's repository
+_client: MongoClient | None = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> MongoClient:
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = MongoClient(
+                    MONGODB_URL,
+                    uuidRepresentation="standard",
+                    event_listeners=[MongoCommandListener()],
+                )
+                logger.info("Connected to MongoDB")
+    return _client
+
+
+def close_client() -> None:
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+            logger.info("Closed MongoDB connection")
+
 
 class MongoRepository:
     """Main repository class that coordinates all other repositories."""
@@ -24,16 +53,22 @@ class MongoRepository:
 
     def _connect(self) -> None:
         try:
-            self.client = MongoClient(MONGODB_URL, uuidRepresentation="standard")
+            self.client = get_client()
             self.db = self.client[MONGODB_DB_NAME]
-            logger.info("Connected to MongoDB")
         except Exception as e:
             logger.error(f"Error connecting to MongoDB: {str(e)}")
             raise
 
+    async def prepare_database(self) -> None:
+        """Create secondary indexes and migrate records written by older versions."""
+        await self.document_repo.ensure_indexes()
+        await self.chunk_repo.ensure_indexes()
+        if await self.chunk_repo.has_chunks_without_library():
+            document_libraries = await self.document_repo.get_document_libraries()
+            updated = await self.chunk_repo.backfill_library_ids(document_libraries)
+            logger.info(f"Set library_id on {updated} chunks")
+
     def close(self) -> None:
-        if self.client:
-            self.client.close()
-            self.client = None
-            self.db = None
-            logger.info("Closed MongoDB connection")
+        """Release this repository; the shared client stays open until close_client()."""
+        self.client = None
+        self.db = None
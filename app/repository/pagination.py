@@ -0,0 +1,24 @@
+from typing import Any
+from uuid import UUID
+
+from pymongo import ASCENDING
+from pymongo.collection import Collection
+
+
+def fetch_page(
+    collection: Collection,
+    query: dict[str, Any],
+    cursor: UUID | None,
+    limit: int,
+    projection: dict[str, Any] | None = None,
+) -> tuple[list[dict], UUID | None]:
+    """One keyset page in _id order: the records after cursor, and the cursor of the next page.
+
+    The next cursor is None on the last page. One extra record is read to tell
+    whether another page follows.
+    """
+    if cursor is not None:
+        query = {**query, "_id": {"$gt": cursor}}
+    records = list(collection.find(query, projection).sort("_id", ASCENDING).limit(limit + 1))
+    next_cursor = records[limit - 1]["_id"] if len(records) > limit else None
+    return records[:limit], next_cursor
@@ -1,19 +1,24 @@
 from uuid import UUID
 from typing import Optional
 
+from app.config import PAGE_SIZE
 from app.data_models.chunk import Chunk, ChunkCreate, ChunkUpdate
 from app.repository.mongo_repository import MongoRepository
+from app.services.index_service import IndexService
+from app.services.lexical_service import LexicalService
 from app.services.queue_manager import QueueManager
 
 class ChunkService:
     def __init__(self, repository: MongoRepository):
         self.chunk_repository = repository.chunk_repo
         self.document_repository = repository.document_repo
+        self.lexical_service = LexicalService(repository)
+        self.index_service = IndexService(repository)
         self.queue_manager = QueueManager()
 
-    def get_chunk(self, chunk_id: UUID) -> Chunk:
+    async def get_chunk(self, chunk_id: UUID) -> Chunk:
         try:
-            return self.queue_manager.enqueue_operation(
+            return await self.queue_manager.enqueue_operation(
                 "chunk",
                 chunk_id,
                 self.chunk_repository.get_chunk,
@@ -22,59 +27,69 @@ class ChunkService:
         except Exception as e:
             raise ValueError("Service error: Failed to queue chunk retrieval") from e
 
-    def list_chunks(self) -> list[Chunk]:
-        return self.chunk_repository.list_chunks()
+    async def list_chunks(self, cursor: UUID | None = None, limit: int = PAGE_SIZE) -> tuple[list[UUID], UUID | None]:
+        """A page of chunk IDs and the cursor of the next page."""
+        return await self.chunk_repository.list_chunks(cursor, limit)
 
-    def create_chunk(self, chunk_create: ChunkCreate) -> Chunk:
+    async def create_chunk(self, chunk_create: ChunkCreate) -> Chunk:
         try:
             chunk = Chunk(
                 text=chunk_create.text,
                 document_id=chunk_create.document_id,
                 metadata=chunk_create.metadata
             )
-            return self.save_chunk(chunk)
+            return await self.save_chunk(chunk)
         except Exception as e:
             raise ValueError("Service error: Failed to create chunk") from e
 
-    def update_chunk(self, chunk_id: UUID, chunk_update: ChunkUpdate) -> Optional[Chunk]:
+    async def update_chunk(self, chunk_id: UUID, chunk_update: ChunkUpdate) -> Optional[Chunk]:
         try:
-            return self.queue_manager.enqueue_operation(
+            chunk = await self.queue_manager.enqueue_operation(
                 "chunk",
                 chunk_id,
                 self.chunk_repository.update_chunk,
                 chunk_id,
                 chunk_update
             )
+            if chunk and chunk_update.get_text() is not None:
+                document = await self.document_repository.get_document(chunk.get_document_id())
+                if document:
+                    self.lexical_service.chunk_saved(document.get_library_id(), chunk.get_chunk_id(), chunk.text)
+            return chunk
         except Exception as e:
             raise ValueError("Service error: Failed to update chunk") from e
 
-    def save_chunk(self, chunk: Chunk) -> Chunk:
+    async def save_chunk(self, chunk: Chunk) -> Chunk:
         try:
-            saved_chunk: Chunk = self.queue_manager.enqueue_operation(
+            document = await self.document_repository.get_document(chunk.get_document_id())
+            if not document:
+                raise ValueError(f"Document with ID {chunk.get_document_id()} not found")
+            chunk.library_id = document.get_library_id()
+            saved_chunk: Chunk = await self.queue_manager.enqueue_operation(
                 "chunk", chunk.get_chunk_id(), self.chunk_repository.save_chunk, chunk
             )
-            document = self.document_repository.get_document(saved_chunk.get_document_id())
-            if not document:
-                raise ValueError(f"Document with ID {saved_chunk.get_document_id()} not found")
             document.add_chunk(saved_chunk.get_chunk_id())
-            self.document_repository.save_document(document)
+            await self.document_repository.save_document(document)
+            self.lexical_service.chunk_saved(document.get_library_id(), saved_chunk.get_chunk_id(), saved_chunk.text)
             return saved_chunk
         except Exception as e:
             raise ValueError("Service error: Failed to save chunk and update document") from e
 
-    def delete_chunk(self, chunk_id: UUID) -> bool:
+    async def delete_chunk(self, chunk_id: UUID) -> bool:
         try:
-            chunk = self.get_chunk(chunk_id)
-            document = self.document_repository.get_document(chunk.get_document_id())
+            chunk = await self.get_chunk(chunk_id)
+            document = await self.document_repository.get_document(chunk.get_document_id())
             if not document:
                 raise ValueError(f"Document with ID {chunk.get_document_id()} not found")
-            document.delete_chunk(chunk_id)
-            self.document_repository.save_document(document)
-            return self.queue_manager.enqueue_operation(
+            await self.index_service.delete_vector(document.get_library_id(), chunk_id)
+            self.lexical_service.chunk_deleted(document.get_library_id(), chunk_id)
+            deleted = await self.queue_manager.enqueue_operation(
                 "chunk",
                 chunk_id,
                 self.chunk_repository.delete_chunk,
                 chunk_id
             )
+            await self.document_repository.remove_chunk(document.id, chunk_id)
+            return deleted
         except Exception as e:
             raise ValueError("Service error: Failed to delete chunk and update document") from e
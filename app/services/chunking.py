@@ -0,0 +1,64 @@
+import re
+
+# Chunks never straddle a markdown heading; the heading's text becomes the section
+# of the chunks under it, and text before the first heading is in the "Body" section
+HEADING_PATTERN = re.compile(r"^\s{0,3}#{1,6}\s+(.+?)\s*#*\s*$")
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+")
+DEFAULT_SECTION = "Body"
+
+CHUNK_UNITS = ("tokens", "sentences")
+
+
+def validate_chunking(chunk_size: int, chunk_overlap: int, unit: str) -> None:
+    if unit not in CHUNK_UNITS:
+        raise ValueError(f"Unsupported chunk unit: {unit} (expected one of {', '.join(CHUNK_UNITS)})")
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    if not 0 <= chunk_overlap < chunk_size:
+        raise ValueError("chunk_overlap must be at least 0 and smaller than chunk_size")
+
+
+def split_sections(content: str) -> list[tuple[str, str]]:
+    """Split content at markdown headings into (section, text) pairs."""
+    sections = []
+    section = DEFAULT_SECTION
+    lines: list[str] = []
+    for line in content.splitlines():
+        heading = HEADING_PATTERN.match(line)
+        if heading:
+            if any(line.strip() for line in lines):
+                sections.append((section, "\n".join(lines)))
+            section = heading.group(1)
+            lines = []
+        else:
+            lines.append(line)
+    if any(line.strip() for line in lines):
+        sections.append((section, "\n".join(lines)))
+    return sections
+
+
+def _windows(units: list[str], size: int, overlap: int, separator: str) -> list[str]:
+    step = size - overlap
+    windows = []
+    for start in range(0, len(units), step):
+        windows.append(separator.join(units[start:start + size]))
+        if start + size >= len(units):
+            break
+    return windows
+
+
+def split_text(content: str, chunk_size: int, chunk_overlap: int, unit: str = "tokens") -> list[tuple[str, str]]:
+    """Split content into overlapping chunks, returned as (section, text) pairs in order.
+
+    Tokens are whitespace-separated words. With unit="sentences", chunk_size and
+    chunk_overlap count sentences instead. A module-level function so it can run
+    in the chunking worker processes.
+    """
+    chunks = []
+    for section, text in split_sections(content):
+        if unit == "sentences":
+            units = [sentence for sentence in SENTENCE_BOUNDARY.split(" ".join(text.split())) if sentence]
+        else:
+            units = text.split()
+        chunks.extend((section, chunk) for chunk in _windows(units, chunk_size, chunk_overlap, " "))
+    return chunks
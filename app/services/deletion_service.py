@@ -0,0 +1,150 @@
+from datetime import datetime, timezone
+from typing import Awaitable, Callable
+from uuid import UUID
+import asyncio
+import logging
+
+from app.data_models.deletion_job import DeletionJob
+from app.monitoring.recall_monitor import recall_monitor
+from app.repository.mongo_repository import MongoRepository
+from app.services import index_service, lexical_service
+from app.services.index_service import IndexService
+from app.services.lexical_service import LexicalService
+from app.services.queue_manager import QueueManager
+
+logger = logging.getLogger(__name__)
+
+# Finished jobs kept for status queries
+MAX_FINISHED_JOBS = 100
+
+_jobs: dict[UUID, DeletionJob] = {}
+_active_jobs: dict[UUID, UUID] = {}
+_job_tasks: dict[UUID, asyncio.Task] = {}
+
+
+class DeletionService:
+    """Cascade deletes of libraries and documents with bulk operations.
+
+    Children go first (index entries and chunks, then documents, then the
+    library), so a delete that fails part way leaves nothing pointing at missing
+    records and can simply be retried. Large deletes can run in the background,
+    with a job to poll for progress.
+    """
+
+    def __init__(self, repository: MongoRepository):
+        self.library_repository = repository.library_repo
+        self.document_repository = repository.document_repo
+        self.chunk_repository = repository.chunk_repo
+        self.index_service = IndexService(repository)
+        self.lexical_service = LexicalService(repository)
+        self.queue_manager = QueueManager()
+
+    def get_job(self, job_id: UUID) -> DeletionJob:
+        if job_id not in _jobs:
+            raise ValueError(f"Deletion job with ID {job_id} not found")
+        return _jobs[job_id]
+
+    async def delete_library(self, library_id: UUID, background: bool = False) -> DeletionJob:
+        return await self._start(
+            DeletionJob(resource_type="library", resource_id=library_id),
+            background,
+            self.library_repository.library_exists,
+        )
+
+    async def delete_document(self, document_id: UUID, background: bool = False) -> DeletionJob:
+        return await self._start(
+            DeletionJob(resource_type="document", resource_id=document_id),
+            background,
+            self.document_repository.get_document,
+        )
+
+    async def _start(
+        self, job: DeletionJob, background: bool, exists: Callable[[UUID], Awaitable[object]]
+    ) -> DeletionJob:
+        # A second delete of a resource already being deleted reports the running job
+        if job.resource_id in _active_jobs:
+            return _jobs[_active_jobs[job.resource_id]]
+        # The resource is claimed before the first await, so concurrent deletes share one job
+        self._register(job)
+        try:
+            found = await exists(job.resource_id)
+        except BaseException:
+            self._unregister(job)
+            raise
+        if not found:
+            self._unregister(job)
+            raise ValueError(f"{job.resource_type.capitalize()} with ID {job.resource_id} not found")
+        operation = self._delete_library if job.resource_type == "library" else self._delete_document
+        if not background:
+            await self._run(job, operation)
+            if job.status == "failed":
+                raise ValueError(f"Failed to delete {job.resource_type}: {job.error}")
+            return job
+        task = asyncio.get_running_loop().create_task(self._run(job, operation))
+        _job_tasks[job.id] = task
+        task.add_done_callback(lambda _: _job_tasks.pop(job.id, None))
+        return job
+
+    def _register(self, job: DeletionJob) -> None:
+        finished = sorted((old for old in _jobs.values() if not old.is_active()), key=lambda old: old.started_at)
+        for old in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del _jobs[old.id]
+        _jobs[job.id] = job
+        _active_jobs[job.resource_id] = job.id
+
+    def _unregister(self, job: DeletionJob) -> None:
+        _jobs.pop(job.id, None)
+        _active_jobs.pop(job.resource_id, None)
+
+    async def _run(self, job: DeletionJob, operation: Callable[[DeletionJob], Awaitable[None]]) -> None:
+        job.status = "running"
+        try:
+            await operation(job)
+            job.status = "completed"
+            job.phase = "done"
+            logger.info(
+                f"Deleted {job.resource_type} {job.resource_id} with {job.deleted_documents} documents "
+                f"and {job.deleted_chunks} chunks in job {job.id}"
+            )
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+            logger.error(f"Deletion job {job.id} for {job.resource_type} {job.resource_id} failed: {str(e)}")
+        finally:
+            job.finished_at = datetime.now(timezone.utc)
+            _active_jobs.pop(job.resource_id, None)
+
+    async def _delete_library(self, job: DeletionJob) -> None:
+        library_id = job.resource_id
+        job.phase = "listing"
+        job.total_documents = len(await self.document_repository.list_document_ids(library_id))
+        job.phase = "chunks"
+        job.deleted_chunks = await self.chunk_repository.delete_chunks_by_library(library_id)
+        job.phase = "documents"
+        job.deleted_documents = await self.document_repository.delete_documents_by_library(library_id)
+        # The index is stored on the library record, so deleting the record drops it whole
+        job.phase = "library"
+        await self.queue_manager.enqueue_operation(
+            "library", library_id, self.library_repository.delete_library, library_id
+        )
+        index_service.drop_index(library_id)
+        lexical_service.drop_library(library_id)
+        recall_monitor.reset(library_id)
+
+    async def _delete_document(self, job: DeletionJob) -> None:
+        document = await self.document_repository.get_document(job.resource_id)
+        if not document:
+            raise ValueError(f"Document with ID {job.resource_id} not found")
+        library_id = document.get_library_id()
+        job.total_documents = 1
+        job.phase = "listing"
+        chunk_ids = await self.chunk_repository.list_chunk_ids([document.id])
+        job.phase = "index"
+        if chunk_ids:
+            await self.index_service.delete_vectors(library_id, chunk_ids)
+        for chunk_id in chunk_ids:
+            self.lexical_service.chunk_deleted(library_id, chunk_id)
+        job.phase = "chunks"
+        job.deleted_chunks = await self.chunk_repository.delete_chunks_by_documents([document.id])
+        job.phase = "documents"
+        job.deleted_documents = await self.document_repository.delete_documents([document.id])
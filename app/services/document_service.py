@@ -1,16 +1,37 @@
+from collections import deque
 from typing import List, Optional
 from uuid import UUID
+import asyncio
+import logging
 
-from app.data_models.document import Document, DocumentCreate, DocumentUpdate
+from app.config import CHUNKING_WORKERS, INGEST_BATCH_SIZE, PAGE_SIZE
+from app.data_models.document import (
+    ChunkingOptions,
+    Document,
+    DocumentBatchCreate,
+    DocumentCreate,
+    DocumentUpdate,
+)
+from app.data_models.deletion_job import DeletionJob
+from app.data_models.ingest import IngestResult
+from app.data_models.metadata import DocumentMetadata
 from app.repository.mongo_repository import MongoRepository
+from app.services.chunking import split_text, validate_chunking
+from app.services.deletion_service import DeletionService
+from app.services.executors import chunking_executor
+from app.services.ingest_service import IngestService
 from app.services.queue_manager import QueueManager
 
+logger = logging.getLogger(__name__)
+
 
 class DocumentService:
     def __init__(self, repository: MongoRepository):
         self.document_repository = repository.document_repo
         self.library_repository = repository.library_repo
         self.chunk_repository = repository.chunk_repo
+        self.ingest_service = IngestService(repository)
+        self.deletion_service = DeletionService(repository)
         self.queue_manager = QueueManager()
 
     async def get_document(self, document_id: UUID) -> Document:
@@ -24,47 +45,158 @@ class DocumentService:
         except Exception as e:
             raise ValueError("Service error: Failed to queue document retrieval") from e
 
-    async def list_documents(self, library_id: UUID | None = None) -> List[Document]:
+    async def list_documents(
+        self, library_id: UUID | None = None, cursor: UUID | None = None, limit: int = PAGE_SIZE
+    ) -> tuple[List[Document], UUID | None]:
+        """A page of documents, optionally of one library, and the cursor of the next page."""
         try:
             if library_id is not None:
-                # Verify library exists
-                library = await self.library_repository.get_library(library_id)
-                if not library:
+                # Verify library exists, without loading its index
+                if not await self.library_repository.library_exists(library_id):
                     raise ValueError(f"Library with ID {library_id} not found")
 
                 return await self.queue_manager.enqueue_operation(
                     "document",
                     library_id,
                     self.document_repository.list_documents,
-                    library_id
+                    library_id,
+                    cursor,
+                    limit
                 )
             else:
                 # List all documents
                 return await self.queue_manager.enqueue_operation(
                     "document",
                     None,
-                    self.document_repository.list_documents
+                    self.document_repository.list_documents,
+                    None,
+                    cursor,
+                    limit
                 )
         except Exception as e:
             raise ValueError(f"Service error: Failed to queue document listing: {str(e)}") from e
 
-    async def create_document(self, document_create: DocumentCreate) -> Document:
-        try:
-            # Verify library exists
-            library = await self.library_repository.get_library(document_create.library_id)
-            if not library:
-                raise ValueError(f"Library with ID {document_create.library_id} not found")
+    async def create_document(
+        self, document_create: DocumentCreate, chunking: ChunkingOptions | None = None
+    ) -> tuple[Document, IngestResult | None]:
+        """Create a document, splitting its content (if any) into embedded, indexed chunks.
 
+        Also returns the result of ingesting the chunks, which lists any that could
+        not be embedded or stored, or None when there was no content.
+        """
+        try:
             document = Document(
                 library_id=document_create.library_id,
                 title=document_create.title,
                 content=document_create.content,
-                metadata=document_create.metadata
+                metadata=document_create.metadata or DocumentMetadata()
             )
-            return await self.save_document(document)
+            # save_document verifies that the library exists
+            document = await self.save_document(document)
+            result = None
+            if document_create.content:
+                result = await self.chunk_documents(
+                    document.library_id, [(document.id, document_create.content)], chunking or ChunkingOptions()
+                )
+                document = await self.document_repository.get_document(document.id)
+            return document, result
         except Exception as e:
             raise ValueError(f"Service error: Failed to create document: {str(e)}") from e
 
+    async def create_documents(self, batch: DocumentBatchCreate) -> List[Document]:
+        """Create many documents at once, splitting their content concurrently."""
+        try:
+            if not await self.library_repository.library_exists(batch.library_id):
+                raise ValueError(f"Library with ID {batch.library_id} not found")
+            documents = [
+                Document(
+                    library_id=batch.library_id,
+                    title=item.title,
+                    metadata=item.metadata or DocumentMetadata()
+                )
+                for item in batch.documents
+            ]
+            await self.document_repository.save_documents(documents)
+            await self.chunk_documents(
+                batch.library_id,
+                [(document.id, item.content) for document, item in zip(documents, batch.documents) if item.content],
+                batch.chunking,
+            )
+            return await self.document_repository.get_documents([document.id for document in documents])
+        except Exception as e:
+            raise ValueError(f"Service error: Failed to create documents: {str(e)}") from e
+
+    async def chunk_documents(
+        self, library_id: UUID, contents: list[tuple[UUID, str]], chunking: ChunkingOptions
+    ) -> IngestResult:
+        """Split document content into chunks and embed, store and index them as one pipeline.
+
+        Up to CHUNKING_WORKERS documents are split at once in worker processes. Their
+        chunks flow through a bounded queue into the bulk ingestion stage, which embeds
+        and writes them in batches, so splitting pauses whenever embedding falls behind.
+        """
+        validate_chunking(chunking.chunk_size, chunking.chunk_overlap, chunking.chunk_unit)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=INGEST_BATCH_SIZE * 2)
+
+        async def split_documents() -> None:
+            loop = asyncio.get_running_loop()
+            remaining = iter(contents)
+            splitting = deque()
+
+            def submit_next() -> None:
+                for document_id, content in remaining:
+                    splitting.append((document_id, loop.run_in_executor(
+                        chunking_executor,
+                        split_text,
+                        content,
+                        chunking.chunk_size,
+                        chunking.chunk_overlap,
+                        chunking.chunk_unit,
+                    )))
+                    return
+
+            try:
+                for _ in range(CHUNKING_WORKERS):
+                    submit_next()
+                record_number = 0
+                while splitting:
+                    document_id, future = splitting.popleft()
+                    pieces = await future
+                    submit_next()
+                    for order, (section, text) in enumerate(pieces):
+                        record_number += 1
+                        await queue.put((record_number, {
+                            "document_id": document_id,
+                            "text": text,
+                            "metadata": {"section": section, "order": order},
+                        }))
+            except Exception:
+                # End the record stream so ingestion finishes and the error surfaces below
+                await queue.put(None)
+                raise
+            finally:
+                for _, future in splitting:
+                    future.cancel()
+            await queue.put(None)
+
+        async def records():
+            while (item := await queue.get()) is not None:
+                yield item
+
+        splitter = asyncio.create_task(split_documents())
+        try:
+            result = await self.ingest_service.ingest(library_id, records())
+        except BaseException:
+            splitter.cancel()
+            raise
+        await splitter
+        if result.error_count:
+            logger.warning(
+                f"{result.error_count} chunks of {len(contents)} documents in library {library_id} "
+                f"were not ingested: {result.errors[0].error}"
+            )
+        return result
+
     async def update_document(self, document_id: UUID, document_update: DocumentUpdate) -> Document:
         try:
             # First get the document to verify it exists
@@ -87,9 +219,8 @@ class DocumentService:
 
     async def save_document(self, document: Document) -> Document:
         try:
-            # Verify library exists
-            library = await self.library_repository.get_library(document.library_id)
-            if not library:
+            # Verify library exists, without loading its index
+            if not await self.library_repository.library_exists(document.library_id):
                 raise ValueError(f"Library with ID {document.library_id} not found")
 
             return await self.queue_manager.enqueue_operation(
@@ -101,13 +232,12 @@ class DocumentService:
         except Exception as e:
             raise ValueError(f"Service error: Failed to save document: {str(e)}") from e
 
-    async def delete_document(self, document_id: UUID) -> bool:
+    async def delete_document(self, document_id: UUID, background: bool = False) -> DeletionJob:
+        """Delete a document with its chunks and their index entries.
+
+        With background, the delete runs as a job and is returned before it finishes.
+        """
         try:
-            return await self.queue_manager.enqueue_operation(
-                "document",
-                document_id,
-                self.document_repository.delete_document,
-                document_id
-            )
+            return await self.deletion_service.delete_document(document_id, background)
         except Exception as e:
-            raise ValueError("Service error: Failed to queue document deletion") from e
+            raise ValueError(f"Service error: Failed to delete document: {str(e)}") from e
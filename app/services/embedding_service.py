@@ -0,0 +1,65 @@
+from typing import Protocol
+import logging
+import threading
+import time
+
+from app.config import COHERE_API_KEY
+from app.monitoring.metrics import EMBEDDING_BATCH_SIZE, EMBEDDING_LATENCY
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_MODEL = "embed-english-v3.0"
+
+
+class Embedder(Protocol):
+    def embed(self, texts: list[str], input_type: str) -> list[list[float]]:
+        ...
+
+
+class CohereEmbedder:
+    """Embeds text with the Cohere API."""
+
+    def __init__(self, client=None, model: str = EMBEDDING_MODEL):
+        if client is None:
+            # Imported here so importing the app does not pay for loading the Cohere SDK
+            import cohere
+            client = cohere.Client(COHERE_API_KEY)
+        self.client = client
+        self.model = model
+
+    def embed(self, texts: list[str], input_type: str) -> list[list[float]]:
+        response = self.client.embed(texts=texts, model=self.model, input_type=input_type)
+        if not response or not response.embeddings:
+            raise ValueError("No embedding generated from Cohere API")
+        return response.embeddings
+
+
+_embedder: Embedder | None = None
+_embedder_lock = threading.Lock()
+
+
+def get_embedder() -> Embedder:
+    """The process-wide embedder, created on first use (or at startup) and then shared."""
+    global _embedder
+    if _embedder is None:
+        with _embedder_lock:
+            if _embedder is None:
+                _embedder = CohereEmbedder()
+    return _embedder
+
+
+def set_embedder(embedder: Embedder | None) -> None:
+    """Replace the process-wide embedder, e.g. with a local model for load tests."""
+    global _embedder
+    _embedder = embedder
+
+
+def embed_texts(texts: list[str], input_type: str = "search_document") -> list[list[float]]:
+    embedder = get_embedder()
+    provider = type(embedder).__name__
+    EMBEDDING_BATCH_SIZE.labels(provider).observe(len(texts))
+    start = time.perf_counter()
+    try:
+        return embedder.embed(texts, input_type)
+    finally:
+        EMBEDDING_LATENCY.labels(provider).observe(time.perf_counter() - start)
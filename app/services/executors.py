@@ -0,0 +1,14 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from app.config import CHUNKING_WORKERS, INDEX_SEARCH_WORKERS
+
+# Shared pool for CPU-bound index work, so one request can search many indexes at once
+index_executor = ThreadPoolExecutor(
+    max_workers=INDEX_SEARCH_WORKERS, thread_name_prefix="index-search"
+)
+# Background builds (tuning, migrations, rebuilds) get their own pool and never starve searches
+build_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="index-build")
+# Index snapshots are written to disk one at a time in the background
+snapshot_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="index-snapshot")
+# Splitting document content is pure Python, so documents are split in parallel worker processes
+chunking_executor = ProcessPoolExecutor(max_workers=CHUNKING_WORKERS)
@@ -1,5 +1,13 @@
 from uuid import UUID
+from datetime import datetime, timezone
+from itertools import islice
+import asyncio
+import contextvars
+import heapq
 import logging
+import random
+import threading
+import time
 
 from app.data_models.library import Library
 from app.repository.mongo_repository import MongoRepository
@@ -8,23 +16,116 @@ from app.indexing.base_index import BaseIndex
 from app.indexing.hnsw_index import HNSWIndex
 from app.indexing.flat_index import FlatIndex
 from app.indexing.ivf_index import IVFIndex
+from app.indexing.sharded_index import ShardedIndex
+from app.indexing.auto_index import AutoIndex, build_inner_index
+from app.indexing import autotuner
+from app.indexing.search_budget import SearchBudget
 from app.data_models.chunk import Chunk
-import cohere
-from app.config import co
+from app.config import (
+    AUTOTUNE_GROWTH_FACTOR,
+    AUTOTUNE_MIN_VECTORS,
+    AUTOTUNE_SAMPLE_QUERIES,
+    AUTOTUNE_TARGET_RECALL,
+    HYBRID_CANDIDATE_FACTOR,
+    RANGE_MAX_RESULTS,
+    WARMUP_CONCURRENCY,
+)
+from app.monitoring.metrics import INSERT_LATENCY, PARTIAL_SEARCHES, SEARCH_LATENCY
+from app.monitoring.recall_monitor import recall_monitor
+from app.monitoring.tracing import profiled, span
+from app.services.embedding_service import embed_texts
+from app.services import index_snapshots
+from app.services.executors import build_executor, index_executor
+from app.services.lexical_service import LexicalService, reciprocal_rank_fusion, weighted_fusion
 
 # Configure logging
 logging.getLogger("httpx").setLevel(logging.WARNING)
 logger = logging.getLogger(__name__)
 
+# Libraries with a tuning run in flight, and the background runs scheduled per library
+_tuning_libraries: set[UUID] = set()
+_tuning_tasks: dict[UUID, asyncio.Task] = {}
+_migration_tasks: dict[UUID, asyncio.Task] = {}
+# Deserialized indexes, reused while the library's index version, type and metric are unchanged
+_index_cache: dict[UUID, tuple[tuple[int, str, str], BaseIndex]] = {}
+
+
+def index_key(library: Library) -> tuple[int, str, str]:
+    return (library.index_version, library.index_type or "flat", library.metric)
+
+
+def check_dimension(index: BaseIndex, query_vector: list[float]) -> None:
+    """Reject a query vector whose dimension differs from the vectors the index holds."""
+    dimension = index.dimension()
+    if dimension and len(query_vector) != dimension:
+        raise ValueError(f"Query vector has {len(query_vector)} dimensions, expected {dimension}")
+
+
+class RunningTopK:
+    """The k best scores found so far by a federated search, shared by its library searches."""
+
+    def __init__(self, k: int):
+        self.k = k
+        self.scores: list[float] = []
+        self.lock = threading.Lock()
+
+    def threshold(self) -> float | None:
+        """The k-th best score so far, or None until k hits have been found."""
+        with self.lock:
+            return self.scores[0] if len(self.scores) >= self.k else None
+
+    def offer(self, hits: list[tuple[UUID, float]]) -> None:
+        """Add a library's hits, sorted best first."""
+        with self.lock:
+            for _, score in hits:
+                if len(self.scores) < self.k:
+                    heapq.heappush(self.scores, score)
+                elif score > self.scores[0]:
+                    heapq.heapreplace(self.scores, score)
+                else:
+                    break
+
+
+def drop_index(library_id: UUID) -> None:
+    _index_cache.pop(library_id, None)
+    index_snapshots.delete_snapshots(library_id)
+
+
+def cache_index(library_id: UUID, index_version: int, index: BaseIndex, snapshot: bool = False) -> None:
+    """Publish an index that was just written as index_version, so searches skip deserializing it.
+
+    Indexes that were built or compacted are also snapshotted to disk (snapshot=True);
+    after smaller writes the snapshot is left to go stale until shutdown.
+    """
+    key = (index_version, index.INDEX_TYPE, index.metric)
+    _index_cache[library_id] = (key, index)
+    if snapshot:
+        index_snapshots.schedule_snapshot(library_id, key, index)
+
+
+def snapshot_cached_indexes() -> int:
+    """Queue snapshots of every cached index newer than its snapshot; returns how many were queued."""
+    queued = 0
+    for library_id, (key, index) in list(_index_cache.items()):
+        queued += index_snapshots.schedule_snapshot(library_id, key, index)
+    return queued
+
 
 class IndexService:
     """Service for managing vector indices."""
 
-    INDEX_TYPES = {"flat": FlatIndex, "ivf": IVFIndex, "hnsw": HNSWIndex}
+    INDEX_TYPES = {
+        "flat": FlatIndex,
+        "ivf": IVFIndex,
+        "hnsw": HNSWIndex,
+        "sharded": ShardedIndex,
+        "auto": AutoIndex,
+    }
 
     def __init__(self, repository: MongoRepository):
         self.library_repository = repository.library_repo
         self.chunk_repository = repository.chunk_repo
+        self.lexical_service = LexicalService(repository)
         self.queue_manager = QueueManager()
 
     def get_index_class(self, index_type: str) -> type[BaseIndex]:
@@ -32,97 +133,724 @@ class IndexService:
             raise ValueError(f"Unsupported index type: {index_type}")
         return self.INDEX_TYPES[index_type]
 
-    def get_index(self, library_id: UUID) -> Library:
-        return self.queue_manager.enqueue_operation(
-            "index",
-            library_id,
-            self.library_repository.get_library,
-            library_id
+    def new_index(self, index_type: str, metric: str, index_params: dict | None = None) -> BaseIndex:
+        """An empty index of index_type, built with a library's index parameters."""
+        index_class = self.get_index_class(index_type)
+        try:
+            return index_class(metric=metric, **(index_params or {}))
+        except TypeError as e:
+            raise ValueError(f"Invalid parameters for a {index_type} index: {str(e)}")
+
+    async def get_index(self, library_id: UUID) -> Library:
+        # Reads skip the library's index queue: writes publish whole records, and
+        # operations holding the queue (rebuild and migration swaps) read through here
+        with span("library_read"):
+            return await self.on_search_pool(self.library_repository.read_library, library_id)
+
+    async def get_library_index(self, library_id: UUID) -> tuple[Library, BaseIndex]:
+        """The library and its index, for read paths.
+
+        The library record is read without its index data, which is only fetched
+        when the index is neither cached nor snapshotted at the library's index
+        version. The returned record's index_data may therefore be empty.
+        """
+        with span("library_read"):
+            library = await self.on_search_pool(self.library_repository.read_library, library_id, False)
+        entry = _index_cache.get(library.id)
+        if entry is not None and entry[0] == index_key(library):
+            return library, entry[1]
+        # Snapshot reads and deserializing are slow enough to keep off the event loop
+        index = await self.on_search_pool(self.cached_index, library)
+        if index is None:
+            with span("library_read"):
+                library = await self.on_search_pool(self.library_repository.read_library, library_id)
+            index = await self.on_search_pool(self.load_index, library)
+        return library, index
+
+    async def on_search_pool(self, function, *args):
+        """Run blocking or CPU-bound work on the search pool, keeping the request's trace context.
+
+        The work is profiled along with the request when the request is profiled.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            index_executor, contextvars.copy_context().run, profiled, function, *args
         )
 
-    def add_vector(self, library_id: UUID, vector_id: UUID, vector: list[float]) -> bool:
-        library = self.get_index(library_id)
-        if not library:
+    def cached_index(self, library: Library) -> BaseIndex | None:
+        """The library's index from memory or its disk snapshot, if either is at the library's index version."""
+        key = index_key(library)
+        entry = _index_cache.get(library.id)
+        if entry is not None and entry[0] == key:
+            return entry[1]
+        with span("index_load"):
+            index = index_snapshots.read_snapshot(library.id, key)
+        if index is not None:
+            _index_cache[library.id] = (key, index)
+        return index
+
+    def load_index(self, library: Library, cached: bool = True) -> BaseIndex:
+        """The library's index, deserialized once per index version.
+
+        The library must have been read with its index data. Searches share the
+        cached instance, so operations that modify an index pass cached=False to
+        work on a private copy, and publish it with cache_index once it is
+        written. Past the in-memory cache, the index comes from its disk snapshot
+        when that is at the library's index version, and is only deserialized
+        from the library's index_data otherwise.
+        """
+        key = index_key(library)
+        if cached:
+            index = self.cached_index(library)
+            if index is not None:
+                return index
+        with span("index_load"):
+            index = None if cached else index_snapshots.read_snapshot(library.id, key)
+            from_snapshot = index is not None
+            if not from_snapshot:
+                if library.index_data:
+                    index = self.get_index_class(library.index_type or "flat").deserialize(library.index_data)
+                else:
+                    index = self.new_index(library.index_type or "flat", library.metric, library.index_params)
+        if cached:
+            _index_cache[library.id] = (key, index)
+            if not from_snapshot and library.index_data:
+                index_snapshots.schedule_snapshot(library.id, key, index)
+        return index
+
+    async def warm_up(self, library_ids: list[UUID] | None = None) -> int:
+        """Load the indexes of the given libraries (all of them by default) into the cache.
+
+        Up to WARMUP_CONCURRENCY indexes are loaded at once on the search pool. The
+        library record is first read without its index data, which is only fetched
+        when the library has no current disk snapshot. Returns the number of indexes
+        loaded; libraries that fail to load are logged and skipped.
+        """
+        if library_ids is None:
+            library_ids = await self.library_repository.list_library_ids()
+        semaphore = asyncio.Semaphore(WARMUP_CONCURRENCY)
+        loop = asyncio.get_running_loop()
+
+        async def warm(library_id: UUID) -> bool:
+            async with semaphore:
+                try:
+                    library = await self.library_repository.get_library(library_id, include_index=False)
+                    if not library:
+                        logger.warning(f"Cannot warm up library {library_id}: not found")
+                        return False
+                    if await loop.run_in_executor(index_executor, self.cached_index, library) is not None:
+                        return True
+                    library = await self.library_repository.get_library(library_id)
+                    await loop.run_in_executor(index_executor, self.load_index, library)
+                    return True
+                except Exception as e:
+                    logger.error(f"Error warming up library {library_id}: {str(e)}")
+                    return False
+
+        return sum(await asyncio.gather(*(warm(library_id) for library_id in library_ids)))
+
+    async def add_vector(self, library_id: UUID, vector_id: UUID, vector: list[float]) -> bool:
+        if not await self.library_repository.library_exists(library_id):
             return False
 
-        def add_vector_operation():
+        async def add_vector_operation():
             try:
-                library.add_vector(vector_id, vector)
-                return self.library_repository.save_library(library)
+                # Re-read inside the queued operation so changes made while queued are not lost
+                current = await self.library_repository.get_library(library_id)
+                index = self.load_index(current, cached=False)
+                start = time.perf_counter()
+                index.add_vector(vector_id, vector)
+                INSERT_LATENCY.labels(str(library_id), index.INDEX_TYPE).observe(time.perf_counter() - start)
+                version = await self.library_repository.update_index_data(library_id, index.serialize())
+                cache_index(library_id, version, index)
+                if self.needs_tuning(current, index.num_vectors()):
+                    self.schedule_autotune(library_id)
+                if isinstance(index, AutoIndex) and index.migration_target():
+                    self.schedule_migration(library_id)
+                return True
             except Exception as e:
                 logger.error(f"Error adding vector: {str(e)}")
                 raise
 
-        return self.queue_manager.enqueue_operation(
+        return await self.queue_manager.enqueue_operation(
             "index",
             library_id,
             add_vector_operation
         )
 
-    def search_vectors(self, library_id: UUID, query_vector: list[float], k: int = 5) -> list[UUID]:
-        library = self.get_index(library_id)
-        if not library:
-            return []
+    async def add_vectors(self, library_id: UUID, vectors: dict[UUID, list[float]]) -> int:
+        """Add a batch of vectors with one index load and one write; returns the index size."""
 
-        return library.search_vectors(query_vector, k)
+        async def add_vectors_operation():
+            current = await self.library_repository.get_library(library_id)
+            if not current:
+                raise ValueError(f"Library with ID {library_id} not found")
+            index = self.load_index(current, cached=False)
+            start = time.perf_counter()
+            # Large batches (HNSW inserts, IVF re-clustering) are built off the event loop
+            await asyncio.get_running_loop().run_in_executor(build_executor, index.add_vectors, vectors)
+            INSERT_LATENCY.labels(str(library_id), index.INDEX_TYPE).observe(time.perf_counter() - start)
+            version = await self.library_repository.update_index_data(library_id, index.serialize())
+            cache_index(library_id, version, index)
+            if self.needs_tuning(current, index.num_vectors()):
+                self.schedule_autotune(library_id)
+            if isinstance(index, AutoIndex) and index.migration_target():
+                self.schedule_migration(library_id)
+            return index.num_vectors()
 
-    def search(self, library_id: UUID, query_text: str, k: int = 3) -> list[Chunk]:
-        try:
-            # Verify library exists
-            if not self.library_repository.get_library(library_id):
-                raise ValueError(f"Library {library_id} not found")
+        return await self.queue_manager.enqueue_operation(
+            "index",
+            library_id,
+            add_vectors_operation
+        )
+
+    async def search_vectors(self, library_id: UUID, query_vector: list[float], k: int = 5) -> list[UUID]:
+        return [
+            vector_id
+            for vector_id, _ in await self.search_vectors_with_scores(library_id, query_vector, k)
+        ]
+
+    async def search_vectors_with_scores(
+        self, library_id: UUID, query_vector: list[float], k: int = 5, budget: SearchBudget | None = None
+    ) -> list[tuple[UUID, float]]:
+        library, index = await self.get_library_index(library_id)
+        return await self.on_search_pool(self.search_index, library, index, query_vector, k, budget)
+
+    def search_index(
+        self,
+        library: Library,
+        index: BaseIndex,
+        query_vector: list[float],
+        k: int,
+        budget: SearchBudget | None = None,
+    ) -> list[tuple[UUID, float]]:
+        check_dimension(index, query_vector)
+        start = time.perf_counter()
+        with span("index_search"):
+            hits = index.search_with_scores(query_vector, k, budget)
+        SEARCH_LATENCY.labels(str(library.id), index.INDEX_TYPE).observe(time.perf_counter() - start)
+        if budget is not None and budget.exhausted:
+            # Cut-short searches would understate the index's recall, so they are not sampled
+            PARTIAL_SEARCHES.labels(index.INDEX_TYPE).inc()
+        else:
+            recall_monitor.observe(library.id, index, query_vector, k, hits)
+        return hits
+
+    def search_index_many(
+        self, library: Library, index: BaseIndex, query_vectors: list[list[float]], k: int
+    ) -> list[list[tuple[UUID, float]]]:
+        start = time.perf_counter()
+        with span("index_search"):
+            all_hits = index.search_many_with_scores(query_vectors, k)
+        elapsed = (time.perf_counter() - start) / max(1, len(query_vectors))
+        for query_vector, hits in zip(query_vectors, all_hits):
+            SEARCH_LATENCY.labels(str(library.id), index.INDEX_TYPE).observe(elapsed)
+            recall_monitor.observe(library.id, index, query_vector, k, hits)
+        return all_hits
 
-            query_embedding = self.generate_query_embedding(query_text)
-            results = self.search_vectors(library_id, query_embedding, k=k)
-            return [self.chunk_repository.get_chunk(chunk_id) for chunk_id in results]
+    async def search(
+        self,
+        library_id: UUID,
+        query_text: str,
+        k: int = 3,
+        include_embedding: bool = False,
+        budget: SearchBudget | None = None,
+    ) -> list[tuple[Chunk, float]]:
+        try:
+            query_embedding = await self.on_search_pool(self.generate_query_embedding, query_text)
+            return await self.search_by_vector(library_id, query_embedding, k, include_embedding, budget)
         except ValueError as e:
             raise ValueError(f"Validation error in search: {str(e)}")
 
-    def delete_vector(self, library_id: UUID, vector_id: UUID) -> bool:
-        library = self.get_index(library_id)
-        if not library:
+    async def search_by_vector(
+        self,
+        library_id: UUID,
+        query_vector: list[float],
+        k: int = 3,
+        include_embedding: bool = False,
+        budget: SearchBudget | None = None,
+    ) -> list[tuple[Chunk, float]]:
+        results = await self.search_vectors_with_scores(library_id, query_vector, k=k, budget=budget)
+        return await self.hydrate_results(results, include_embedding)
+
+    async def search_range(
+        self,
+        library_id: UUID,
+        query_text: str,
+        min_score: float,
+        max_results: int | None = None,
+        include_embedding: bool = False,
+        budget: SearchBudget | None = None,
+    ) -> list[tuple[Chunk, float]]:
+        """Every chunk scoring at least min_score, best first, capped at max_results."""
+        query_embedding = await self.on_search_pool(self.generate_query_embedding, query_text)
+        return await self.search_range_by_vector(
+            library_id, query_embedding, min_score, max_results, include_embedding, budget
+        )
+
+    async def search_range_by_vector(
+        self,
+        library_id: UUID,
+        query_vector: list[float],
+        min_score: float,
+        max_results: int | None = None,
+        include_embedding: bool = False,
+        budget: SearchBudget | None = None,
+    ) -> list[tuple[Chunk, float]]:
+        """search_range with a precomputed query embedding."""
+        library, index = await self.get_library_index(library_id)
+        check_dimension(index, query_vector)
+
+        def range_search() -> list[tuple[UUID, float]]:
+            with span("index_search"):
+                return index.range_search(query_vector, min_score, max_results or RANGE_MAX_RESULTS, budget)
+
+        start = time.perf_counter()
+        hits = await self.on_search_pool(range_search)
+        SEARCH_LATENCY.labels(str(library.id), index.INDEX_TYPE).observe(time.perf_counter() - start)
+        if budget is not None and budget.exhausted:
+            PARTIAL_SEARCHES.labels(index.INDEX_TYPE).inc()
+        return await self.hydrate_results(hits, include_embedding)
+
+    async def search_lexical(
+        self,
+        library_id: UUID,
+        query_text: str,
+        k: int = 3,
+        include_embedding: bool = False,
+        budget: SearchBudget | None = None,
+    ) -> list[tuple[Chunk, float]]:
+        results = await self.search_lexical_ids(library_id, query_text, k, budget)
+        return await self.hydrate_results(results, include_embedding)
+
+    async def search_lexical_ids(
+        self, library_id: UUID, query_text: str, k: int, budget: SearchBudget | None = None
+    ) -> list[tuple[UUID, float]]:
+        index = await self.lexical_service.get_bm25_index(library_id)
+        return await self.on_search_pool(self.lexical_service.search_index, library_id, index, query_text, k, budget)
+
+    async def search_hybrid(
+        self,
+        library_id: UUID,
+        query_text: str,
+        k: int = 3,
+        fusion: str = "rrf",
+        alpha: float = 0.5,
+        include_embedding: bool = False,
+        budget: SearchBudget | None = None,
+    ) -> list[tuple[Chunk, float]]:
+        """Fuse vector and BM25 rankings; both retrievers run concurrently and share the budget."""
+        depth = k * HYBRID_CANDIDATE_FACTOR
+
+        async def vector_hits() -> list[tuple[UUID, float]]:
+            # The embedding call blocks, so it runs on a worker while BM25 scores on another
+            query_embedding = await self.on_search_pool(self.generate_query_embedding, query_text)
+            return await self.search_vectors_with_scores(library_id, query_embedding, depth, budget)
+
+        vector, lexical = await asyncio.gather(
+            vector_hits(), self.search_lexical_ids(library_id, query_text, depth, budget)
+        )
+        if fusion == "weighted":
+            fused = weighted_fusion(vector, lexical, k, alpha)
+        else:
+            fused = reciprocal_rank_fusion([vector, lexical], k)
+        return await self.hydrate_results(fused, include_embedding)
+
+    async def search_federated(
+        self,
+        library_ids: list[UUID] | None,
+        query_text: str,
+        k: int = 3,
+        include_embedding: bool = False,
+    ) -> tuple[list[tuple[Chunk, float, UUID]], list[dict]]:
+        """Search several libraries with one query embedding and merge their top-k.
+
+        The library searches share the k-th best score found so far. Once k hits
+        exist, a library that starts searching only looks for hits above that
+        score, with a range search that can skip clusters and graph regions.
+        Scores are only comparable within one similarity metric, so libraries
+        with different metrics cannot be searched together.
+        """
+        if library_ids is None:
+            library_ids = await self.library_repository.list_library_ids()
+        embedding, *loaded = await asyncio.gather(
+            self.on_search_pool(self.generate_query_embedding, query_text),
+            *(self.get_library_index(library_id) for library_id in library_ids),
+            return_exceptions=True,
+        )
+        if isinstance(embedding, BaseException):
+            raise embedding
+
+        timings = []
+        libraries, indexes = [], []
+        for library_id, result in zip(library_ids, loaded):
+            if isinstance(result, ValueError):
+                timings.append({
+                    "library_id": library_id,
+                    "search_ms": 0.0,
+                    "num_results": 0,
+                    "error": str(result),
+                })
+            elif isinstance(result, BaseException):
+                raise result
+            else:
+                libraries.append(result[0])
+                indexes.append(result[1])
+        metrics = sorted({library.metric for library in libraries})
+        if len(metrics) > 1:
+            raise ValueError(
+                f"Cannot merge scores across similarity metrics ({', '.join(metrics)}); "
+                "search libraries that share a metric"
+            )
+
+        # Searches beyond the pool's worker count queue up and start with the cutoff
+        # that the finished ones have established
+        running = RunningTopK(k)
+        searches = await asyncio.gather(*(
+            self.on_search_pool(self._timed_search, library, index, embedding, k, running)
+            for library, index in zip(libraries, indexes)
+        ))
+
+        # Each library's hits are sorted best first, and every hit of the global
+        # top-k scores above any cutoff used, so merging and taking k gives the top-k
+        merged = heapq.merge(
+            *(
+                [(chunk_id, score, library.id) for chunk_id, score in hits]
+                for library, (hits, _, _, _) in zip(libraries, searches)
+            ),
+            key=lambda hit: -hit[1],
+        )
+        top_k = list(islice(merged, k))
+
+        contributed = {}
+        for _, _, library_id in top_k:
+            contributed[library_id] = contributed.get(library_id, 0) + 1
+        for library, (_, search_ms, error, min_score) in zip(libraries, searches):
+            timings.append({
+                "library_id": library.id,
+                "search_ms": search_ms,
+                "num_results": contributed.get(library.id, 0),
+                "min_score": min_score,
+                "error": error,
+            })
+
+        library_of = {chunk_id: library_id for chunk_id, _, library_id in top_k}
+        hits = await self.hydrate_results([(chunk_id, score) for chunk_id, score, _ in top_k], include_embedding)
+        return [(chunk, score, library_of[chunk.id]) for chunk, score in hits], timings
+
+    def _timed_search(
+        self, library: Library, index: BaseIndex, query_vector: list[float], k: int, running: RunningTopK
+    ) -> tuple[list[tuple[UUID, float]], float, str | None, float | None]:
+        start = time.perf_counter()
+        min_score = running.threshold()
+        try:
+            if min_score is None:
+                hits = self.search_index(library, index, query_vector, k)
+            else:
+                check_dimension(index, query_vector)
+                with span("index_search"):
+                    hits = index.range_search(query_vector, min_score, k)
+                SEARCH_LATENCY.labels(str(library.id), index.INDEX_TYPE).observe(time.perf_counter() - start)
+            running.offer(hits)
+            error = None
+        except Exception as e:
+            logger.error(f"Error searching library {library.id}: {str(e)}")
+            hits, error = [], str(e)
+        return hits, (time.perf_counter() - start) * 1000, error, min_score
+
+    async def search_similar(
+        self,
+        library_id: UUID,
+        chunk_ids: list[UUID],
+        k: int = 3,
+        include_embedding: bool = False,
+    ) -> list[list[tuple[Chunk, float]]]:
+        """Find the neighbors of existing chunks using their stored vectors."""
+        library, index = await self.get_library_index(library_id)
+        vectors = {chunk_id: index.get_vector(chunk_id) for chunk_id in chunk_ids}
+        missing = [chunk_id for chunk_id, vector in vectors.items() if vector is None]
+        if missing:
+            # Fall back to the embeddings stored on the chunks, in one round trip
+            for chunk in await self.chunk_repository.get_chunks(missing, include_embedding=True):
+                vectors[chunk.id] = chunk.embedding
+
+        for chunk_id in chunk_ids:
+            if vectors.get(chunk_id) is None:
+                raise ValueError(f"Chunk {chunk_id} has no stored embedding")
+        # All seeds are searched in one batch so indexes can score them together
+        all_hits = await self.on_search_pool(
+            self.search_index_many, library, index, [vectors[chunk_id] for chunk_id in chunk_ids], k + 1
+        )
+        batches = [
+            [hit for hit in hits if hit[0] != chunk_id][:k]
+            for chunk_id, hits in zip(chunk_ids, all_hits)
+        ]
+        return await self.hydrate_batches(batches, include_embedding)
+
+    async def hydrate_results(
+        self, results: list[tuple[UUID, float]], include_embedding: bool = False
+    ) -> list[tuple[Chunk, float]]:
+        return (await self.hydrate_batches([results], include_embedding))[0]
+
+    async def hydrate_batches(
+        self, batches: list[list[tuple[UUID, float]]], include_embedding: bool = False
+    ) -> list[list[tuple[Chunk, float]]]:
+        # Hydrate all hits with a single $in query instead of one get_chunk per id
+        chunk_ids = list(dict.fromkeys(chunk_id for results in batches for chunk_id, _ in results))
+        with span("chunk_hydrate"):
+            chunks = {
+                chunk.id: chunk
+                for chunk in await self.on_search_pool(self.chunk_repository.read_chunks, chunk_ids, include_embedding)
+            }
+        return [
+            [(chunks[chunk_id], score) for chunk_id, score in results if chunk_id in chunks]
+            for results in batches
+        ]
+
+    async def delete_vector(self, library_id: UUID, vector_id: UUID) -> bool:
+        if not await self.library_repository.library_exists(library_id):
             return False
 
-        def delete_vector_operation():
+        async def delete_vector_operation():
             try:
-                library.delete_vector(vector_id)
-                return self.library_repository.save_library(library)
+                current = await self.library_repository.get_library(library_id)
+                index = self.load_index(current, cached=False)
+                index.delete_vector(vector_id)
+                version = await self.library_repository.update_index_data(library_id, index.serialize())
+                cache_index(library_id, version, index)
+                if isinstance(index, AutoIndex) and index.migration_target():
+                    self.schedule_migration(library_id)
+                return True
             except Exception as e:
                 logger.error(f"Error deleting vector: {str(e)}")
                 raise
 
-        return self.queue_manager.enqueue_operation(
+        return await self.queue_manager.enqueue_operation(
             "index",
             library_id,
             delete_vector_operation
         )
 
-    def get_index_stats(self, library_id: UUID) -> dict:
+    async def delete_vectors(self, library_id: UUID, vector_ids: list[UUID]) -> None:
+        """Remove a batch of vectors with one index load and one write."""
+
+        async def delete_vectors_operation():
+            current = await self.library_repository.get_library(library_id)
+            if not current:
+                raise ValueError(f"Library with ID {library_id} not found")
+            index = self.load_index(current, cached=False)
+            await asyncio.get_running_loop().run_in_executor(build_executor, index.delete_vectors, vector_ids)
+            version = await self.library_repository.update_index_data(library_id, index.serialize())
+            cache_index(library_id, version, index, snapshot=True)
+            if isinstance(index, AutoIndex) and index.migration_target():
+                self.schedule_migration(library_id)
+
+        await self.queue_manager.enqueue_operation(
+            "index",
+            library_id,
+            delete_vectors_operation
+        )
+
+    async def get_index_stats(self, library_id: UUID) -> dict:
         try:
-            index = self.get_index(library_id)
-            return index.get_stats()
+            _, index = await self.get_library_index(library_id)
+            stats = index.get_stats()
+            stats["recall"] = recall_monitor.stats(library_id)
+            return stats
         except Exception as e:
             raise ValueError(f"Error getting index stats: {str(e)}")
 
-    def save_new_index(
+    async def save_new_index(
         self, library_id: UUID, index_type: str | None, index: BaseIndex | None
     ) -> None:
         if index_type:
-            self.library_repository.update_index_type(library_id, index_type)
-        if index:
-            self.library_repository.update_index_data(library_id, index.serialize())
+            # Type and data change together, so the index version is bumped once for both
+            await self.library_repository.replace_index(library_id, index_type, index.serialize() if index else {})
+            recall_monitor.reset(library_id)
+        elif index:
+            await self.library_repository.update_index_data(library_id, index.serialize())
 
-    def generate_query_embedding(self, text: str) -> list[float] | None:
+    def needs_tuning(self, library: Library, n_vectors: int) -> bool:
+        if (library.index_type or "flat") not in autotuner.TUNABLE_INDEXES or n_vectors < AUTOTUNE_MIN_VECTORS:
+            return False
+        tuned_at_size = library.index_tuning.get("num_vectors")
+        return not tuned_at_size or n_vectors >= tuned_at_size * AUTOTUNE_GROWTH_FACTOR
+
+    def schedule_autotune(self, library_id: UUID) -> None:
+        """Tune a library in the background unless a run is already in flight."""
+        if library_id in _tuning_libraries or library_id in _tuning_tasks:
+            return
+        task = asyncio.get_running_loop().create_task(self._background_autotune(library_id))
+        _tuning_tasks[library_id] = task
+        task.add_done_callback(lambda _: _tuning_tasks.pop(library_id, None))
+
+    async def _background_autotune(self, library_id: UUID) -> None:
         try:
-            response = co.embed(
-                texts=[text],
-                model="embed-english-v3.0",
-                input_type="search_document",
-            )
-            if response and response.embeddings:
-                embedding = response.embeddings[0]
-                return embedding
+            await self.autotune(library_id)
+        except Exception as e:
+            logger.error(f"Error tuning library {library_id}: {str(e)}")
+
+    async def autotune(
+        self,
+        library_id: UUID,
+        queries: list[str] | None = None,
+        k: int = 10,
+        target_recall: float = AUTOTUNE_TARGET_RECALL,
+        tune_build: bool = True,
+    ) -> dict:
+        """Pick the cheapest index parameters that meet target_recall and save them.
+
+        Sample queries default to vectors drawn from the library itself, which are
+        held out of the tuned indexes and of the exact results. A query that is in the
+        index finds itself first, which would overstate recall. Search-time parameters
+        are always swept; build parameters are swept when tune_build is set.
+        """
+        if library_id in _tuning_libraries:
+            raise ValueError(f"Library {library_id} is already being tuned")
+        _tuning_libraries.add(library_id)
+        try:
+            library = await self.get_index(library_id)
+            index_type = library.index_type or "flat"
+            if index_type not in autotuner.TUNABLE_INDEXES:
+                raise ValueError(f"Index type {index_type} has no tunable parameters")
+            # Tuning sets search parameters on the index, so it must not be the one serving searches
+            index = self.load_index(library, cached=False)
+            vectors = dict(index.vectors)
+            if not vectors:
+                raise ValueError("Cannot tune an empty index")
+            num_vectors = len(vectors)
+            held_out = []
+            if queries:
+                query_vectors = await self.on_search_pool(embed_texts, queries, "search_document")
             else:
-                raise ValueError("No embedding generated from Cohere API")
+                n_queries = max(1, min(AUTOTUNE_SAMPLE_QUERIES, num_vectors // 10))
+                if num_vectors <= n_queries:
+                    raise ValueError("Too few vectors to hold out sample queries; pass queries to tune")
+                held_out = random.sample(list(vectors), n_queries)
+                query_vectors = [vectors.pop(vector_id) for vector_id in held_out]
+
+            def run_tuning() -> dict:
+                if tune_build:
+                    candidates = [
+                        autotuner.build_index(index_type, build_params, vectors, index.metric)
+                        for build_params in autotuner.build_grid(index_type, len(vectors))
+                    ]
+                else:
+                    # A private copy, so the held-out vectors can be removed from it
+                    index.delete_vectors(held_out)
+                    candidates = [index]
+                return autotuner.tune_index(candidates, vectors, query_vectors, k, target_recall)
+
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(build_executor, run_tuning)
+            tuning = {
+                "index_type": index_type,
+                "num_vectors": num_vectors,
+                "dimension": len(next(iter(vectors.values()))),
+                "num_queries": len(query_vectors),
+                "k": k,
+                "target_recall": target_recall,
+                "tuned_at": datetime.now(timezone.utc).isoformat(),
+                **result,
+            }
+            await self.apply_tuning(library_id, tuning)
+            logger.info(
+                f"Tuned library {library_id} ({index_type}): build {tuning['build_params']}, "
+                f"search {tuning['search_params']}, recall {tuning['recall']:.3f}"
+            )
+            return tuning
+        finally:
+            _tuning_libraries.discard(library_id)
+
+    async def apply_tuning(self, library_id: UUID, tuning: dict) -> None:
+        """Apply tuned parameters to the library's current index and persist them."""
+
+        async def apply_tuning_operation():
+            # Runs on the library's shared index queue and starts from the current index,
+            # so vectors written while tuning ran are kept
+            library = await self.library_repository.get_library(library_id)
+            index = self.load_index(library, cached=False)
+            if index.INDEX_TYPE != tuning.get("index_type", index.INDEX_TYPE):
+                logger.info(f"Discarding tuning of library {library_id}: its index type changed while tuning")
+                return
+            if autotuner.build_params_of(index) != tuning["build_params"]:
+                # Rebuild from the current vectors so inserts made while tuning are kept
+                loop = asyncio.get_running_loop()
+                index = await loop.run_in_executor(
+                    build_executor,
+                    autotuner.build_index,
+                    index.INDEX_TYPE,
+                    tuning["build_params"],
+                    dict(index.vectors),
+                    index.metric,
+                )
+            for param, value in tuning["search_params"].items():
+                setattr(index, param, value)
+            version = await self.library_repository.update_index_data(library_id, index.serialize())
+            cache_index(library_id, version, index, snapshot=True)
+            await self.library_repository.update_index_tuning(library_id, tuning)
+            recall_monitor.reset(library_id)
+
+        await self.queue_manager.enqueue_operation("index", library_id, apply_tuning_operation)
+
+    def schedule_migration(self, library_id: UUID) -> None:
+        """Migrate an "auto" library in the background unless a migration is in flight."""
+        if library_id in _migration_tasks:
+            return
+        task = asyncio.get_running_loop().create_task(self._background_migration(library_id))
+        _migration_tasks[library_id] = task
+        task.add_done_callback(lambda _: _migration_tasks.pop(library_id, None))
+
+    async def _background_migration(self, library_id: UUID) -> None:
+        try:
+            await self.migrate_auto_index(library_id)
+        except Exception as e:
+            logger.error(f"Error migrating index of library {library_id}: {str(e)}")
+
+    async def migrate_auto_index(self, library_id: UUID) -> dict | None:
+        """Move an "auto" library to the index type its size calls for.
+
+        The new index is built off the event loop from a snapshot of the vectors
+        while the old one keeps serving searches. Vectors added or deleted in the
+        meantime are replayed onto it before it is swapped in.
+        """
+        _, index = await self.get_library_index(library_id)
+        if not isinstance(index, AutoIndex):
+            raise ValueError(f"Library {library_id} does not use the auto index type")
+        target = index.migration_target()
+        if target is None:
+            return None
+        index_type, reason = target
+        snapshot = dict(index.vectors)
+        loop = asyncio.get_running_loop()
+        new_index = await loop.run_in_executor(
+            build_executor, build_inner_index, index_type, snapshot, index.metric
+        )
+
+        async def swap_index_operation():
+            # Runs on the library's shared index queue, so no write can land between
+            # reading the current index and storing the migrated one
+            current = self.load_index(await self.library_repository.get_library(library_id), cached=False)
+            if not isinstance(current, AutoIndex):
+                # The library moved to another index type while we were building
+                return None
+            vectors = current.vectors
+            # One bulk delete, since IVF re-clusters on every single delete
+            new_index.delete_vectors(list(snapshot.keys() - vectors.keys()))
+            new_index.add_vectors({
+                vector_id: vector for vector_id, vector in vectors.items() if vector_id not in snapshot
+            })
+            current.swap(new_index, reason)
+            version = await self.library_repository.update_index_data(library_id, current.serialize())
+            cache_index(library_id, version, current, snapshot=True)
+            recall_monitor.reset(library_id)
+            return current.decision
+
+        return await self.queue_manager.enqueue_operation("index", library_id, swap_index_operation)
+
+    def generate_query_embedding(self, text: str) -> list[float] | None:
+        try:
+            with span("embed"):
+                return embed_texts([text], input_type="search_document")[0]
         except Exception as e:
             raise ValueError(f"Error generating query embedding: {str(e)}")
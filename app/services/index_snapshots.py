@@ -0,0 +1,114 @@
+from pathlib import Path
+from uuid import UUID
+import logging
+import os
+import pickle
+import tempfile
+
+from app.config import INDEX_SNAPSHOT_DIR
+from app.indexing.base_index import BaseIndex
+from app.services.executors import snapshot_executor
+
+logger = logging.getLogger(__name__)
+
+# Bumped whenever the index classes change shape, so old snapshots are ignored
+SNAPSHOT_FORMAT = 1
+
+# (index version, index type, metric) a snapshot was taken at
+SnapshotKey = tuple[int, str, str]
+
+# Latest version written or queued per library, so one version is not written twice
+_written: dict[UUID, int] = {}
+
+
+def enabled() -> bool:
+    return bool(INDEX_SNAPSHOT_DIR)
+
+
+def snapshot_path(library_id: UUID, index_version: int) -> Path:
+    return Path(INDEX_SNAPSHOT_DIR) / f"{library_id}-{index_version}.snapshot"
+
+
+def read_snapshot(library_id: UUID, key: SnapshotKey) -> BaseIndex | None:
+    """The library's index from its snapshot at key, or None when there is none.
+
+    Snapshots are pickled index objects, so restoring one copies arrays instead
+    of rebuilding them element by element from the MongoDB document.
+    """
+    if not enabled():
+        return None
+    path = snapshot_path(library_id, key[0])
+    try:
+        with open(path, "rb") as snapshot:
+            data = pickle.load(snapshot)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Discarding unreadable index snapshot {path}: {str(e)}")
+        path.unlink(missing_ok=True)
+        return None
+    if data.get("format") != SNAPSHOT_FORMAT or tuple(data.get("key", ())) != key:
+        return None
+    _written[library_id] = key[0]
+    return data["index"]
+
+
+def write_snapshot(library_id: UUID, key: SnapshotKey, index: BaseIndex) -> None:
+    """Write the snapshot atomically and remove the library's older ones.
+
+    The index is pickled to a temporary file in the snapshot directory, which is
+    then renamed into place, so readers never see a partial snapshot.
+    """
+    directory = Path(INDEX_SNAPSHOT_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = snapshot_path(library_id, key[0])
+    descriptor, temporary = tempfile.mkstemp(dir=directory, prefix=f".{library_id}-", suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "wb") as snapshot:
+            pickle.dump(
+                {"format": SNAPSHOT_FORMAT, "key": key, "index": index}, snapshot, protocol=pickle.HIGHEST_PROTOCOL
+            )
+            snapshot.flush()
+            os.fsync(snapshot.fileno())
+        os.replace(temporary, path)
+    except BaseException:
+        Path(temporary).unlink(missing_ok=True)
+        raise
+    for old in directory.glob(f"{library_id}-*.snapshot"):
+        if old != path:
+            old.unlink(missing_ok=True)
+
+
+def schedule_snapshot(library_id: UUID, key: SnapshotKey, index: BaseIndex) -> bool:
+    """Write a snapshot in the background unless this version was already written.
+
+    Only indexes that are no longer modified (the ones published to the cache)
+    may be passed, since the write happens on another thread. Returns whether a
+    write was queued.
+    """
+    if not enabled() or _written.get(library_id, -1) >= key[0]:
+        return False
+    _written[library_id] = key[0]
+
+    def write() -> None:
+        try:
+            write_snapshot(library_id, key, index)
+        except Exception as e:
+            _written.pop(library_id, None)
+            logger.error(f"Error writing index snapshot of library {library_id}: {str(e)}")
+
+    snapshot_executor.submit(write)
+    return True
+
+
+def wait_for_snapshots() -> None:
+    """Block until every queued snapshot has been written."""
+    snapshot_executor.submit(lambda: None).result()
+
+
+def delete_snapshots(library_id: UUID) -> None:
+    _written.pop(library_id, None)
+    if not enabled() or not Path(INDEX_SNAPSHOT_DIR).is_dir():
+        return
+    for snapshot in Path(INDEX_SNAPSHOT_DIR).glob(f"{library_id}-*.snapshot"):
+        snapshot.unlink(missing_ok=True)
@@ -0,0 +1,249 @@
+from typing import Any, AsyncIterator
+from uuid import UUID
+import asyncio
+import logging
+import tempfile
+
+import orjson
+from pydantic import ValidationError
+
+from app.config import (
+    INGEST_BATCH_SIZE,
+    INGEST_EMBED_BATCH_SIZE,
+    INGEST_INDEX_BATCH_SIZE,
+    INGEST_MAX_ERRORS,
+    INGEST_SPOOL_MB,
+)
+from app.data_models.chunk import Chunk
+from app.data_models.document import Document
+from app.data_models.ingest import IngestChunk, IngestDocument, IngestError, IngestResult
+from app.data_models.metadata import ChunkMetadata, DocumentMetadata
+from app.repository.mongo_repository import MongoRepository
+from app.services.embedding_service import embed_texts
+from app.services.index_service import IndexService
+from app.services.lexical_service import LexicalService
+
+logger = logging.getLogger(__name__)
+
+ARROW_CONTENT_TYPES = ("application/vnd.apache.arrow.stream", "application/vnd.apache.arrow.file")
+
+# A parsed record, or the reason it could not be parsed, with its line or row number
+Record = tuple[int, dict[str, Any] | ValueError]
+
+
+async def iter_ndjson_records(stream: AsyncIterator[bytes]) -> AsyncIterator[Record]:
+    """Parse an NDJSON body as it arrives, holding at most one partial line in memory."""
+    buffer = b""
+    line_number = 0
+    async for piece in stream:
+        buffer += piece
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_number += 1
+            if line.strip():
+                yield line_number, _decode_line(line)
+    if buffer.strip():
+        yield line_number + 1, _decode_line(buffer)
+
+
+def _decode_line(line: bytes) -> dict[str, Any] | ValueError:
+    try:
+        record = orjson.loads(line)
+    except orjson.JSONDecodeError as e:
+        return ValueError(f"Invalid JSON: {str(e)}")
+    if not isinstance(record, dict):
+        return ValueError("Each line must be a JSON object")
+    return record
+
+
+async def iter_arrow_records(stream: AsyncIterator[bytes]) -> AsyncIterator[Record]:
+    """Read an Arrow IPC stream body one record batch at a time.
+
+    The body is spooled first (to disk past INGEST_SPOOL_MB) because the Arrow
+    reader needs a file; rows are converted to records one batch at a time.
+    """
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise ValueError("Arrow ingestion requires the pyarrow package")
+    with tempfile.SpooledTemporaryFile(max_size=INGEST_SPOOL_MB * 1024 * 1024) as spool:
+        async for piece in stream:
+            spool.write(piece)
+        spool.seek(0)
+        try:
+            reader = pa.ipc.open_stream(spool)
+        except pa.ArrowInvalid as e:
+            raise ValueError(f"Invalid Arrow stream: {str(e)}")
+        row_number = 0
+        for batch in reader:
+            for row in batch.to_pylist():
+                row_number += 1
+                yield row_number, {field: value for field, value in row.items() if value is not None}
+
+
+class IngestService:
+    """Loads documents and chunks into a library in bulk.
+
+    Records stream through in batches: each batch is embedded where embeddings
+    are missing, written to MongoDB with one bulk write per collection, and its
+    vectors are added to the index every INGEST_INDEX_BATCH_SIZE chunks.
+    """
+
+    def __init__(self, repository: MongoRepository):
+        self.document_repository = repository.document_repo
+        self.chunk_repository = repository.chunk_repo
+        self.index_service = IndexService(repository)
+        self.lexical_service = LexicalService(repository)
+
+    async def ingest(self, library_id: UUID, records: AsyncIterator[Record]) -> IngestResult:
+        _, index = await self.index_service.get_library_index(library_id)
+        dimension = index.dimension() or None
+        del index
+
+        run = _IngestRun(library_id, dimension)
+        run.documents = set(await self.document_repository.list_document_ids(library_id))
+        async for record_number, record in records:
+            if isinstance(record, ValueError):
+                run.reject(record_number, str(record))
+                continue
+            try:
+                if record.get("type", "chunk") == "document":
+                    run.add_document(record_number, IngestDocument.model_validate(record))
+                else:
+                    run.add_chunk(record_number, IngestChunk.model_validate(record))
+            except (ValueError, ValidationError) as e:
+                run.reject(record_number, str(e))
+                continue
+            if len(run.batch_chunks) >= INGEST_BATCH_SIZE or len(run.batch_documents) >= INGEST_BATCH_SIZE:
+                await self._flush_batch(run)
+            if len(run.pending_vectors) >= INGEST_INDEX_BATCH_SIZE:
+                await self._flush_vectors(run)
+        await self._flush_batch(run)
+        await self._flush_vectors(run)
+        logger.info(
+            f"Ingested {run.result.chunks} chunks and {run.result.documents} documents into library "
+            f"{library_id} ({run.result.error_count} records rejected)"
+        )
+        return run.result
+
+    async def _flush_batch(self, run: "_IngestRun") -> None:
+        documents, chunks = run.batch_documents, run.batch_chunks
+        run.batch_documents, run.batch_chunks = [], []
+        if not documents and not chunks:
+            return
+
+        # Saving a document upserts it by ID, which would move a document of another library here
+        libraries = await self.document_repository.get_document_libraries(
+            [document.id for _, document in documents]
+        )
+        foreign = {
+            document_id for document_id, library_id in libraries.items() if library_id != run.library_id
+        }
+        for record_number, document in documents:
+            if document.id in foreign:
+                run.documents.discard(document.id)
+                run.reject(record_number, f"Document with ID {document.id} belongs to another library")
+        documents = [document for _, document in documents if document.id not in foreign]
+        for record_number, chunk in chunks:
+            if chunk.document_id in foreign:
+                run.reject(record_number, f"Document with ID {chunk.document_id} is not in library {run.library_id}")
+        chunks = [(record_number, chunk) for record_number, chunk in chunks if chunk.document_id not in foreign]
+
+        missing = [(record_number, chunk) for record_number, chunk in chunks if chunk.embedding is None]
+        embedded = await self._embed(run, missing)
+        chunk_models = []
+        chunk_ids: dict[UUID, list[UUID]] = {}
+        for record_number, chunk in chunks:
+            embedding = embedded.get(chunk.id) if chunk.embedding is None else chunk.embedding
+            if embedding is None:
+                continue
+            if run.dimension is None:
+                run.dimension = len(embedding)
+            if len(embedding) != run.dimension:
+                run.reject(record_number, f"Embedding has {len(embedding)} dimensions, expected {run.dimension}")
+                continue
+            # Built without validation so a chunk with an embedding is never re-embedded
+            chunk_models.append(Chunk.model_construct(
+                id=chunk.id,
+                document_id=chunk.document_id,
+                library_id=run.library_id,
+                text=chunk.text,
+                embedding=list(embedding),
+                metadata=chunk.metadata or ChunkMetadata(),
+            ))
+            chunk_ids.setdefault(chunk.document_id, []).append(chunk.id)
+
+        await self.chunk_repository.save_chunks(chunk_models)
+        await self.document_repository.save_documents(documents, chunk_ids)
+        for chunk in chunk_models:
+            run.pending_vectors[chunk.id] = chunk.embedding
+            self.lexical_service.chunk_saved(run.library_id, chunk.id, chunk.text)
+        run.result.documents += len(documents)
+        run.result.chunks += len(chunk_models)
+        run.result.embedded += len(embedded)
+
+    async def _embed(
+        self, run: "_IngestRun", chunks: list[tuple[int, IngestChunk]]
+    ) -> dict[UUID, list[float]]:
+        """Embed the texts of chunks that came without embeddings, a provider batch at a time."""
+        embeddings: dict[UUID, list[float]] = {}
+        loop = asyncio.get_running_loop()
+        for start in range(0, len(chunks), INGEST_EMBED_BATCH_SIZE):
+            batch = chunks[start:start + INGEST_EMBED_BATCH_SIZE]
+            try:
+                vectors = await loop.run_in_executor(None, embed_texts, [chunk.text for _, chunk in batch])
+            except Exception as e:
+                logger.error(f"Error embedding ingested chunks: {str(e)}")
+                for record_number, _ in batch:
+                    run.reject(record_number, f"Failed to generate embedding: {str(e)}")
+                continue
+            for (_, chunk), vector in zip(batch, vectors):
+                embeddings[chunk.id] = vector
+        return embeddings
+
+    async def _flush_vectors(self, run: "_IngestRun") -> None:
+        if not run.pending_vectors:
+            return
+        vectors, run.pending_vectors = run.pending_vectors, {}
+        await self.index_service.add_vectors(run.library_id, vectors)
+        run.result.indexed += len(vectors)
+
+
+class _IngestRun:
+    """State of one ingestion request: the open batch and the running totals."""
+
+    def __init__(self, library_id: UUID, dimension: int | None):
+        self.library_id = library_id
+        self.dimension = dimension
+        self.documents: set[UUID] = set()
+        self.current_document: UUID | None = None
+        self.batch_documents: list[tuple[int, Document]] = []
+        self.batch_chunks: list[tuple[int, IngestChunk]] = []
+        self.pending_vectors: dict[UUID, list[float]] = {}
+        self.result = IngestResult()
+
+    def add_document(self, record_number: int, record: IngestDocument) -> None:
+        self.batch_documents.append((record_number, Document(
+            id=record.id,
+            library_id=self.library_id,
+            title=record.title,
+            metadata=record.metadata or DocumentMetadata(),
+        )))
+        self.documents.add(record.id)
+        self.current_document = record.id
+
+    def add_chunk(self, record_number: int, record: IngestChunk) -> None:
+        if record.document_id is None:
+            if self.current_document is None:
+                raise ValueError("Chunk has no document_id and follows no document record")
+            record.document_id = self.current_document
+        if record.document_id not in self.documents:
+            raise ValueError(f"Document with ID {record.document_id} is not in library {self.library_id}")
+        if record.embedding is not None and not record.embedding:
+            raise ValueError("Embedding must not be empty")
+        self.batch_chunks.append((record_number, record))
+
+    def reject(self, record_number: int, error: str) -> None:
+        self.result.error_count += 1
+        if len(self.result.errors) < INGEST_MAX_ERRORS:
+            self.result.errors.append(IngestError(record=record_number, error=error))
@@ -0,0 +1,116 @@
+from uuid import UUID
+import asyncio
+import logging
+import time
+
+from app.config import REBUILD_BATCH_SIZE
+from app.indexing.bm25_index import BM25Index
+from app.indexing.search_budget import SearchBudget
+from app.monitoring.metrics import PARTIAL_SEARCHES, SEARCH_LATENCY
+from app.monitoring.tracing import span
+from app.repository.mongo_repository import MongoRepository
+from app.services.executors import build_executor
+
+logger = logging.getLogger(__name__)
+
+# Per-library BM25 indexes, built from MongoDB on first use and kept up to date in process
+_indexes: dict[UUID, BM25Index] = {}
+_build_locks: dict[UUID, asyncio.Lock] = {}
+# Chunk changes seen while a library's index is being built, replayed once it is ready
+_pending: dict[UUID, list[tuple[UUID, str | None]]] = {}
+
+
+def reciprocal_rank_fusion(
+    rankings: list[list[tuple[UUID, float]]], k: int, rrf_k: int = 60
+) -> list[tuple[UUID, float]]:
+    """Fuse rankings by summing 1 / (rrf_k + rank) across them."""
+    scores: dict[UUID, float] = {}
+    for ranking in rankings:
+        for rank, (doc_id, _) in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (rrf_k + rank)
+    return sorted(scores.items(), key=lambda hit: hit[1], reverse=True)[:k]
+
+
+def weighted_fusion(
+    vector_hits: list[tuple[UUID, float]],
+    lexical_hits: list[tuple[UUID, float]],
+    k: int,
+    alpha: float = 0.5,
+) -> list[tuple[UUID, float]]:
+    """Fuse min-max normalized scores as alpha * vector + (1 - alpha) * lexical."""
+    scores: dict[UUID, float] = {}
+    for hits, weight in ((vector_hits, alpha), (lexical_hits, 1 - alpha)):
+        if not hits:
+            continue
+        high = max(score for _, score in hits)
+        low = min(score for _, score in hits)
+        spread = high - low
+        for doc_id, score in hits:
+            normalized = (score - low) / spread if spread else 1.0
+            scores[doc_id] = scores.get(doc_id, 0.0) + weight * normalized
+    return sorted(scores.items(), key=lambda hit: hit[1], reverse=True)[:k]
+
+
+def drop_library(library_id: UUID) -> None:
+    _indexes.pop(library_id, None)
+    _pending.pop(library_id, None)
+
+
+class LexicalService:
+    """Keyword search over chunk text with per-library BM25 indexes."""
+
+    def __init__(self, repository: MongoRepository):
+        self.chunk_repository = repository.chunk_repo
+
+    async def get_bm25_index(self, library_id: UUID) -> BM25Index:
+        if library_id in _indexes:
+            return _indexes[library_id]
+        lock = _build_locks.setdefault(library_id, asyncio.Lock())
+        async with lock:
+            if library_id in _indexes:
+                return _indexes[library_id]
+            _pending[library_id] = []
+            try:
+                loop = asyncio.get_running_loop()
+                index = await loop.run_in_executor(build_executor, self._build, library_id)
+                for chunk_id, text in _pending.get(library_id, []):
+                    if text is None:
+                        index.remove_document(chunk_id)
+                    else:
+                        index.add_document(chunk_id, text)
+                _indexes[library_id] = index
+                logger.info(f"Built BM25 index for library {library_id} with {len(index)} chunks")
+                return index
+            finally:
+                _pending.pop(library_id, None)
+
+    def _build(self, library_id: UUID) -> BM25Index:
+        index = BM25Index()
+        for batch in self.chunk_repository.iter_texts(library_id, REBUILD_BATCH_SIZE):
+            for chunk_id, text in batch.items():
+                index.add_document(chunk_id, text)
+        return index
+
+    def chunk_saved(self, library_id: UUID, chunk_id: UUID, text: str) -> None:
+        """Index a created or updated chunk if its library's index is loaded."""
+        if library_id in _pending:
+            _pending[library_id].append((chunk_id, text))
+        if library_id in _indexes:
+            _indexes[library_id].add_document(chunk_id, text)
+
+    def chunk_deleted(self, library_id: UUID, chunk_id: UUID) -> None:
+        if library_id in _pending:
+            _pending[library_id].append((chunk_id, None))
+        if library_id in _indexes:
+            _indexes[library_id].remove_document(chunk_id)
+
+    def search_index(
+        self, library_id: UUID, index: BM25Index, query_text: str, k: int, budget: SearchBudget | None = None
+    ) -> list[tuple[UUID, float]]:
+        start = time.perf_counter()
+        with span("lexical_search"):
+            hits = index.search(query_text, k, budget)
+        SEARCH_LATENCY.labels(str(library_id), "bm25").observe(time.perf_counter() - start)
+        if budget is not None and budget.exhausted:
+            PARTIAL_SEARCHES.labels("bm25").inc()
+        return hits
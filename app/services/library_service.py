@@ -1,9 +1,16 @@
-from typing import List, Optional
+from typing import Iterator, List, Optional
 from uuid import UUID
 
+import orjson
+
+from app.config import PAGE_SIZE
 from app.data_models.library import Library, LibraryCreate, LibraryUpdate
 from app.data_models.metadata import LibraryMetadata
+from app.indexing import distance
+from app.data_models.deletion_job import DeletionJob
 from app.repository.mongo_repository import MongoRepository
+from app.services.deletion_service import DeletionService
+from app.services.index_service import IndexService
 from app.services.queue_manager import QueueManager
 
 
@@ -12,6 +19,8 @@ class LibraryService:
         self.document_repository = repository.document_repo
         self.library_repository = repository.library_repo
         self.chunk_repository = repository.chunk_repo
+        self.deletion_service = DeletionService(repository)
+        self.index_service = IndexService(repository)
         self.queue_manager = QueueManager()
 
     async def get_library(self, library_id: UUID) -> Library:
@@ -25,16 +34,51 @@ class LibraryService:
         except Exception as e:
             raise ValueError("Service error: Failed to queue library retrieval") from e
 
-    async def list_libraries(self) -> List[Library]:
+    async def list_libraries(
+        self, cursor: UUID | None = None, limit: int = PAGE_SIZE
+    ) -> tuple[List[Library], UUID | None]:
+        """A page of libraries, without index data, and the cursor of the next page."""
         try:
             return await self.queue_manager.enqueue_operation(
                 "library",
                 UUID(int=0),  # Use a dummy UUID for list operations
-                self.library_repository.list_libraries
+                self.library_repository.list_library_page,
+                cursor,
+                limit
             )
         except Exception as e:
             raise ValueError("Service error: Failed to queue library listing") from e
 
+    async def export_library(self, library_id: UUID, include_embedding: bool = False) -> Iterator[bytes]:
+        """NDJSON lines for every document and chunk of a library, in the bulk ingestion format.
+
+        The lines are produced lazily from MongoDB cursors, so an export of any size
+        is streamed in constant memory; the result can be posted back to /ingest.
+        """
+        if not await self.library_repository.library_exists(library_id):
+            raise ValueError(f"Library with ID {library_id} not found")
+        return self._export_lines(library_id, include_embedding)
+
+    def _export_lines(self, library_id: UUID, include_embedding: bool) -> Iterator[bytes]:
+        for record in self.document_repository.iter_documents(library_id):
+            yield orjson.dumps({
+                "type": "document",
+                "id": str(record["_id"]),
+                "title": record["title"],
+                "metadata": record.get("metadata"),
+            }, default=str) + b"\n"
+        for record in self.chunk_repository.iter_chunks(library_id, include_embedding):
+            line = {
+                "type": "chunk",
+                "id": str(record["_id"]),
+                "document_id": str(record["document_id"]),
+                "text": record["text"],
+                "metadata": record.get("metadata"),
+            }
+            if include_embedding:
+                line["embedding"] = record.get("embedding")
+            yield orjson.dumps(line, default=str) + b"\n"
+
     async def create_library(self, library_create: LibraryCreate) -> Library:
         try:
             # Create metadata if not provided
@@ -47,8 +91,12 @@ class LibraryService:
                 title=library_create.title,
                 description=library_create.description,
                 index_type=library_create.index_type,
+                metric=distance.validate_metric(library_create.metric),
+                index_params=library_create.index_params,
                 metadata=metadata
             )
+            # Fails on an unknown index type or parameters the index type does not take
+            self.index_service.new_index(library.index_type or "flat", library.metric, library.index_params)
             return await self.save_library(library)
         except Exception as e:
             raise ValueError(f"Service error: Failed to create library: {str(e)}") from e
@@ -76,27 +124,12 @@ class LibraryService:
         except Exception as e:
             raise ValueError(f"Service error: Failed to save library: {str(e)}") from e
 
-    async def delete_library(self, library_id: UUID) -> bool:
-        try:
-            library = await self.get_library(library_id)
-            if not library:
-                raise ValueError(f"Library with ID {library_id} not found")
-
-            async def delete_operation():
-                with self.library_repository.libraries.database.client.start_session() as session:
-                    with session.start_transaction():
-                        for document_id in library.get_all_doc_ids():
-                            document = await self.document_repository.get_document(document_id)
-                            if document:
-                                for chunk_id in document.get_all_chunks():
-                                    await self.chunk_repository.delete_chunk(chunk_id)
-                            await self.document_repository.delete_document(document_id)
-                        return await self.library_repository.delete_library(library_id)
+    async def delete_library(self, library_id: UUID, background: bool = False) -> DeletionJob:
+        """Delete a library with its documents, chunks and index.
 
-            return await self.queue_manager.enqueue_operation(
-                "library",
-                library_id,
-                delete_operation
-            )
+        With background, the delete runs as a job and is returned before it finishes.
+        """
+        try:
+            return await self.deletion_service.delete_library(library_id, background)
         except Exception as e:
-            raise ValueError("Service error: Failed to delete library and its contents") from e
+            raise ValueError(f"Service error: Failed to delete library and its contents: {str(e)}") from e
@@ -1,25 +1,31 @@
 import asyncio
-from typing import Any, Callable, Dict, Optional, Set
+from typing import Any, Callable, Dict, Set
 from uuid import UUID
 import logging
 from datetime import datetime, timezone
 from collections import defaultdict
+import time
+
+from app.monitoring.metrics import QUEUE_DEPTH, QUEUE_WAIT
 
 logger = logging.getLogger(__name__)
 
 class QueueManager:
-    """Manages request queues for ordered processing of concurrent operations."""
-    
-    def __init__(self):
-        # Dictionary to store queues for each resource type
-        self.queues: Dict[str, asyncio.Queue] = defaultdict(asyncio.Queue)
-        # Dictionary to store locks for each resource
-        self.locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
-        # Dictionary to store the last processed timestamp for each resource
-        self.last_processed: Dict[str, datetime] = defaultdict(lambda: datetime.min.replace(tzinfo=timezone.utc))
-        # Set of resources currently being processed
-        self.processing_resources: Set[str] = set()
-        
+    """Manages request queues for ordered processing of concurrent operations.
+
+    Services create their own QueueManager per request, so the queues live on the
+    class: every operation on a resource, from any service, waits behind the same
+    lock. Operations must not enqueue another operation on the resource they hold.
+    """
+
+    # One lock per resource, and how many operations hold or wait for it
+    _locks: Dict[str, asyncio.Lock] = {}
+    _waiting: Dict[str, int] = {}
+    # Last processed timestamp for each resource
+    last_processed: Dict[str, datetime] = defaultdict(lambda: datetime.min.replace(tzinfo=timezone.utc))
+    # Resources currently being processed
+    processing_resources: Set[str] = set()
+
     async def enqueue_operation(
         self,
         resource_type: str,
@@ -29,75 +35,51 @@ class QueueManager:
         **kwargs: Any
     ) -> Any:
         """
-        Enqueue an operation for a specific resource.
+        Enqueue an operation for a specific resource and wait for its result.
+
+        asyncio.Lock wakes waiters first in, first out, so operations on a resource
+        run one at a time in the order they were enqueued.
         """
         resource_key = f"{resource_type}:{resource_id}"
-        queue = self.queues[resource_key]
-        lock = self.locks[resource_key]
-        
-        # Create a future to store the result
-        future = asyncio.Future()
-        
-        # Create operation wrapper
+        if resource_key not in self._locks:
+            self._locks[resource_key] = asyncio.Lock()
+        lock = self._locks[resource_key]
+        self._waiting[resource_key] = self._waiting.get(resource_key, 0) + 1
+        enqueued_at = time.perf_counter()
+        QUEUE_DEPTH.labels(resource_type).inc()
+
         async def operation_wrapper():
             try:
                 async with lock:
-                    # Mark resource as being processed
+                    QUEUE_WAIT.labels(resource_type).observe(time.perf_counter() - enqueued_at)
                     self.processing_resources.add(resource_key)
-                    
-                    # Execute the operation
-                    result = await operation(*args, **kwargs)
-                    
-                    # Update last processed timestamp
+                    try:
+                        result = await operation(*args, **kwargs)
+                    finally:
+                        self.processing_resources.discard(resource_key)
                     self.last_processed[resource_key] = datetime.now(timezone.utc)
-                    
-                    # Set the result
-                    future.set_result(result)
-            except Exception as e:
-                future.set_exception(e)
+                    return result
             finally:
-                # Remove from processing set
-                self.processing_resources.remove(resource_key)
-                
-                # Clean up if this is the last operation in the queue
-                if queue.empty():
-                    del self.queues[resource_key]
-                    del self.locks[resource_key]
-        
-        # Add operation to queue
-        await queue.put(operation_wrapper)
-        
-        # Start processing if this is the only operation in the queue
-        if queue.qsize() == 1:
-            asyncio.create_task(self._process_queue(resource_key))
-        
-        # Wait for the operation to complete
-        return await future
-    
-    async def _process_queue(self, resource_key: str):
-        """Process operations in the queue for a specific resource."""
-        queue = self.queues[resource_key]
-        
-        while not queue.empty():
-            operation = await queue.get()
-            try:
-                await operation()
-            except Exception as e:
-                logger.error(f"Error processing operation for {resource_key}: {str(e)}")
-            finally:
-                queue.task_done()
-    
+                QUEUE_DEPTH.labels(resource_type).dec()
+                self._waiting[resource_key] -= 1
+                if not self._waiting[resource_key]:
+                    del self._waiting[resource_key]
+                    del self._locks[resource_key]
+
+        # A caller that goes away (e.g. a client disconnect) does not cancel an operation it queued
+        return await asyncio.shield(asyncio.ensure_future(operation_wrapper()))
+
     def get_queue_size(self, resource_type: str, resource_id: UUID) -> int:
         """Get the current queue size for a resource."""
         resource_key = f"{resource_type}:{resource_id}"
-        return self.queues[resource_key].qsize() if resource_key in self.queues else 0
-    
+        return self._waiting.get(resource_key, 0)
+
     def get_last_processed_time(self, resource_type: str, resource_id: UUID) -> datetime:
         """Get the last processed timestamp for a resource."""
         resource_key = f"{resource_type}:{resource_id}"
         return self.last_processed[resource_key]
-    
+
     def is_resource_processing(self, resource_type: str, resource_id: UUID) -> bool:
         """Check if a resource is currently being processed."""
         resource_key = f"{resource_type}:{resource_id}"
-        return resource_key in self.processing_resources 
\ No newline at end of file
+        return resource_key in self.processing_resources
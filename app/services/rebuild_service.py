@@ -0,0 +1,177 @@
+from datetime import datetime, timezone
+from uuid import UUID
+import asyncio
+import logging
+
+from app.config import REBUILD_BATCH_SIZE
+from app.data_models.library import Library
+from app.data_models.rebuild_job import RebuildJob
+from app.indexing.auto_index import AutoIndex, build_inner_index
+from app.indexing import distance
+from app.indexing.base_index import BaseIndex
+from app.indexing.ivf_index import IVFIndex
+from app.indexing.sharded_index import ShardedIndex
+from app.monitoring.recall_monitor import recall_monitor
+from app.repository.mongo_repository import MongoRepository
+from app.services.executors import build_executor
+from app.services.index_service import IndexService, cache_index
+from app.services.queue_manager import QueueManager
+
+logger = logging.getLogger(__name__)
+
+# Finished jobs kept for status queries
+MAX_FINISHED_JOBS = 100
+
+_jobs: dict[UUID, RebuildJob] = {}
+_active_jobs: dict[UUID, UUID] = {}
+_job_tasks: dict[UUID, asyncio.Task] = {}
+
+
+class RebuildService:
+    """Rebuilds library indexes in the background and swaps them in when done.
+
+    Searches keep using the current index for the whole rebuild; the new index
+    type and data are written together in one update at the end.
+    """
+
+    def __init__(self, repository: MongoRepository):
+        self.library_repository = repository.library_repo
+        self.chunk_repository = repository.chunk_repo
+        self.index_service = IndexService(repository)
+        self.queue_manager = QueueManager()
+
+    def get_job(self, job_id: UUID) -> RebuildJob:
+        if job_id not in _jobs:
+            raise ValueError(f"Rebuild job with ID {job_id} not found")
+        return _jobs[job_id]
+
+    def get_latest_job(self, library_id: UUID) -> RebuildJob:
+        jobs = [job for job in _jobs.values() if job.library_id == library_id]
+        if not jobs:
+            raise ValueError(f"No rebuild job found for library {library_id}")
+        return max(jobs, key=lambda job: job.started_at)
+
+    async def start_rebuild(
+        self,
+        library_id: UUID,
+        index_type: str | None = None,
+        metric: str | None = None,
+        index_params: dict | None = None,
+    ) -> RebuildJob:
+        """Start rebuilding a library's index, as index_type and metric or its current ones.
+
+        index_params override the library's current index parameters while the index
+        type stays the same, and replace them when it changes.
+        """
+        if library_id in _active_jobs:
+            raise ValueError(f"Library {library_id} already has a rebuild in progress")
+        library = await self.library_repository.get_library(library_id, include_index=False)
+        index_type = index_type or library.index_type or "flat"
+        if index_type == (library.index_type or "flat"):
+            index_params = {**library.index_params, **(index_params or {})}
+        metric = distance.validate_metric(metric or library.metric)
+        self.index_service.new_index(index_type, metric, index_params)
+
+        job = RebuildJob(library_id=library_id, index_type=index_type, metric=metric, index_params=index_params or {})
+        self._register(job)
+        task = asyncio.get_running_loop().create_task(self._run(job, library))
+        _job_tasks[job.id] = task
+        task.add_done_callback(lambda _: _job_tasks.pop(job.id, None))
+        return job
+
+    def _register(self, job: RebuildJob) -> None:
+        finished = sorted((old for old in _jobs.values() if not old.is_active()), key=lambda old: old.started_at)
+        for old in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del _jobs[old.id]
+        _jobs[job.id] = job
+        _active_jobs[job.library_id] = job.id
+
+    async def _run(self, job: RebuildJob, library: Library) -> None:
+        job.status = "running"
+        try:
+            _, serving = await self.index_service.get_library_index(library.id)
+            loop = asyncio.get_running_loop()
+            if self._rebalances(job, serving):
+                # Only the shard count changes, so a copy of the serving index is rebalanced,
+                # which moves just the vectors whose shard changes instead of rebuilding them all
+                current = await self.library_repository.get_library(library.id)
+                index = await loop.run_in_executor(build_executor, self.index_service.load_index, current, False)
+                old_ids = set(index.vectors)
+                job.total_vectors = len(old_ids)
+                index = await loop.run_in_executor(build_executor, self._rebalance, job, index)
+            else:
+                # Remember what the serving index held, so writes made during the build can be replayed
+                old_ids = set(serving.vectors)
+                job.total_vectors = await self.chunk_repository.count_chunks(library.id)
+                index = await loop.run_in_executor(build_executor, self._build, job)
+
+            job.phase = "swapping"
+            await self.queue_manager.enqueue_operation(
+                "index", library.id, self._swap, job, index, old_ids
+            )
+            job.status = "completed"
+            job.phase = "done"
+            logger.info(f"Rebuilt index of library {library.id} as {job.index_type} in job {job.id}")
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+            logger.error(f"Rebuild job {job.id} for library {library.id} failed: {str(e)}")
+        finally:
+            job.finished_at = datetime.now(timezone.utc)
+            _active_jobs.pop(job.library_id, None)
+
+    def _rebalances(self, job: RebuildJob, serving: BaseIndex) -> bool:
+        """Whether the job only changes the shard count of a sharded index."""
+        if not isinstance(serving, ShardedIndex) or job.index_type != ShardedIndex.INDEX_TYPE:
+            return False
+        target = self.index_service.new_index(job.index_type, job.metric, job.index_params)
+        return (
+            target.metric == serving.metric
+            and target.n_shards != serving.n_shards
+            and target.shard_type == serving.shard_type
+            and target.shard_params == serving.shard_params
+        )
+
+    def _rebalance(self, job: RebuildJob, index: ShardedIndex) -> ShardedIndex:
+        """Move a copy of the serving index to the job's shard count; runs on the build pool."""
+        job.phase = "building"
+        index.rebalance(job.index_params.get("n_shards", index.n_shards))
+        job.processed_vectors = job.total_vectors
+        return index
+
+    def _build(self, job: RebuildJob) -> BaseIndex:
+        """Stream chunk embeddings from MongoDB into a new index; runs on the build pool."""
+        index = self.index_service.new_index(job.index_type, job.metric, job.index_params)
+        # IVF re-clusters on every add, so it is built once after streaming instead of per batch;
+        # sharded indexes are built once too, with every shard built in its own process
+        deferred = {} if isinstance(index, (IVFIndex, ShardedIndex)) else None
+        job.phase = "streaming"
+        for batch in self.chunk_repository.iter_embeddings(job.library_id, REBUILD_BATCH_SIZE):
+            if deferred is not None:
+                deferred.update(batch)
+            else:
+                index.add_vectors(batch)
+            job.processed_vectors += len(batch)
+        job.phase = "building"
+        if deferred and isinstance(index, ShardedIndex):
+            index.build(deferred)
+        elif deferred:
+            index.add_vectors(deferred)
+        if isinstance(index, AutoIndex) and (target := index.migration_target()):
+            index.swap(build_inner_index(target[0], dict(index.vectors), job.metric), target[1])
+        return index
+
+    async def _swap(self, job: RebuildJob, index: BaseIndex, old_ids: set[UUID]) -> None:
+        _, serving = await self.index_service.get_library_index(job.library_id)
+        current = serving.vectors
+        index.delete_vectors(list(old_ids - current.keys()))
+        # The serving index stores vectors prepared for its own metric, so the vectors added
+        # during the build are re-read as raw embeddings from their chunks
+        added = [vector_id for vector_id in current if vector_id not in old_ids]
+        chunks = await self.index_service.on_search_pool(self.chunk_repository.read_chunks, added, True)
+        index.add_vectors({chunk.id: chunk.embedding for chunk in chunks if chunk.embedding})
+        version = await self.library_repository.replace_index(
+            job.library_id, job.index_type, index.serialize(), job.metric, job.index_params
+        )
+        cache_index(job.library_id, version, index, snapshot=True)
+        recall_monitor.reset(job.library_id)
@@ -0,0 +1,52 @@
+"""Datasets and exact ground truth for index benchmarks."""
+from pathlib import Path
+import numpy as np
+
+
+def synthetic_clustered(
+    num_vectors: int, dim: int, num_clusters: int = 100, spread: float = 0.3, seed: int = 0
+) -> np.ndarray:
+    """Gaussian blobs around random centers, which is closer to real embeddings than uniform noise."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(num_clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, num_clusters, size=num_vectors)
+    noise = rng.normal(scale=spread, size=(num_vectors, dim)).astype(np.float32)
+    return centers[labels] + noise
+
+
+def read_fvecs(path: str | Path) -> np.ndarray:
+    """Read the .fvecs format: each row is an int32 dimension followed by that many float32 values."""
+    raw = np.fromfile(path, dtype=np.int32)
+    if raw.size == 0:
+        return np.zeros((0, 0), dtype=np.float32)
+    dim = raw[0]
+    return raw.reshape(-1, dim + 1)[:, 1:].view(np.float32).copy()
+
+
+def load_vectors(path: str | Path) -> np.ndarray:
+    """Load a 2-d float32 matrix from a .npy or .fvecs file."""
+    path = Path(path)
+    if path.suffix == ".npy":
+        vectors = np.load(path)
+    elif path.suffix == ".fvecs":
+        vectors = read_fvecs(path)
+    else:
+        raise ValueError(f"Unsupported dataset format: {path.suffix}")
+    if vectors.ndim != 2:
+        raise ValueError(f"Expected a 2-d matrix, got shape {vectors.shape}")
+    return vectors.astype(np.float32, copy=False)
+
+
+def ground_truth(data: np.ndarray, queries: np.ndarray, k: int, batch_size: int = 1024) -> np.ndarray:
+    """Exact cosine top-k row indices for each query, computed in batches."""
+    k = min(k, len(data))
+    data_norm = data / np.maximum(np.linalg.norm(data, axis=1, keepdims=True), 1e-12)
+    truth = np.empty((len(queries), k), dtype=np.int64)
+    for start in range(0, len(queries), batch_size):
+        batch = queries[start:start + batch_size]
+        batch = batch / np.maximum(np.linalg.norm(batch, axis=1, keepdims=True), 1e-12)
+        scores = batch @ data_norm.T
+        top = np.argpartition(-scores, min(k, scores.shape[1] - 1), axis=1)[:, :k]
+        order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1)
+        truth[start:start + batch_size] = np.take_along_axis(top, order, axis=1)
+    return truth
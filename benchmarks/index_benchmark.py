@@ -0,0 +1,220 @@
+"""Recall/latency benchmark for the vector indexes in app/indexing.
+
+Example:
+    python -m benchmarks.index_benchmark --num-vectors 20000 --dim 384 \\
+        --index flat,ivf,hnsw --ivf-n-probe 1,5,10 --output results.json
+"""
+import argparse
+import concurrent.futures
+import itertools
+import json
+import multiprocessing
+import resource
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+from uuid import UUID
+
+import numpy as np
+import orjson
+
+from app.indexing.base_index import BaseIndex
+from app.indexing.flat_index import FlatIndex
+from app.indexing.hnsw_index import HNSWIndex
+from app.indexing.ivf_index import IVFIndex
+from app.indexing.sharded_index import ShardedIndex
+from benchmarks.datasets import ground_truth, load_vectors, synthetic_clustered
+
+INDEX_TYPES: dict[str, type[BaseIndex]] = {
+    "flat": FlatIndex,
+    "ivf": IVFIndex,
+    "hnsw": HNSWIndex,
+    "sharded": ShardedIndex,
+}
+
+# Parameters that only affect search, so one built index can be swept over them
+SEARCH_PARAMS = {"ivf": ("n_probe",), "hnsw": ("ef_construction",)}
+
+
+def _row_id(row: int) -> UUID:
+    return UUID(int=row + 1)
+
+
+def _peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def benchmark_index(
+    index_type: str,
+    build_params: dict[str, Any],
+    search_sweep: list[dict[str, Any]],
+    data_file: str,
+    query_file: str,
+    truth_file: str,
+    k: int,
+) -> list[dict[str, Any]]:
+    """Build one index and measure it under every search-time setting in search_sweep."""
+    data = np.load(data_file, mmap_mode="r")
+    queries = np.load(query_file)
+    truth = np.load(truth_file)
+
+    vectors = {_row_id(row): vector.tolist() for row, vector in enumerate(data)}
+    index = INDEX_TYPES[index_type](**build_params)
+    start = time.perf_counter()
+    index.add_vectors(vectors)
+    build_seconds = time.perf_counter() - start
+    serialized_bytes = len(orjson.dumps(index.serialize()))
+
+    results = []
+    for search_params in search_sweep:
+        for name, value in search_params.items():
+            setattr(index, name, value)
+        latencies = []
+        recall_hits = 0
+        for query, expected in zip(queries, truth):
+            query = query.tolist()
+            start = time.perf_counter()
+            found = index.search(query, k)
+            latencies.append(time.perf_counter() - start)
+            recall_hits += len({vector_id.int - 1 for vector_id in found} & set(expected.tolist()))
+        latencies_ms = np.array(latencies) * 1000
+        results.append({
+            "index": index_type,
+            "build_params": build_params,
+            "search_params": search_params,
+            "num_vectors": len(data),
+            "dim": data.shape[1],
+            "k": k,
+            f"recall@{k}": recall_hits / (len(queries) * truth.shape[1]),
+            "qps": len(queries) / max(sum(latencies), 1e-9),
+            "p50_ms": float(np.percentile(latencies_ms, 50)),
+            "p99_ms": float(np.percentile(latencies_ms, 99)),
+            "build_seconds": build_seconds,
+            "build_vectors_per_second": len(data) / max(build_seconds, 1e-9),
+            "peak_rss_mb": _peak_rss_mb(),
+            "serialized_mb": serialized_bytes / 2**20,
+        })
+    return results
+
+
+def _split_params(index_type: str, params: dict[str, Any]) -> tuple[dict, dict]:
+    search_names = SEARCH_PARAMS.get(index_type, ())
+    build = {name: value for name, value in params.items() if name not in search_names}
+    search = {name: value for name, value in params.items() if name in search_names}
+    return build, search
+
+
+def sweep_configs(args: argparse.Namespace) -> list[tuple[str, dict, list[dict]]]:
+    """Expand the CLI parameter lists into (index, build params, search sweep) runs."""
+    grids = {
+        "flat": {},
+        "ivf": {"n_clusters": args.ivf_n_clusters, "n_probe": args.ivf_n_probe},
+        "hnsw": {"M": args.hnsw_m, "ef_construction": args.hnsw_ef},
+        "sharded": {"n_shards": args.shards, "shard_type": [args.shard_type]},
+    }
+    configs = []
+    for index_type in args.index:
+        grid = grids[index_type]
+        names = list(grid)
+        by_build: dict[str, tuple[dict, list[dict]]] = {}
+        for values in itertools.product(*(grid[name] for name in names)):
+            build, search = _split_params(index_type, dict(zip(names, values)))
+            key = json.dumps(build, sort_keys=True)
+            by_build.setdefault(key, (build, []))[1].append(search)
+        configs.extend((index_type, build, searches) for build, searches in by_build.values())
+    return configs
+
+
+def format_table(results: list[dict[str, Any]], k: int) -> str:
+    columns = [
+        ("index", "{}"), ("build_params", "{}"), ("search_params", "{}"),
+        (f"recall@{k}", "{:.3f}"), ("qps", "{:.1f}"), ("p50_ms", "{:.2f}"), ("p99_ms", "{:.2f}"),
+        ("build_vectors_per_second", "{:.0f}"), ("peak_rss_mb", "{:.0f}"), ("serialized_mb", "{:.1f}"),
+    ]
+    rows = [[name for name, _ in columns]] + [
+        [fmt.format(result[name]) for name, fmt in columns] for result in results
+    ]
+    widths = [max(len(row[i]) for row in rows) for i in range(len(columns))]
+    return "\n".join("  ".join(cell.ljust(width) for cell, width in zip(row, widths)) for row in rows)
+
+
+def _int_list(value: str) -> list[int]:
+    return [int(item) for item in value.split(",") if item]
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dataset", default="synthetic", help="'synthetic' or a .npy/.fvecs file")
+    parser.add_argument("--queries", default=None, help="Query .npy/.fvecs file; held-out dataset rows by default")
+    parser.add_argument("--num-vectors", type=int, default=10_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--num-clusters", type=int, default=100, help="Gaussian centers in the synthetic dataset")
+    parser.add_argument("--num-queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--index", type=lambda v: v.split(","), default=["flat", "ivf", "hnsw"])
+    parser.add_argument("--ivf-n-clusters", type=_int_list, default=[100])
+    parser.add_argument("--ivf-n-probe", type=_int_list, default=[1, 10])
+    parser.add_argument("--hnsw-m", type=_int_list, default=[16])
+    parser.add_argument("--hnsw-ef", type=_int_list, default=[5, 50])
+    parser.add_argument("--shards", type=_int_list, default=[4])
+    parser.add_argument("--shard-type", default="hnsw")
+    parser.add_argument("--output", default=None, help="Write results as JSON to this path")
+    parser.add_argument(
+        "--no-isolate", action="store_true",
+        help="Run every index in this process; peak RSS is then cumulative",
+    )
+    args = parser.parse_args(argv)
+    unknown = set(args.index) - set(INDEX_TYPES)
+    if unknown:
+        parser.error(f"Unknown index types: {', '.join(sorted(unknown))}")
+    return args
+
+
+def load_dataset(args: argparse.Namespace) -> tuple[np.ndarray, np.ndarray]:
+    if args.dataset == "synthetic":
+        vectors = synthetic_clustered(
+            args.num_vectors + args.num_queries, args.dim, args.num_clusters, seed=args.seed
+        )
+    else:
+        vectors = load_vectors(args.dataset)
+    if args.queries:
+        return vectors, load_vectors(args.queries)[:args.num_queries]
+    return vectors[:-args.num_queries], vectors[-args.num_queries:]
+
+
+def main(argv: list[str] | None = None) -> list[dict[str, Any]]:
+    args = parse_args(argv)
+    data, queries = load_dataset(args)
+    truth = ground_truth(data, queries, args.k)
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        files = {}
+        for name, array in (("data", data), ("queries", queries), ("truth", truth)):
+            files[name] = str(Path(workdir) / f"{name}.npy")
+            np.save(files[name], array)
+
+        for index_type, build_params, search_sweep in sweep_configs(args):
+            run_args = (
+                index_type, build_params, search_sweep,
+                files["data"], files["queries"], files["truth"], args.k,
+            )
+            if args.no_isolate:
+                results.extend(benchmark_index(*run_args))
+                continue
+            # A fresh process per build keeps peak RSS attributable to one index
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers=1, mp_context=multiprocessing.get_context("spawn")
+            ) as pool:
+                results.extend(pool.submit(benchmark_index, *run_args).result())
+
+    print(format_table(results, args.k))
+    if args.output:
+        Path(args.output).write_bytes(orjson.dumps(results, option=orjson.OPT_INDENT_2))
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+"""End-to-end HTTP load test of the FastAPI app with in-process stand-ins.
+
+The app in main.py is served in-process over httpx's ASGI transport, with an
+in-memory MongoDB and a deterministic local embedder, so no external service
+is needed. Example:
+
+    python -m benchmarks.load_test --workload mixed --concurrency 32 --requests 5000
+    python -m benchmarks.load_test --workload search --rate 200 --duration 30
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+from uuid import UUID
+
+# The app reads its settings at import time; the stand-ins make the key unused
+os.environ.setdefault("COHERE_API_KEY", "load-test")
+
+import httpx
+import numpy as np
+import orjson
+
+from app.repository.mongo_repository import MongoRepository
+from app.services.embedding_service import set_embedder
+from app.services.index_service import IndexService
+from benchmarks.stand_ins import (
+    HashingEmbedder,
+    InMemoryMongoClient,
+    InMemoryMongoRepository,
+    stage_timings,
+)
+
+WORDS = (
+    "vector index search library document chunk embedding cluster graph layer neighbor "
+    "query recall latency memory shard cosine similarity score ranking token text data "
+    "model learning network retrieval storage cache batch stream update delete insert"
+).split()
+
+# Operation name -> relative weight
+WORKLOADS: dict[str, dict[str, int]] = {
+    "search": {"search_text": 6, "search_vector": 3, "search_similar": 1},
+    "ingest": {"create_chunk": 8, "create_document": 1, "search_text": 1},
+    "mixed": {
+        "get_library": 1,
+        "get_document": 1,
+        "get_chunk": 2,
+        "create_chunk": 2,
+        "update_chunk": 1,
+        "update_document": 1,
+        "search_text": 2,
+    },
+}
+
+
+class LoadState:
+    """IDs created during seeding and the run, shared by all operations."""
+
+    def __init__(self, rng: random.Random, dim: int):
+        self.rng = rng
+        self.dim = dim
+        self.library_id: UUID | None = None
+        self.document_ids: list[str] = []
+        self.chunk_ids: list[str] = []
+
+    def sentence(self, words: int = 12) -> str:
+        return " ".join(self.rng.choice(WORDS) for _ in range(words))
+
+
+async def _request(client: httpx.AsyncClient, method: str, url: str, **kwargs: Any) -> httpx.Response:
+    response = await client.request(method, url, **kwargs)
+    response.raise_for_status()
+    return response
+
+
+async def op_search_text(client, state):
+    await _request(client, "POST", "/search/", json={
+        "library_id": str(state.library_id), "query": state.sentence(6), "k": 10,
+    })
+
+
+async def op_search_vector(client, state):
+    vector = np.asarray([state.rng.gauss(0, 1) for _ in range(state.dim)], dtype="<f4")
+    await _request(
+        client, "POST", "/search/vector",
+        params={"library_id": str(state.library_id), "k": 10},
+        content=vector.tobytes(),
+        headers={"content-type": "application/octet-stream"},
+    )
+
+
+async def op_search_similar(client, state):
+    await _request(client, "POST", "/search/similar", json={
+        "library_id": str(state.library_id), "chunk_ids": [state.rng.choice(state.chunk_ids)], "k": 10,
+    })
+
+
+async def op_get_library(client, state):
+    await _request(client, "GET", f"/library/{state.library_id}")
+
+
+async def op_get_document(client, state):
+    await _request(client, "GET", f"/document/{state.rng.choice(state.document_ids)}")
+
+
+async def op_get_chunk(client, state):
+    await _request(client, "GET", f"/chunks/{state.rng.choice(state.chunk_ids)}")
+
+
+async def op_create_document(client, state):
+    response = await _request(client, "POST", "/document/", params={
+        "library_id": str(state.library_id), "title": state.sentence(3),
+    })
+    state.document_ids.append(response.json()["id"])
+
+
+async def op_create_chunk(client, state):
+    response = await _request(client, "POST", "/chunks", params={
+        "document_id": state.rng.choice(state.document_ids),
+        "text": state.sentence(),
+        "section": "Body",
+        "order": state.rng.randrange(100),
+    })
+    state.chunk_ids.append(response.json()["id"])
+
+
+async def op_update_chunk(client, state):
+    await _request(client, "PUT", f"/chunks/{state.rng.choice(state.chunk_ids)}", params={
+        "text": state.sentence(),
+    })
+
+
+async def op_update_document(client, state):
+    await _request(client, "PUT", f"/document/{state.rng.choice(state.document_ids)}", params={
+        "title": state.sentence(3),
+    })
+
+
+OPERATIONS: dict[str, tuple[str, Callable[[httpx.AsyncClient, LoadState], Awaitable[None]]]] = {
+    "search_text": ("POST /search/", op_search_text),
+    "search_vector": ("POST /search/vector", op_search_vector),
+    "search_similar": ("POST /search/similar", op_search_similar),
+    "get_library": ("GET /library/{library_id}", op_get_library),
+    "get_document": ("GET /document/{document_id}", op_get_document),
+    "get_chunk": ("GET /chunks/{chunk_id}", op_get_chunk),
+    "create_document": ("POST /document/", op_create_document),
+    "create_chunk": ("POST /chunks", op_create_chunk),
+    "update_chunk": ("PUT /chunks/{chunk_id}", op_update_chunk),
+    "update_document": ("PUT /document/{document_id}", op_update_document),
+}
+
+
+class Recorder:
+    """Collects latency and per-stage timings for each route."""
+
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+        self.stages: dict[str, dict[str, float]] = defaultdict(lambda: defaultdict(float))
+
+    def record(self, route: str, seconds: float, stages: dict[str, float], error: bool) -> None:
+        self.latencies[route].append(seconds)
+        if error:
+            self.errors[route] += 1
+        for stage, value in stages.items():
+            self.stages[route][stage] += value
+
+    def report(self, elapsed: float) -> list[dict[str, Any]]:
+        rows = []
+        for route in sorted(self.latencies):
+            latencies_ms = np.array(self.latencies[route]) * 1000
+            count = len(latencies_ms)
+            stages = self.stages[route]
+            stage_ms = {
+                f"{stage}_ms": stages[stage] * 1000 / count
+                for stage in stages if not stage.endswith("_calls")
+            }
+            stage_calls = {stage: stages[stage] / count for stage in stages if stage.endswith("_calls")}
+            rows.append({
+                "route": route,
+                "requests": count,
+                "errors": self.errors[route],
+                "throughput_rps": count / elapsed,
+                "mean_ms": float(latencies_ms.mean()),
+                "p50_ms": float(np.percentile(latencies_ms, 50)),
+                "p95_ms": float(np.percentile(latencies_ms, 95)),
+                "p99_ms": float(np.percentile(latencies_ms, 99)),
+                **stage_ms,
+                **stage_calls,
+                # Time not spent in the stand-ins: framework, services and index work
+                "app_ms": float(latencies_ms.mean()) - sum(stage_ms.values()),
+            })
+        return rows
+
+
+async def seed(client: httpx.AsyncClient, state: LoadState, args: argparse.Namespace, repository) -> None:
+    response = await _request(client, "POST", "/library/", params={
+        "title": "load test", "index_type": args.index_type,
+    })
+    state.library_id = UUID(response.json()["id"])
+    for _ in range(args.seed_documents):
+        await op_create_document(client, state)
+        for _ in range(args.seed_chunks_per_document):
+            await op_create_chunk(client, state)
+
+    # Chunk creation does not index vectors, so build the library index directly
+    index_service = IndexService(repository)
+    library = await index_service.get_index(state.library_id)
+    index = index_service.load_index(library)
+    chunks = await repository.chunk_repo.get_chunks(
+        [UUID(chunk_id) for chunk_id in state.chunk_ids], include_embedding=True
+    )
+    index.add_vectors({chunk.id: chunk.embedding for chunk in chunks})
+    await index_service.save_new_index(state.library_id, None, index)
+
+
+async def drive(
+    client: httpx.AsyncClient, state: LoadState, args: argparse.Namespace, recorder: Recorder
+) -> float:
+    operations, weights = zip(*WORKLOADS[args.workload].items())
+    semaphore = asyncio.Semaphore(args.concurrency)
+    deadline = time.perf_counter() + args.duration if args.duration else None
+
+    async def one_request(arrival: float) -> None:
+        route, operation = OPERATIONS[state.rng.choices(operations, weights)[0]]
+        async with semaphore:
+            stages: dict[str, float] = {}
+            token = stage_timings.set(stages)
+            error = False
+            try:
+                await operation(client, state)
+            except Exception as e:
+                error = True
+                if args.verbose:
+                    print(f"{route} failed: {e}")
+            finally:
+                stage_timings.reset(token)
+        # Latency is measured from the scheduled arrival, so queueing behind the
+        # concurrency limit counts against the open-loop run
+        recorder.record(route, time.perf_counter() - arrival, stages, error)
+
+    def more() -> bool:
+        if deadline is not None:
+            return time.perf_counter() < deadline
+        return sent < args.requests
+
+    start = time.perf_counter()
+    sent = 0
+    if args.rate:
+        tasks = []
+        next_arrival = start
+        while more():
+            next_arrival += state.rng.expovariate(args.rate)
+            await asyncio.sleep(max(0.0, next_arrival - time.perf_counter()))
+            tasks.append(asyncio.create_task(one_request(next_arrival)))
+            sent += 1
+        await asyncio.gather(*tasks)
+    else:
+        async def worker() -> None:
+            nonlocal sent
+            while more():
+                sent += 1
+                await one_request(time.perf_counter())
+
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    return time.perf_counter() - start
+
+
+def format_table(rows: list[dict[str, Any]]) -> str:
+    columns = [
+        "route", "requests", "errors", "throughput_rps", "p50_ms", "p95_ms", "p99_ms",
+        "embed_ms", "mongo_ms", "mongo_calls", "app_ms",
+    ]
+    table = [columns] + [
+        [
+            f"{row.get(column, 0):.2f}" if isinstance(row.get(column, 0), float) else str(row.get(column, 0))
+            for column in columns
+        ]
+        for row in rows
+    ]
+    widths = [max(len(line[i]) for line in table) for i in range(len(columns))]
+    return "\n".join("  ".join(cell.ljust(width) for cell, width in zip(line, widths)) for line in table)
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workload", choices=sorted(WORKLOADS), default="mixed")
+    parser.add_argument("--concurrency", type=int, default=16, help="Maximum requests in flight")
+    parser.add_argument("--rate", type=float, default=None, help="Open-loop arrival rate in requests/s")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--duration", type=float, default=None, help="Run for this many seconds instead")
+    parser.add_argument("--index-type", default="flat")
+    parser.add_argument("--seed-documents", type=int, default=10)
+    parser.add_argument("--seed-chunks-per-document", type=int, default=50)
+    parser.add_argument("--dim", type=int, default=1024, help="Local embedder dimension")
+    parser.add_argument("--embed-latency-ms", type=float, default=0.0, help="Simulated provider latency")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="Write results as JSON to this path")
+    parser.add_argument("--verbose", action="store_true", help="Print failed requests")
+    return parser.parse_args(argv)
+
+
+async def run(args: argparse.Namespace) -> list[dict[str, Any]]:
+    from main import app
+
+    stand_in = InMemoryMongoClient()
+    repository = InMemoryMongoRepository(stand_in)
+    app.dependency_overrides[MongoRepository] = lambda: InMemoryMongoRepository(stand_in)
+    set_embedder(HashingEmbedder(dim=args.dim, latency_ms=args.embed_latency_ms))
+    state = LoadState(random.Random(args.seed), args.dim)
+    recorder = Recorder()
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://load-test") as client:
+            await seed(client, state, args, repository)
+            elapsed = await drive(client, state, args, recorder)
+    finally:
+        app.dependency_overrides.pop(MongoRepository, None)
+        set_embedder(None)
+    return recorder.report(elapsed)
+
+
+def main(argv: list[str] | None = None) -> list[dict[str, Any]]:
+    args = parse_args(argv)
+    rows = asyncio.run(run(args))
+    print(format_table(rows))
+    if args.output:
+        Path(args.output).write_bytes(orjson.dumps(rows, option=orjson.OPT_INDENT_2))
+    return rows
+
+
+if __name__ == "__main__":
+    main()
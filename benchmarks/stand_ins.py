@@ -0,0 +1,406 @@
+"""In-process stand-ins for MongoDB and the embedding provider.
+
+They let the FastAPI app run without external services while recording how much
+time each request spends in each stage (see ``stage_timings``).
+"""
+import copy
+import hashlib
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from types import SimpleNamespace
+from typing import Any, Iterable
+
+import numpy as np
+
+from app.config import MONGODB_DB_NAME
+from app.repository.mongo_repository import MongoRepository
+
+# Stage name -> accumulated seconds (and "<stage>_calls" counts) for the current request
+stage_timings: ContextVar[dict[str, float] | None] = ContextVar("stage_timings", default=None)
+
+
+@contextmanager
+def timed_stage(name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings = stage_timings.get()
+        if timings is not None:
+            timings[name] = timings.get(name, 0.0) + time.perf_counter() - start
+            timings[f"{name}_calls"] = timings.get(f"{name}_calls", 0) + 1
+
+
+def _get_path(document: dict, path: str) -> Any:
+    value = document
+    for part in path.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+    return value
+
+
+def _matches_condition(value: Any, condition: Any) -> bool:
+    if isinstance(condition, dict) and condition and all(key.startswith("$") for key in condition):
+        for operator, operand in condition.items():
+            if operator == "$in":
+                if isinstance(value, list):
+                    if not any(item in operand for item in value):
+                        return False
+                elif value not in operand:
+                    return False
+            elif operator == "$nin":
+                if value in operand:
+                    return False
+            elif operator == "$ne":
+                if value == operand:
+                    return False
+            elif operator == "$exists":
+                if (value is not None) != bool(operand):
+                    return False
+            elif operator in ("$gt", "$gte", "$lt", "$lte"):
+                if value is None:
+                    return False
+                compare = {
+                    "$gt": value > operand,
+                    "$gte": value >= operand,
+                    "$lt": value < operand,
+                    "$lte": value <= operand,
+                }
+                if not compare[operator]:
+                    return False
+            else:
+                raise NotImplementedError(f"Unsupported query operator: {operator}")
+        return True
+    if isinstance(value, list) and not isinstance(condition, list):
+        return condition in value
+    return value == condition
+
+
+def matches(document: dict, query: dict | None) -> bool:
+    return all(
+        _matches_condition(_get_path(document, path), condition)
+        for path, condition in (query or {}).items()
+    )
+
+
+def project(document: dict, projection: dict | None) -> dict:
+    if not projection:
+        return copy.deepcopy(document)
+    include = [field for field, flag in projection.items() if flag and field != "_id"]
+    if include or all(projection.values()):
+        result = {field: copy.deepcopy(document[field]) for field in include if field in document}
+        if projection.get("_id", 1) and "_id" in document:
+            result["_id"] = document["_id"]
+        return result
+    return {
+        field: copy.deepcopy(value)
+        for field, value in document.items()
+        if projection.get(field, 1)
+    }
+
+
+class InMemoryCursor:
+    """Subset of pymongo's Cursor: iteration, sort, skip and limit."""
+
+    def __init__(self, documents: list[dict]):
+        self._documents = documents
+        self._skip = 0
+        self._limit = 0
+
+    def sort(self, key: str | list[tuple[str, int]], direction: int = 1) -> "InMemoryCursor":
+        keys = [(key, direction)] if isinstance(key, str) else list(key)
+        for field, field_direction in reversed(keys):
+            self._documents.sort(
+                key=lambda document: (_get_path(document, field) is not None, _get_path(document, field)),
+                reverse=field_direction < 0,
+            )
+        return self
+
+    def skip(self, count: int) -> "InMemoryCursor":
+        self._skip = count
+        return self
+
+    def limit(self, count: int) -> "InMemoryCursor":
+        self._limit = count
+        return self
+
+    def batch_size(self, size: int) -> "InMemoryCursor":
+        return self
+
+    def __iter__(self):
+        documents = self._documents[self._skip:]
+        if self._limit:
+            documents = documents[:self._limit]
+        return iter(documents)
+
+
+class InMemoryCollection:
+    """Dict-backed collection implementing the pymongo calls the repositories make."""
+
+    def __init__(self, database: "InMemoryDatabase", name: str):
+        self.database = database
+        self.name = name
+        self._documents: dict[Any, dict] = {}
+        self._lock = threading.RLock()
+
+    def _find(self, query: dict | None) -> Iterable[dict]:
+        _id = (query or {}).get("_id")
+        if _id is not None and not isinstance(_id, dict):
+            document = self._documents.get(_id)
+            return [document] if document is not None and matches(document, query) else []
+        return [document for document in self._documents.values() if matches(document, query)]
+
+    def _apply_update(self, document: dict, update: dict, inserting: bool = False) -> None:
+        for operator, fields in update.items():
+            if operator == "$setOnInsert" and not inserting:
+                continue
+            for field, value in fields.items():
+                if operator in ("$set", "$setOnInsert"):
+                    document[field] = copy.deepcopy(value)
+                elif operator == "$unset":
+                    document.pop(field, None)
+                elif operator == "$inc":
+                    document[field] = document.get(field, 0) + value
+                elif operator == "$push":
+                    document.setdefault(field, []).append(copy.deepcopy(value))
+                elif operator == "$addToSet":
+                    items = value["$each"] if isinstance(value, dict) and "$each" in value else [value]
+                    existing = document.setdefault(field, [])
+                    existing.extend(item for item in items if item not in existing)
+                elif operator == "$pull":
+                    document[field] = [
+                        item for item in document.get(field, [])
+                        if not _matches_condition(item, value)
+                    ]
+                else:
+                    raise NotImplementedError(f"Unsupported update operator: {operator}")
+
+    def _upsert(self, query: dict, update: dict) -> dict:
+        document = {
+            field: copy.deepcopy(value)
+            for field, value in query.items()
+            if not field.startswith("$") and not isinstance(value, dict)
+        }
+        document.setdefault("_id", uuid.uuid4())
+        self._apply_update(document, update, inserting=True)
+        self._documents[document["_id"]] = document
+        return document
+
+    def find_one(self, query: dict | None = None, projection: dict | None = None) -> dict | None:
+        with timed_stage("mongo"), self._lock:
+            for document in self._find(query):
+                return project(document, projection)
+            return None
+
+    def find(self, query: dict | None = None, projection: dict | None = None) -> InMemoryCursor:
+        with timed_stage("mongo"), self._lock:
+            return InMemoryCursor([project(document, projection) for document in self._find(query)])
+
+    def count_documents(self, query: dict | None = None) -> int:
+        with timed_stage("mongo"), self._lock:
+            return len(list(self._find(query)))
+
+    def insert_one(self, document: dict) -> SimpleNamespace:
+        with timed_stage("mongo"), self._lock:
+            document = copy.deepcopy(document)
+            document.setdefault("_id", uuid.uuid4())
+            self._documents[document["_id"]] = document
+            return SimpleNamespace(inserted_id=document["_id"])
+
+    def insert_many(self, documents: list[dict], ordered: bool = True) -> SimpleNamespace:
+        with timed_stage("mongo"), self._lock:
+            inserted_ids = []
+            for document in documents:
+                document = copy.deepcopy(document)
+                document.setdefault("_id", uuid.uuid4())
+                self._documents[document["_id"]] = document
+                inserted_ids.append(document["_id"])
+            return SimpleNamespace(inserted_ids=inserted_ids)
+
+    def update_one(self, query: dict, update: dict, upsert: bool = False) -> SimpleNamespace:
+        with timed_stage("mongo"), self._lock:
+            for document in self._find(query):
+                self._apply_update(document, update)
+                return SimpleNamespace(matched_count=1, modified_count=1, upserted_id=None)
+            if upsert:
+                return SimpleNamespace(
+                    matched_count=0, modified_count=0, upserted_id=self._upsert(query, update)["_id"]
+                )
+            return SimpleNamespace(matched_count=0, modified_count=0, upserted_id=None)
+
+    def update_many(self, query: dict, update: dict, upsert: bool = False) -> SimpleNamespace:
+        with timed_stage("mongo"), self._lock:
+            documents = list(self._find(query))
+            for document in documents:
+                self._apply_update(document, update)
+            return SimpleNamespace(matched_count=len(documents), modified_count=len(documents), upserted_id=None)
+
+    def find_one_and_update(
+        self,
+        query: dict,
+        update: dict,
+        projection: dict | None = None,
+        upsert: bool = False,
+        return_document: bool = False,
+    ) -> dict | None:
+        with timed_stage("mongo"), self._lock:
+            for document in self._find(query):
+                before = project(document, projection)
+                self._apply_update(document, update)
+                return project(document, projection) if return_document else before
+            if upsert:
+                document = self._upsert(query, update)
+                return project(document, projection) if return_document else None
+            return None
+
+    def delete_one(self, query: dict) -> SimpleNamespace:
+        with timed_stage("mongo"), self._lock:
+            for document in self._find(query):
+                del self._documents[document["_id"]]
+                return SimpleNamespace(deleted_count=1)
+            return SimpleNamespace(deleted_count=0)
+
+    def delete_many(self, query: dict) -> SimpleNamespace:
+        with timed_stage("mongo"), self._lock:
+            documents = list(self._find(query))
+            for document in documents:
+                del self._documents[document["_id"]]
+            return SimpleNamespace(deleted_count=len(documents))
+
+    def bulk_write(self, requests: list[Any], ordered: bool = True) -> SimpleNamespace:
+        """Apply pymongo UpdateOne / ReplaceOne / InsertOne / DeleteOne requests in order."""
+        with timed_stage("mongo"), self._lock:
+            counts = {"inserted": 0, "matched": 0, "modified": 0, "deleted": 0, "upserted": 0}
+            for request in requests:
+                kind = type(request).__name__
+                if kind == "InsertOne":
+                    document = copy.deepcopy(request._doc)
+                    document.setdefault("_id", uuid.uuid4())
+                    self._documents[document["_id"]] = document
+                    counts["inserted"] += 1
+                elif kind == "DeleteOne":
+                    for document in self._find(request._filter):
+                        del self._documents[document["_id"]]
+                        counts["deleted"] += 1
+                        break
+                elif kind in ("UpdateOne", "ReplaceOne"):
+                    existing = next(iter(self._find(request._filter)), None)
+                    if existing is not None:
+                        if kind == "ReplaceOne":
+                            replacement = copy.deepcopy(request._doc)
+                            replacement["_id"] = existing["_id"]
+                            self._documents[existing["_id"]] = replacement
+                        else:
+                            self._apply_update(existing, request._doc)
+                        counts["matched"] += 1
+                        counts["modified"] += 1
+                    elif request._upsert:
+                        update = {"$set": request._doc} if kind == "ReplaceOne" else request._doc
+                        self._upsert(request._filter, update)
+                        counts["upserted"] += 1
+                else:
+                    raise NotImplementedError(f"Unsupported bulk write request: {kind}")
+            return SimpleNamespace(**{f"{name}_count": count for name, count in counts.items()})
+
+    def create_index(self, keys: Any, **kwargs: Any) -> str:
+        return kwargs.get("name", "index")
+
+
+class InMemoryDatabase:
+    def __init__(self, client: "InMemoryMongoClient", name: str):
+        self.client = client
+        self.name = name
+        self._collections: dict[str, InMemoryCollection] = {}
+
+    def __getitem__(self, name: str) -> InMemoryCollection:
+        if name not in self._collections:
+            self._collections[name] = InMemoryCollection(self, name)
+        return self._collections[name]
+
+    def __getattr__(self, name: str) -> InMemoryCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+
+class _InMemorySession:
+    def __enter__(self) -> "_InMemorySession":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        return None
+
+    @contextmanager
+    def start_transaction(self):
+        yield self
+
+
+class InMemoryMongoClient:
+    """Stand-in for pymongo.MongoClient; data lives for the lifetime of the object."""
+
+    def __init__(self):
+        self._databases: dict[str, InMemoryDatabase] = {}
+
+    def __getitem__(self, name: str) -> InMemoryDatabase:
+        if name not in self._databases:
+            self._databases[name] = InMemoryDatabase(self, name)
+        return self._databases[name]
+
+    def start_session(self) -> _InMemorySession:
+        return _InMemorySession()
+
+    def close(self) -> None:
+        return None
+
+
+class InMemoryMongoRepository(MongoRepository):
+    """MongoRepository wired to an InMemoryMongoClient instead of a live server."""
+
+    def __init__(self, client: InMemoryMongoClient):
+        self._stand_in_client = client
+        super().__init__()
+
+    def _connect(self) -> None:
+        self.client = self._stand_in_client
+        self.db = self.client[MONGODB_DB_NAME]
+
+    def close(self) -> None:
+        return None
+
+
+class HashingEmbedder:
+    """Deterministic local embedder: each token maps to a fixed random vector.
+
+    Texts that share words get similar embeddings, which is enough to exercise
+    the search path realistically. latency_ms simulates provider round trips.
+    """
+
+    def __init__(self, dim: int = 1024, latency_ms: float = 0.0):
+        self.dim = dim
+        self.latency_ms = latency_ms
+
+    @lru_cache(maxsize=65536)
+    def _token_vector(self, token: str) -> np.ndarray:
+        seed = int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), "little")
+        return np.random.default_rng(seed).standard_normal(self.dim).astype(np.float32)
+
+    def _embed_one(self, text: str) -> list[float]:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for token in text.lower().split():
+            vector += self._token_vector(token)
+        norm = np.linalg.norm(vector)
+        if norm == 0:
+            vector[0] = 1.0
+            norm = 1.0
+        return (vector / norm).tolist()
+
+    def embed(self, texts: list[str], input_type: str) -> list[list[float]]:
+        with timed_stage("embed"):
+            if self.latency_ms:
+                time.sleep(self.latency_ms / 1000)
+            return [self._embed_one(text) for text in texts]
@@ -1,18 +1,97 @@
+from contextlib import asynccontextmanager
+from uuid import UUID
+import asyncio
+import logging
+
 from fastapi import FastAPI
-import cohere
 from app.api_layer.search_routes import search_router
 from app.api_layer.library_routes import library_router
 from app.api_layer.document_routes import document_router
 from app.api_layer.chunk_routes import chunk_router
+from app.api_layer.health_routes import health_router
+from app.api_layer.metrics_routes import metrics_router
+from app.config import WARMUP_LIBRARIES
+from app.monitoring.metrics import metrics_middleware
+from app.monitoring.startup import startup_tracker
+from app.monitoring.tracing import tracing_middleware
+from app.repository.mongo_repository import MongoRepository, close_client
+from app.services.embedding_service import get_embedder
+from app.services import index_snapshots
+from app.services.index_service import IndexService, snapshot_cached_indexes
+
+logger = logging.getLogger(__name__)
+
+
+def warmup_library_ids() -> list[UUID] | None:
+    """WARMUP_LIBRARIES as library IDs; None means every library."""
+    if "all" in WARMUP_LIBRARIES:
+        return None
+    library_ids = []
+    for value in WARMUP_LIBRARIES:
+        try:
+            library_ids.append(UUID(value))
+        except ValueError:
+            logger.error(f"Ignoring invalid library ID in WARMUP_LIBRARIES: {value}")
+    return library_ids
+
+
+async def warm_up(repository: MongoRepository, library_ids: list[UUID] | None) -> None:
+    """Load the indexes of hot libraries, then mark the app ready."""
+    try:
+        if library_ids is None or library_ids:
+            with startup_tracker.phase("warmup"):
+                try:
+                    warmed = await IndexService(repository).warm_up(library_ids)
+                    logger.info(f"Warmed up {warmed} library indexes")
+                except Exception as e:
+                    logger.error(f"Failed to warm up library indexes: {str(e)}")
+        startup_tracker.mark_ready()
+    finally:
+        repository.close()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    repository = MongoRepository()
+    # Secondary indexes and data migrations are applied before serving requests
+    with startup_tracker.phase("database"):
+        try:
+            await repository.prepare_database()
+        except Exception as e:
+            logger.error(f"Failed to prepare database: {str(e)}")
+    with startup_tracker.phase("embedder"):
+        try:
+            get_embedder()
+        except Exception as e:
+            logger.error(f"Failed to create embedding client: {str(e)}")
+    # Hot libraries are loaded while the app already serves requests, so the liveness probe
+    # answers during a long warmup; the readiness probe fails until warmup is done
+    warmup = asyncio.create_task(warm_up(repository, warmup_library_ids()))
+    yield
+    if not warmup.done():
+        warmup.cancel()
+    await asyncio.gather(warmup, return_exceptions=True)
+    # Snapshot indexes changed since their last snapshot, so the next start can load them from disk
+    queued = snapshot_cached_indexes()
+    if queued:
+        logger.info(f"Writing {queued} index snapshots before shutdown")
+        await asyncio.get_running_loop().run_in_executor(None, index_snapshots.wait_for_snapshots)
+    close_client()
+
 
 app = FastAPI(
     title="Vector Database API",
     description="A REST API for managing libraries, documents, and chunks with vector search capabilities",
+    lifespan=lifespan,
 )
 
-co = cohere.Client("A1Fi5KBBNoekwBPIa833CBScs6Z2mHEtOXxr52KO")
 app.include_router(search_router, tags=["Search"])
 
 app.include_router(document_router, tags=["Document"])
 app.include_router(library_router, tags=["Library"])
 app.include_router(chunk_router, tags=["Chunk"])
+app.include_router(metrics_router, tags=["Metrics"])
+app.include_router(health_router, tags=["Health"])
+
+app.middleware("http")(metrics_middleware)
+app.middleware("http")(tracing_middleware)
@@ -0,0 +1,26 @@
+import os
+
+# app.config requires an API key at import time; the tests never call the provider
+os.environ.setdefault("COHERE_API_KEY", "test")
+
+import pytest
+
+from app.services import index_snapshots
+from benchmarks.stand_ins import InMemoryMongoClient, InMemoryMongoRepository
+
+
+@pytest.fixture
+def stand_in() -> InMemoryMongoClient:
+    return InMemoryMongoClient()
+
+
+@pytest.fixture
+def repository(stand_in) -> InMemoryMongoRepository:
+    return InMemoryMongoRepository(stand_in)
+
+
+@pytest.fixture
+def snapshot_dir(tmp_path, monkeypatch):
+    directory = tmp_path / "snapshots"
+    monkeypatch.setattr(index_snapshots, "INDEX_SNAPSHOT_DIR", str(directory))
+    return directory
@@ -0,0 +1,47 @@
+import random
+from uuid import UUID, uuid4
+
+from app.data_models.library import LibraryCreate
+from app.services import index_snapshots
+from app.services.index_service import snapshot_cached_indexes
+from app.services.ingest_service import IngestService
+from app.services.lexical_service import LexicalService
+from app.services.library_service import LibraryService
+
+DIMENSION = 8
+
+
+def make_documents(n_documents: int, n_chunks: int) -> dict[UUID, list[tuple[UUID, str]]]:
+    return {
+        uuid4(): [(uuid4(), f"shared text chunk {i} of document {d}") for i in range(n_chunks)]
+        for d in range(n_documents)
+    }
+
+
+async def records(documents: dict[UUID, list[tuple[UUID, str]]], seed: int = 3):
+    rng = random.Random(seed)
+    number = 0
+    for document_id, chunks in documents.items():
+        number += 1
+        yield number, {"type": "document", "id": str(document_id), "title": "Document"}
+        for chunk_id, text in chunks:
+            number += 1
+            embedding = [rng.uniform(-1, 1) for _ in range(DIMENSION)]
+            yield number, {"id": str(chunk_id), "document_id": str(document_id), "text": text, "embedding": embedding}
+
+
+async def ingest_documents(repository, library_id: UUID, n_documents: int, n_chunks: int, seed: int = 3):
+    """Ingest new documents with random embeddings into a library; returns them."""
+    documents = make_documents(n_documents, n_chunks)
+    await IngestService(repository).ingest(library_id, records(documents, seed))
+    return documents
+
+
+async def create_library(repository, n_documents: int = 3, n_chunks: int = 4, **options):
+    """A library whose vectors, BM25 index and index snapshot are all loaded."""
+    library = await LibraryService(repository).create_library(LibraryCreate(title="Library", **options))
+    documents = await ingest_documents(repository, library.id, n_documents, n_chunks)
+    await LexicalService(repository).get_bm25_index(library.id)
+    snapshot_cached_indexes()
+    index_snapshots.wait_for_snapshots()
+    return library.id, documents
@@ -0,0 +1,117 @@
+import random
+import threading
+from uuid import uuid4
+
+import pytest
+
+from app.indexing import bm25_index
+from app.indexing.bm25_index import BM25Index
+
+WORDS = [f"w{i}" for i in range(60)]
+QUERIES = ["w0 w1", "w2 w3 w4", "w5", "w0 w7 w9 w11 w13", "w1 w58 w59", "w40 w41 w42 w43"]
+
+
+def random_text(rng: random.Random) -> str:
+    # Skewed term choice gives lists of very different lengths, which is where MaxScore prunes
+    return " ".join(WORDS[min(int(rng.expovariate(0.08)), len(WORDS) - 1)] for _ in range(rng.randint(3, 30)))
+
+
+def build_index(n_docs: int, seed: int = 7) -> tuple[BM25Index, list, random.Random]:
+    rng = random.Random(seed)
+    index = BM25Index()
+    doc_ids = [uuid4() for _ in range(n_docs)]
+    for doc_id in doc_ids:
+        index.add_document(doc_id, random_text(rng))
+    return index, doc_ids, rng
+
+
+def exhaustive_top_k(index: BM25Index, query: str, k: int) -> list[tuple[float, object]]:
+    """Score every live document that matches a query term, without any pruning."""
+    avgdl = index.total_length / len(index.doc_numbers)
+    scores = {}
+    for term in set(index.tokenize(query)):
+        if term not in index.postings:
+            continue
+        numbers, tfs = index.postings[term]
+        idf = index._idf(len(numbers))
+        for number, tf in zip(numbers, tfs):
+            doc_id = index.doc_ids[number]
+            if doc_id is None:
+                continue
+            length_norm = index.k1 * (1 - index.b + index.b * index.doc_lengths[number] / avgdl)
+            scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (index.k1 + 1) / (tf + length_norm)
+    return sorted(((score, doc_id) for doc_id, score in scores.items()), reverse=True)[:k]
+
+
+def assert_matches_exhaustive(index: BM25Index, k: int) -> None:
+    for query in QUERIES:
+        pruned = index.search(query, k)
+        ranking = exhaustive_top_k(index, query, len(index))
+        expected = ranking[:k]
+        assert [score for _, score in pruned] == pytest.approx([score for score, _ in expected])
+        # Ties may be broken differently, so ids are compared only where scores are distinct
+        all_scores = [score for score, _ in ranking]
+        for (doc_id, score), (_, expected_id) in zip(pruned, expected):
+            if sum(other == pytest.approx(score) for other in all_scores) == 1:
+                assert doc_id == expected_id
+
+
+@pytest.mark.parametrize("k", [1, 5, 20])
+def test_pruned_search_matches_exhaustive(k):
+    index, _, _ = build_index(500)
+    assert_matches_exhaustive(index, k)
+
+
+@pytest.mark.parametrize("k", [1, 5, 20])
+def test_pruned_search_matches_exhaustive_with_tombstones(k):
+    index, doc_ids, rng = build_index(500)
+    # Stays under COMPACT_RATIO, so deleted documents remain in the postings as tombstones
+    for doc_id in rng.sample(doc_ids, 100):
+        index.remove_document(doc_id)
+    assert index.num_deleted == 100
+    assert_matches_exhaustive(index, k)
+
+
+@pytest.mark.parametrize("k", [1, 5, 20])
+def test_pruned_search_matches_exhaustive_after_compaction(k):
+    index, doc_ids, rng = build_index(500)
+    deleted = rng.sample(doc_ids, 200)
+    for doc_id in deleted:
+        index.remove_document(doc_id)
+    assert index.num_deleted < 200
+    assert_matches_exhaustive(index, k)
+    # Replaced documents are tombstoned and re-appended
+    for doc_id in rng.sample(sorted(set(doc_ids) - set(deleted)), 50):
+        index.add_document(doc_id, random_text(rng))
+    assert_matches_exhaustive(index, k)
+    found = {doc_id for query in QUERIES for doc_id, _ in index.search(query, 50)}
+    assert not found & set(deleted)
+
+
+def test_search_does_not_hold_lock_while_scoring(monkeypatch):
+    index, _, rng = build_index(300)
+    scoring = threading.Event()
+    release = threading.Event()
+    calls = 0
+
+    def blocking_expired(budget):
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            scoring.set()
+            release.wait(5)
+        return False
+
+    monkeypatch.setattr(bm25_index, "BUDGET_CHECK_INTERVAL", 1)
+    monkeypatch.setattr(bm25_index, "expired", blocking_expired)
+    search = threading.Thread(target=index.search, args=("w0 w1", 5))
+    search.start()
+    assert scoring.wait(5)
+    # A writer gets the lock while the search is still scoring
+    added = threading.Thread(target=index.add_document, args=(uuid4(), random_text(rng)))
+    added.start()
+    added.join(5)
+    assert not added.is_alive()
+    release.set()
+    search.join(5)
+    assert len(index) == 301
@@ -0,0 +1,156 @@
+import asyncio
+from uuid import UUID
+
+import pytest
+
+from app.config import MONGODB_DB_NAME
+from app.services import deletion_service, index_service, index_snapshots, lexical_service
+from app.services.deletion_service import DeletionService
+from app.services.index_service import IndexService
+from app.services.lexical_service import LexicalService
+from tests.helpers import create_library
+
+def rows(stand_in, collection: str, **query) -> list[dict]:
+    documents = stand_in[MONGODB_DB_NAME][collection]._documents.values()
+    return [document for document in documents if all(document.get(k) == v for k, v in query.items())]
+
+
+def snapshots(snapshot_dir, library_id: UUID) -> list:
+    return list(snapshot_dir.glob(f"{library_id}-*.snapshot"))
+
+
+def test_delete_library_removes_rows_vectors_bm25_entries_and_snapshots(repository, stand_in, snapshot_dir):
+    async def scenario():
+        library_id, documents = await create_library(repository)
+        other_id, other_documents = await create_library(repository)
+        assert library_id in index_service._index_cache
+        assert library_id in lexical_service._indexes
+        assert snapshots(snapshot_dir, library_id)
+
+        job = await DeletionService(repository).delete_library(library_id)
+
+        assert job.status == "completed"
+        assert job.phase == "done"
+        assert job.deleted_documents == len(documents)
+        assert job.deleted_chunks == sum(len(chunks) for chunks in documents.values())
+        assert not rows(stand_in, "libraries", _id=library_id)
+        assert not rows(stand_in, "documents", library_id=library_id)
+        assert not rows(stand_in, "chunks", library_id=library_id)
+        assert library_id not in index_service._index_cache
+        assert library_id not in lexical_service._indexes
+        assert not snapshots(snapshot_dir, library_id)
+
+        # The other library keeps its rows, vectors, BM25 index and snapshot
+        _, other_index = await IndexService(repository).get_library_index(other_id)
+        assert other_index.num_vectors() == sum(len(chunks) for chunks in other_documents.values())
+        assert len(rows(stand_in, "chunks", library_id=other_id)) == other_index.num_vectors()
+        assert other_id in lexical_service._indexes
+        assert snapshots(snapshot_dir, other_id)
+
+    asyncio.run(scenario())
+
+
+def test_delete_document_removes_its_vectors_bm25_entries_and_rows(repository, stand_in, snapshot_dir):
+    async def scenario():
+        library_id, documents = await create_library(repository)
+        document_id, deleted = next(iter(documents.items()))
+        deleted_ids = {chunk_id for chunk_id, _ in deleted}
+
+        job = await DeletionService(repository).delete_document(document_id)
+
+        assert job.status == "completed"
+        assert job.deleted_documents == 1
+        assert job.deleted_chunks == len(deleted)
+        assert not rows(stand_in, "documents", _id=document_id)
+        assert not rows(stand_in, "chunks", document_id=document_id)
+        remaining = {row["_id"] for row in rows(stand_in, "chunks", library_id=library_id)}
+        assert remaining and not remaining & deleted_ids
+
+        _, index = await IndexService(repository).get_library_index(library_id)
+        assert set(index.vectors) == remaining
+        bm25 = await LexicalService(repository).get_bm25_index(library_id)
+        assert not set(bm25.doc_numbers) & deleted_ids
+        assert not {doc_id for doc_id, _ in bm25.search("shared text chunk", 100)} & deleted_ids
+
+        # The delete publishes a new index version; its snapshot is the only one left
+        index_snapshots.wait_for_snapshots()
+        library = await repository.library_repo.get_library(library_id, include_index=False)
+        assert snapshots(snapshot_dir, library_id) == [index_snapshots.snapshot_path(library_id, library.index_version)]
+        restored = index_snapshots.read_snapshot(library_id, index_service.index_key(library))
+        assert set(restored.vectors) == remaining
+
+    asyncio.run(scenario())
+
+
+def test_failed_library_delete_reports_phase_and_can_be_retried(repository, stand_in, snapshot_dir, monkeypatch):
+    async def scenario():
+        library_id, documents = await create_library(repository)
+        document_repository = type(repository.document_repo)
+        delete_documents = document_repository.delete_documents_by_library
+
+        async def failing_delete(self, library_id):
+            raise ValueError("Database error: connection reset")
+
+        monkeypatch.setattr(document_repository, "delete_documents_by_library", failing_delete)
+        service = DeletionService(repository)
+        job = await service.delete_library(library_id, background=True)
+        await deletion_service._job_tasks[job.id]
+
+        # Chunks went first; the documents and the library record are still there
+        assert job.status == "failed"
+        assert job.phase == "documents"
+        assert "connection reset" in job.error
+        assert job.finished_at is not None
+        assert job.deleted_chunks == sum(len(chunks) for chunks in documents.values())
+        assert not rows(stand_in, "chunks", library_id=library_id)
+        assert len(rows(stand_in, "documents", library_id=library_id)) == len(documents)
+        assert rows(stand_in, "libraries", _id=library_id)
+        assert library_id not in deletion_service._active_jobs
+        assert service.get_job(job.id) is job
+
+        # A foreground delete that fails raises instead of returning the job
+        with pytest.raises(ValueError, match="connection reset"):
+            await service.delete_library(library_id)
+
+        monkeypatch.setattr(document_repository, "delete_documents_by_library", delete_documents)
+        retry = await service.delete_library(library_id)
+
+        assert retry.id != job.id
+        assert retry.status == "completed"
+        assert retry.deleted_chunks == 0
+        assert retry.deleted_documents == len(documents)
+        assert not rows(stand_in, "libraries", _id=library_id)
+        assert not rows(stand_in, "documents", library_id=library_id)
+        assert library_id not in index_service._index_cache
+        assert library_id not in lexical_service._indexes
+        assert not snapshots(snapshot_dir, library_id)
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_deletes_of_a_library_share_one_job(repository, stand_in, snapshot_dir):
+    async def scenario():
+        library_id, _ = await create_library(repository)
+        service = DeletionService(repository)
+        library_exists = service.library_repository.library_exists
+
+        async def slow_library_exists(library_id):
+            # A database round trip that gives way to the other request
+            await asyncio.sleep(0)
+            return await library_exists(library_id)
+
+        service.library_repository.library_exists = slow_library_exists
+
+        first, second = await asyncio.gather(
+            service.delete_library(library_id, background=True),
+            service.delete_library(library_id, background=True),
+        )
+        assert first.id == second.id
+        await deletion_service._job_tasks[first.id]
+        assert first.status == "completed"
+
+        with pytest.raises(ValueError, match="not found"):
+            await service.delete_library(library_id)
+        assert library_id not in deletion_service._active_jobs
+
+    asyncio.run(scenario())
@@ -0,0 +1,121 @@
+import asyncio
+
+from app.indexing import auto_index
+from app.indexing.auto_index import AutoIndex
+from app.services import index_service
+from app.services.index_service import IndexService
+from tests.helpers import create_library, ingest_documents
+
+
+def chunk_ids(documents) -> set:
+    return {chunk_id for chunks in documents.values() for chunk_id, _ in chunks}
+
+
+def test_writes_during_auto_migration_are_kept(repository, snapshot_dir, monkeypatch):
+    monkeypatch.setattr(auto_index, "AUTO_FLAT_MAX_VECTORS", 40)
+
+    async def scenario():
+        library_id, documents = await create_library(repository, n_documents=4, n_chunks=10, index_type="auto")
+        # Crossing the flat limit schedules the migration; writes keep coming while it builds
+        added = await ingest_documents(repository, library_id, 2, 10, seed=1)
+        deleted = list(chunk_ids(documents))[:5]
+        for seed in range(2, 6):
+            added.update(await ingest_documents(repository, library_id, 1, 5, seed=seed))
+            await asyncio.sleep(0)
+        await IndexService(repository).delete_vectors(library_id, deleted)
+        while index_service._migration_tasks:
+            await asyncio.gather(*index_service._migration_tasks.values())
+
+        index_service._index_cache.pop(library_id, None)
+        library = await repository.library_repo.get_library(library_id)
+        index = AutoIndex.deserialize(library.index_data)
+        assert index.current_type == "hnsw"
+        assert set(index.vectors) == (chunk_ids(documents) | chunk_ids(added)) - set(deleted)
+
+    asyncio.run(scenario())
+
+
+def test_autotune_holds_out_its_sample_queries(repository, snapshot_dir, monkeypatch):
+    from app.indexing import autotuner
+
+    seen = {}
+    tune_index = autotuner.tune_index
+
+    def recording_tune_index(candidates, vectors, queries, k, target_recall):
+        seen.update(candidates=candidates, vectors=vectors, queries=queries)
+        return tune_index(candidates, vectors, queries, k, target_recall)
+
+    monkeypatch.setattr(autotuner, "tune_index", recording_tune_index)
+
+    async def scenario():
+        library_id, documents = await create_library(repository, n_documents=10, n_chunks=20, index_type="hnsw")
+        tuning = await IndexService(repository).autotune(library_id, k=5, tune_build=False)
+        assert tuning["num_vectors"] == 200
+        assert tuning["num_queries"] == 20
+        held_out = chunk_ids(documents) - set(seen["vectors"])
+        assert len(held_out) == 20
+        for candidate in seen["candidates"]:
+            assert not held_out & set(candidate.vectors)
+
+        # The held-out vectors only left the tuning copy, not the library's index
+        _, index = await IndexService(repository).get_library_index(library_id)
+        assert set(index.vectors) == chunk_ids(documents)
+
+    asyncio.run(scenario())
+
+
+def test_writes_during_autotune_are_kept(repository, snapshot_dir):
+    async def scenario():
+        library_id, documents = await create_library(repository, n_documents=10, n_chunks=20, index_type="ivf")
+        service = IndexService(repository)
+        tuning, added = await asyncio.gather(
+            service.autotune(library_id, k=5),
+            ingest_documents(repository, library_id, 2, 10, seed=7),
+        )
+        index_service._index_cache.pop(library_id, None)
+        library = await repository.library_repo.get_library(library_id)
+        index = service.get_index_class("ivf").deserialize(library.index_data)
+        assert set(index.vectors) == chunk_ids(documents) | chunk_ids(added)
+        assert library.index_tuning["build_params"] == tuning["build_params"]
+
+    asyncio.run(scenario())
+
+
+def test_federated_search_with_shared_cutoff_matches_exhaustive_top_k(repository, snapshot_dir, monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from app.services.embedding_service import set_embedder
+    from benchmarks.stand_ins import HashingEmbedder
+    from tests.helpers import DIMENSION
+
+    # One worker runs the library searches in turn, so every search after the first has a cutoff
+    executor = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(index_service, "index_executor", executor)
+    set_embedder(HashingEmbedder(dim=DIMENSION))
+
+    async def scenario():
+        service = IndexService(repository)
+        library_ids = [
+            (await create_library(repository, n_documents=2, n_chunks=15, index_type=index_type))[0]
+            for index_type in ["flat", "flat", "ivf", "flat"]
+        ]
+        query = "shared text"
+        embedding = service.generate_query_embedding(query)
+        exhaustive = []
+        for library_id in library_ids:
+            _, index = await service.get_library_index(library_id)
+            exhaustive += [score for _, score in index.range_search(embedding, float("-inf"))]
+
+        hits, timings = await service.search_federated(library_ids, query, k=5)
+
+        assert [score for _, score, _ in hits] == sorted(exhaustive, reverse=True)[:5]
+        cutoffs = [timing["min_score"] for timing in timings]
+        assert cutoffs[0] is None
+        assert all(cutoff is not None for cutoff in cutoffs[1:])
+        assert cutoffs[1:] == sorted(cutoffs[1:])
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        set_embedder(None)
+        executor.shutdown()
@@ -0,0 +1,47 @@
+import asyncio
+
+from app.services import index_service, ingest_service
+from app.services.index_service import IndexService
+from app.services.ingest_service import IngestService
+from tests.helpers import create_library, make_documents, records
+
+
+def chunk_ids(documents) -> set:
+    return {chunk_id for chunks in documents.values() for chunk_id, _ in chunks}
+
+
+def test_concurrent_ingests_into_a_library_are_all_indexed(repository, snapshot_dir, monkeypatch):
+    monkeypatch.setattr(ingest_service, "INGEST_INDEX_BATCH_SIZE", 3)
+
+    async def scenario():
+        library_id, documents = await create_library(repository)
+        batches = [make_documents(3, 4) for _ in range(6)]
+        await asyncio.gather(*(
+            IngestService(repository).ingest(library_id, records(batch, seed))
+            for seed, batch in enumerate(batches)
+        ))
+
+        index_service._index_cache.pop(library_id, None)
+        _, index = await IndexService(repository).get_library_index(library_id)
+        expected = chunk_ids(documents).union(*(chunk_ids(batch) for batch in batches))
+        assert set(index.vectors) == expected
+
+    asyncio.run(scenario())
+
+
+def test_documents_of_another_library_are_rejected(repository, snapshot_dir):
+    async def scenario():
+        other_id, other_documents = await create_library(repository)
+        library_id, _ = await create_library(repository)
+        taken = next(iter(other_documents))
+        documents = {taken: make_documents(1, 3).popitem()[1]}
+
+        result = await IngestService(repository).ingest(library_id, records(documents))
+        assert result.documents == 0 and result.chunks == 0
+        assert result.error_count == 4
+
+        document = await repository.document_repo.get_document(taken)
+        assert document.library_id == other_id
+        assert set(document.chunks) == {chunk_id for chunk_id, _ in other_documents[taken]}
+
+    asyncio.run(scenario())
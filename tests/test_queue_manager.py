@@ -0,0 +1,69 @@
+import asyncio
+from uuid import uuid4
+
+from app.services.queue_manager import QueueManager
+
+
+def test_operations_on_a_resource_are_serialized_across_instances():
+    async def scenario():
+        resource_id = uuid4()
+        running = 0
+        overlapped = False
+        order = []
+
+        async def operation(name):
+            nonlocal running, overlapped
+            running += 1
+            overlapped = overlapped or running > 1
+            await asyncio.sleep(0.01)
+            order.append(name)
+            running -= 1
+            return name
+
+        # Every service builds its own QueueManager, so each call here uses a new one
+        results = await asyncio.gather(*(
+            QueueManager().enqueue_operation("index", resource_id, operation, i) for i in range(5)
+        ))
+        assert results == list(range(5))
+        assert order == list(range(5))
+        assert not overlapped
+        assert QueueManager().get_queue_size("index", resource_id) == 0
+
+    asyncio.run(scenario())
+
+
+def test_other_resources_are_not_blocked():
+    async def scenario():
+        blocked = asyncio.Event()
+
+        async def wait():
+            await blocked.wait()
+
+        async def release():
+            blocked.set()
+            return True
+
+        held = asyncio.ensure_future(QueueManager().enqueue_operation("index", uuid4(), wait))
+        assert await asyncio.wait_for(QueueManager().enqueue_operation("index", uuid4(), release), 1)
+        await held
+
+    asyncio.run(scenario())
+
+
+def test_failed_operation_releases_the_resource():
+    async def scenario():
+        resource_id = uuid4()
+
+        async def fail():
+            raise ValueError("boom")
+
+        async def succeed():
+            return "ok"
+
+        try:
+            await QueueManager().enqueue_operation("index", resource_id, fail)
+        except ValueError as e:
+            assert str(e) == "boom"
+        assert await asyncio.wait_for(QueueManager().enqueue_operation("index", resource_id, succeed), 1) == "ok"
+
+    asyncio.run(scenario())
@@ -0,0 +1,57 @@
+import asyncio
+
+import pytest
+
+from app.services import index_service, rebuild_service
+from app.services.index_service import IndexService
+from app.services.rebuild_service import RebuildService
+from tests.helpers import create_library, ingest_documents
+
+
+def chunk_ids(documents) -> set:
+    return {chunk_id for chunks in documents.values() for chunk_id, _ in chunks}
+
+
+def test_ingest_during_rebuild_is_kept_and_stored_under_the_new_type(repository, snapshot_dir):
+    async def scenario():
+        library_id, documents = await create_library(repository, n_documents=20, n_chunks=10)
+        job = await RebuildService(repository).start_rebuild(library_id, "hnsw")
+        added = {}
+        for seed in range(10):
+            added.update(await ingest_documents(repository, library_id, 2, 5, seed=seed))
+            await asyncio.sleep(0)
+        task = rebuild_service._job_tasks.get(job.id)
+        if task is not None:
+            await task
+        assert job.status == "completed", job.error
+        added.update(await ingest_documents(repository, library_id, 2, 5, seed=99))
+
+        # Reload from MongoDB: the stored payload must match the stored index type
+        index_service._index_cache.pop(library_id, None)
+        library = await repository.library_repo.get_library(library_id)
+        assert library.index_type == "hnsw"
+        index = IndexService(repository).get_index_class("hnsw").deserialize(library.index_data)
+        assert set(index.vectors) == chunk_ids(documents) | chunk_ids(added)
+
+    asyncio.run(scenario())
+
+
+def test_vectors_ingested_during_a_metric_change_keep_their_raw_embeddings(repository, snapshot_dir):
+    async def scenario():
+        library_id, _ = await create_library(repository, n_documents=20, n_chunks=10, metric="cosine")
+        job = await RebuildService(repository).start_rebuild(library_id, "flat", metric="l2")
+        for seed in range(10):
+            await ingest_documents(repository, library_id, 2, 5, seed=seed)
+            await asyncio.sleep(0)
+        task = rebuild_service._job_tasks.get(job.id)
+        if task is not None:
+            await task
+        assert job.status == "completed", job.error
+
+        _, index = await IndexService(repository).get_library_index(library_id)
+        chunks = repository.chunk_repo.read_chunks(list(index.vectors), include_embedding=True)
+        assert len(chunks) == len(index.vectors)
+        for chunk in chunks:
+            assert list(index.vectors[chunk.id]) == pytest.approx(chunk.embedding, rel=1e-5)
+
+    asyncio.run(scenario())
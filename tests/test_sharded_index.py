@@ -0,0 +1,46 @@
+from uuid import uuid4
+
+import numpy as np
+import pytest
+
+from app.indexing.ivf_index import IVFIndex
+from app.indexing.sharded_index import ShardedIndex
+
+
+def random_vectors(n: int, dimension: int = 8, seed: int = 0) -> dict:
+    rng = np.random.default_rng(seed)
+    return {uuid4(): rng.standard_normal(dimension).tolist() for _ in range(n)}
+
+
+@pytest.mark.parametrize("n_shards", [2, 3, 6])
+def test_rebalance_keeps_every_vector_on_its_hashed_shard(n_shards):
+    vectors = random_vectors(300)
+    index = ShardedIndex(shard_type="flat", n_shards=4)
+    index.add_vectors(vectors)
+
+    index.rebalance(n_shards)
+
+    assert len(index.shards) == n_shards
+    assert index.num_vectors() == len(vectors)
+    assert set(index.vectors) == set(vectors)
+    for shard_id, shard in enumerate(index.shards):
+        assert all(index.shard_of(vector_id) == shard_id for vector_id in shard.vectors)
+
+
+def test_rebalance_deletes_from_each_ivf_shard_in_one_call(monkeypatch):
+    index = ShardedIndex(shard_type="ivf", n_shards=4, shard_params={"n_clusters": 4})
+    index.add_vectors(random_vectors(200))
+    calls = []
+    delete_vectors = IVFIndex.delete_vectors
+
+    def counting_delete_vectors(self, vector_ids):
+        calls.append(len(vector_ids))
+        delete_vectors(self, vector_ids)
+
+    monkeypatch.setattr(IVFIndex, "delete_vectors", counting_delete_vectors)
+    monkeypatch.setattr(IVFIndex, "delete_vector", lambda self, vector_id: pytest.fail("deleted one at a time"))
+
+    index.rebalance(5)
+
+    assert len(calls) <= 4
+    assert index.num_vectors() == 200
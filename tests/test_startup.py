@@ -0,0 +1,36 @@
+import asyncio
+
+from httpx import ASGITransport, AsyncClient
+
+import main
+from app.monitoring.startup import startup_tracker
+from app.services.index_service import IndexService
+from benchmarks.stand_ins import InMemoryMongoRepository
+
+
+def test_probes_answer_while_warmup_runs(stand_in, monkeypatch):
+    monkeypatch.setattr(main, "MongoRepository", lambda: InMemoryMongoRepository(stand_in))
+    monkeypatch.setattr(main, "warmup_library_ids", lambda: None)
+    monkeypatch.setattr(main, "close_client", lambda: None)
+    monkeypatch.setattr(startup_tracker, "ready", False)
+    release = asyncio.Event()
+
+    async def slow_warm_up(self, library_ids=None):
+        await release.wait()
+        return 0
+
+    monkeypatch.setattr(IndexService, "warm_up", slow_warm_up)
+
+    async def scenario():
+        async with main.lifespan(main.app):
+            async with AsyncClient(transport=ASGITransport(app=main.app), base_url="http://test") as client:
+                assert (await client.get("/health/live")).status_code == 200
+                assert (await client.get("/health/ready")).status_code == 503
+                release.set()
+                for _ in range(100):
+                    if startup_tracker.ready:
+                        break
+                    await asyncio.sleep(0.01)
+                assert (await client.get("/health/ready")).status_code == 200
+
+    asyncio.run(asyncio.wait_for(scenario(), 10))
@@ -0,0 +1,31 @@
+import asyncio
+import pstats
+
+from httpx import ASGITransport, AsyncClient
+
+import main
+from app.monitoring import tracing
+from app.repository.mongo_repository import MongoRepository
+from app.services.embedding_service import set_embedder
+from benchmarks.stand_ins import HashingEmbedder, InMemoryMongoRepository
+from tests.helpers import DIMENSION, create_library
+
+
+def test_profile_includes_search_pool_work(repository, stand_in, snapshot_dir, tmp_path, monkeypatch):
+    monkeypatch.setattr(tracing, "PROFILE_THRESHOLD_MS", 0)
+    monkeypatch.setattr(tracing, "PROFILE_SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(tracing, "PROFILE_DIR", str(tmp_path / "profiles"))
+    monkeypatch.setitem(main.app.dependency_overrides, MongoRepository, lambda: InMemoryMongoRepository(stand_in))
+    set_embedder(HashingEmbedder(dim=DIMENSION))
+
+    async def scenario():
+        library_id, _ = await create_library(repository)
+        async with AsyncClient(transport=ASGITransport(app=main.app), base_url="http://test") as client:
+            response = await client.post("/search/", json={"library_id": str(library_id), "query": "shared text"})
+            assert response.status_code == 200, response.text
+
+    asyncio.run(scenario())
+    [path] = (tmp_path / "profiles").glob("*.prof")
+    functions = {name for _, _, name in pstats.Stats(str(path)).stats}
+    # Run on the search pool, not on the event loop thread that enabled the request's profiler
+    assert {"search_index", "generate_query_embedding"} <= functions